@@ -0,0 +1,18 @@
+"""Rebuild the materialized sub-account paths from Account.parent"""
+from django.core.management.base import BaseCommand
+
+from accounts.models import Account
+from accounts.resolution import invalidate_accounts
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute Account.path, depth and inactive_depth for every account. Use '
+        'after bulk loads (bulk_create, loaddata) or queryset updates of parent or '
+        'is_active, which bypass Account.save().'
+    )
+
+    def handle(self, *args, **options):
+        Account.rebuild_paths()
+        invalidate_accounts()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt paths of {Account.objects.count()} accounts'))
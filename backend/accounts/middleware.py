@@ -1,6 +1,7 @@
 from django.http import JsonResponse
 
-from .models import Account, set_current_account
+from .models import set_current_account
+from .resolution import resolve_account
 
 
 class AccountMiddleware:
@@ -10,24 +11,26 @@ class AccountMiddleware:
     def __call__(self, request):
         account = None
 
+        # Lookups are served from accounts.resolution's caches, not the database
+
         # Strategy 1: explicit header
         slug = request.headers.get('X-Account-Slug')
         if slug:
-            account = Account.objects.filter(slug=slug, is_active=True).first()
+            account = resolve_account('slug', slug)
 
-        # Strategy 2: subdomain
+        # Strategy 2: subdomain, then the account's own domain
         if not account:
             host = request.get_host().split(':')[0]
             parts = host.split('.')
             if len(parts) > 2:
                 subdomain = parts[0]
-                account = Account.objects.filter(
-                    slug=subdomain, is_active=True
-                ).first()
+                account = resolve_account('slug', subdomain)
+            if not account:
+                account = resolve_account('domain', host)
 
         # Strategy 3: fall back to authenticated user's account
         if not account and hasattr(request, 'user') and request.user.is_authenticated:
-            account = getattr(request.user, 'account', None)
+            account = resolve_account('id', request.user.account_id)
 
         request.account = account
         set_current_account(account)
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.9 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    """Compute the materialized path of every existing account, top down"""
+    Account = apps.get_model('accounts', 'Account')
+
+    accounts = list(Account.objects.only('id', 'parent_id', 'is_active'))
+    children = {}
+    for account in accounts:
+        children.setdefault(account.parent_id, []).append(account)
+
+    pending = [(account, '', 0, None) for account in children.get(None, [])]
+    while pending:
+        account, parent_path, depth, inactive_depth = pending.pop()
+        account.path = f'{parent_path}{account.pk}/'
+        account.depth = depth
+        account.inactive_depth = depth if not account.is_active else inactive_depth
+        pending.extend(
+            (child, account.path, depth + 1, account.inactive_depth)
+            for child in children.get(account.pk, [])
+        )
+    Account.objects.bulk_update(accounts, ['path', 'depth', 'inactive_depth'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='inactive_depth',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
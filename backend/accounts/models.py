@@ -1,7 +1,8 @@
 import threading
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 
 _thread_local = threading.local()
 
@@ -27,6 +28,12 @@ class Account(models.Model):
     )
     is_active = models.BooleanField(default=True)
     settings = models.JSONField(default=dict, blank=True)
+    # Materialized path of the hierarchy, maintained by save(): the IDs from
+    # the root down to this account, e.g. '1/5/9/'
+    path = models.CharField(max_length=255, blank=True, default='', db_index=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Depth of the deepest inactive account on the path (this one included)
+    inactive_depth = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -36,25 +43,131 @@ class Account(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = Account.objects.filter(pk=self.pk).values(
+                    'parent_id', 'is_active', 'path', 'depth', 'inactive_depth'
+                ).first()
+            moved = (
+                previous is None or not previous['path']
+                or previous['parent_id'] != self.parent_id or previous['is_active'] != self.is_active
+            )
+            parent = None
+            if moved and self.parent_id is not None:
+                parent = Account.objects.values('path', 'depth', 'inactive_depth').get(pk=self.parent_id)
+                if previous and previous['path'] and parent['path'].startswith(previous['path']):
+                    raise ValueError('An account cannot be moved under itself or one of its sub-accounts')
+            if not moved:
+                # The stored path wins over a possibly stale copy on this instance
+                self.path, self.depth, self.inactive_depth = (
+                    previous['path'], previous['depth'], previous['inactive_depth']
+                )
+            super().save(*args, **kwargs)
+            if moved:
+                self._update_subtree(parent, previous['path'] if previous else '')
+
+    def _update_subtree(self, parent, old_path):
+        """Recompute the path fields of this account and, when it had a path, its sub-accounts"""
+        self.path = f"{parent['path'] if parent else ''}{self.pk}/"
+        self.depth = parent['depth'] + 1 if parent else 0
+        self.inactive_depth = self.depth if not self.is_active else (parent['inactive_depth'] if parent else None)
+        Account.objects.filter(pk=self.pk).update(
+            path=self.path, depth=self.depth, inactive_depth=self.inactive_depth
+        )
+        if not old_path:
+            return
+
+        # Parents come before their children, so each child reads its parent's new values
+        descendants = list(Account.objects.filter(path__startswith=old_path).exclude(pk=self.pk).order_by(
+            'depth'
+        ).only('id', 'parent_id', 'is_active', 'path', 'depth', 'inactive_depth'))
+        nodes = {self.pk: self}
+        for account in descendants:
+            parent_node = nodes[account.parent_id]
+            account.path = f'{parent_node.path}{account.pk}/'
+            account.depth = parent_node.depth + 1
+            account.inactive_depth = account.depth if not account.is_active else parent_node.inactive_depth
+            nodes[account.pk] = account
+        Account.objects.bulk_update(descendants, ['path', 'depth', 'inactive_depth'], batch_size=500)
+
+    @classmethod
+    def rebuild_paths(cls):
+        """Recompute every account's path fields from ``parent``.
+
+        For rows written without ``save()`` (``bulk_create``, raw
+        ``loaddata``), which are left with an empty path.
+        """
+        accounts = list(cls.objects.only('id', 'parent_id', 'is_active'))
+        children = {}
+        for account in accounts:
+            children.setdefault(account.parent_id, []).append(account)
+
+        pending = [(account, '', 0, None) for account in children.get(None, [])]
+        while pending:
+            account, parent_path, depth, inactive_depth = pending.pop()
+            account.path = f'{parent_path}{account.pk}/'
+            account.depth = depth
+            account.inactive_depth = depth if not account.is_active else inactive_depth
+            pending.extend(
+                (child, account.path, depth + 1, account.inactive_depth)
+                for child in children.get(account.pk, [])
+            )
+        cls.objects.bulk_update(accounts, ['path', 'depth', 'inactive_depth'], batch_size=500)
+
+    def _require_path(self):
+        """Make sure ``path`` is set, since an empty prefix would match every tenant's accounts"""
+        if self.pk is None:
+            raise ValueError('An unsaved account has no place in the hierarchy')
+        if not self.path:
+            from .resolution import invalidate_accounts
+
+            Account.rebuild_paths()
+            # Cached copies from tenant resolution still carry the empty path
+            invalidate_accounts()
+            self.path, self.depth, self.inactive_depth = Account.objects.values_list(
+                'path', 'depth', 'inactive_depth'
+            ).get(pk=self.pk)
+
+    @property
+    def ancestor_ids(self):
+        """IDs from the root down to this account, read from the path without a query"""
+        self._require_path()
+        return [int(account_id) for account_id in self.path.split('/') if account_id]
+
     @property
     def root_account(self):
-        account = self
-        while account.parent is not None:
-            account = account.parent
-        return account
+        if self.parent_id is None:
+            return self
+        return Account.objects.get(pk=self.ancestor_ids[0])
 
     @property
     def is_root(self):
         return self.parent is None
 
+    def get_ancestors(self, include_self=True):
+        """Accounts above this one, root first"""
+        ancestor_ids = self.ancestor_ids if include_self else self.ancestor_ids[:-1]
+        return Account.objects.filter(pk__in=ancestor_ids).order_by('depth')
+
     def get_descendants(self, include_self=True):
-        result = [self] if include_self else []
-        for child in self.sub_accounts.filter(is_active=True):
-            result.extend(child.get_descendants(include_self=True))
-        return result
+        """This account and its sub-accounts at any depth, parents before children.
+
+        Sub-accounts below an inactive sub-account are left out along with it.
+        One indexed prefix query on ``path``.
+        """
+        self._require_path()
+        descendants = Account.objects.filter(path__startswith=self.path).filter(
+            Q(inactive_depth__isnull=True) | Q(inactive_depth__lte=self.depth)
+        ).order_by('path')
+        if not include_self:
+            descendants = descendants.exclude(pk=self.pk)
+        return descendants
 
     def get_account_ids(self, include_self=True):
-        return [a.id for a in self.get_descendants(include_self)]
+        """IDs of ``get_descendants``, usable as an ``account_id__in`` subquery"""
+        return self.get_descendants(include_self).values_list('id', flat=True)
 
 
 class AccountMembership(models.Model):
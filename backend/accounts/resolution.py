@@ -0,0 +1,90 @@
+"""Cached tenant resolution for ``AccountMiddleware``"""
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from .models import Account
+
+# Shared cache entries live this long; saving or deleting an account discards them all
+ACCOUNT_CACHE_TIMEOUT = 60 * 5
+# Each process keeps recent lookups for a few seconds, so a change made through
+# another process is picked up within this window
+LOCAL_CACHE_TTL = 5
+LOCAL_CACHE_SIZE = 1024
+VERSION_KEY = 'accounts:resolution:version'
+# Cached in place of ``None`` so unknown slugs and domains are not looked up again
+_MISSING = 'missing'
+# Header and host values that can name an account (and are safe cache key parts)
+_LOOKUP_VALUE = re.compile(r'^[-\w.]{1,255}$')
+
+_local = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _version():
+    # Seed with a timestamp so an evicted counter never reuses an old version
+    cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+    return cache.get(VERSION_KEY)
+
+
+def invalidate_accounts():
+    """Discard every cached account lookup (shared, and this process's local copies)"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+    with _local_lock:
+        _local.clear()
+
+
+def _load(field, value):
+    if field == 'id':
+        # A user's own account resolves whether or not it is active, as before
+        return Account.objects.filter(pk=value).first()
+    return Account.objects.filter(**{field: value, 'is_active': True}).first()
+
+
+def resolve_account(field, value):
+    """The account whose ``field`` (``slug``, ``domain`` or ``id``) equals ``value``, or ``None``.
+
+    Lookups are answered from a per-process LRU of recent results, then
+    from the shared cache, and only then from the database; misses are
+    cached too. Callers get their own copy of the cached instance, so
+    changes to it (including ``settings``) never leak into other requests.
+    """
+    if value is None or not _LOOKUP_VALUE.match(str(value)):
+        return None
+
+    key = (field, str(value))
+    now = time.monotonic()
+    with _local_lock:
+        entry = _local.get(key)
+        if entry is not None and entry[0] > now:
+            _local.move_to_end(key)
+            account = entry[1]
+        else:
+            entry = None
+
+    if entry is None:
+        shared_key = 'accounts:resolution:{}:{}:{}'.format(_version(), *key)
+        account = cache.get(shared_key)
+        if account is None:
+            account = _load(field, value)
+            cache.set(shared_key, _MISSING if account is None else account, ACCOUNT_CACHE_TIMEOUT)
+        elif account == _MISSING:
+            account = None
+        with _local_lock:
+            _local[key] = (now + LOCAL_CACHE_TTL, account)
+            _local.move_to_end(key)
+            while len(_local) > LOCAL_CACHE_SIZE:
+                _local.popitem(last=False)
+
+    if account is None:
+        return None
+    account = copy.copy(account)
+    account.settings = copy.deepcopy(account.settings)
+    return account
@@ -0,0 +1,15 @@
+"""Signal handlers that keep cached tenant resolution in step with account edits"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Account
+from .resolution import invalidate_accounts
+
+
+@receiver([post_save, post_delete], sender=Account)
+def account_changed(sender, instance, **kwargs):
+    """Drop cached lookups when an account is saved (renamed, deactivated, ...) or deleted"""
+    invalidate_accounts()
+    # Again once committed, so a lookup cached from pre-commit rows is discarded
+    transaction.on_commit(invalidate_accounts)
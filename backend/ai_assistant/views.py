@@ -7,7 +7,8 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from .models import AISettings, CourseSyllabus
 from .serializers import AISettingsSerializer, CourseSyllabusSerializer, AIGenerateRequestSerializer, AIModuleGenerateRequestSerializer, AIRubricGenerateRequestSerializer
 from .utils import build_system_prompt, build_module_system_prompt, build_rubric_system_prompt, call_openai, extract_text_from_file, decrypt_api_key
-from courses.models import Course, CourseMembership
+from courses.models import Course
+from users.access import get_access
 from users.permissions import IsAdmin, IsInstructor
 
 
@@ -114,12 +115,7 @@ class AIGenerateView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        is_instructor = CourseMembership.objects.filter(
-            user=request.user,
-            course=course,
-            role='instructor',
-            status='active'
-        ).exists() or hasattr(request.user, 'admin_profile')
+        is_instructor = get_access(request).is_course_instructor(course)
 
         if not is_instructor:
             return Response(
@@ -201,12 +197,7 @@ class AIModuleGenerateView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        is_instructor = CourseMembership.objects.filter(
-            user=request.user,
-            course=course,
-            role='instructor',
-            status='active'
-        ).exists() or hasattr(request.user, 'admin_profile')
+        is_instructor = get_access(request).is_course_instructor(course)
 
         if not is_instructor:
             return Response(
@@ -289,9 +280,7 @@ class AIRubricGenerateView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        is_instructor = CourseMembership.objects.filter(
-            user=request.user, course=course, role='instructor', status='active'
-        ).exists() or hasattr(request.user, 'admin_profile')
+        is_instructor = get_access(request).is_course_instructor(course)
 
         if not is_instructor:
             return Response(
@@ -1,11 +1,19 @@
 """Admin configuration for assignments app"""
 from django.contrib import admin
-from .models import Assignment, Quiz, Test, Homework, AssignmentSubmission, Question, Choice
+from .models import Assignment, AssignmentGroup, Quiz, Test, Homework, AssignmentSubmission, Question, Choice, SubmissionDraft
+
+
+@admin.register(AssignmentGroup)
+class AssignmentGroupAdmin(admin.ModelAdmin):
+    list_display = ('name', 'course', 'weight', 'drop_lowest', 'order')
+    list_filter = ('course',)
+    search_fields = ('name', 'course__code', 'course__name')
+    readonly_fields = ('created_at', 'updated_at')
 
 
 @admin.register(Assignment)
 class AssignmentAdmin(admin.ModelAdmin):
-    list_display = ('title', 'course', 'type', 'due_date', 'points_possible', 'created_at')
+    list_display = ('title', 'course', 'type', 'group', 'due_date', 'points_possible', 'created_at')
     list_filter = ('type', 'course', 'due_date')
     search_fields = ('title', 'course__code', 'course__name')
     readonly_fields = ('created_at', 'updated_at')
@@ -37,16 +45,24 @@ class HomeworkAdmin(admin.ModelAdmin):
 
 @admin.register(AssignmentSubmission)
 class AssignmentSubmissionAdmin(admin.ModelAdmin):
-    list_display = ('assignment', 'student_email', 'is_late', 'submitted_at')
-    list_filter = ('is_late', 'submitted_at', 'assignment__course')
+    list_display = ('assignment', 'student_email', 'is_late', 'grading_status', 'total_score', 'submitted_at')
+    list_filter = ('is_late', 'grading_status', 'submitted_at', 'assignment__course')
     search_fields = ('assignment__title', 'student__email')
-    readonly_fields = ('submitted_at',)
+    readonly_fields = ('submitted_at', 'total_score', 'graded_count', 'question_count', 'grading_status')
     
     def student_email(self, obj):
         return obj.student.email
     student_email.short_description = 'Student'
 
 
+@admin.register(SubmissionDraft)
+class SubmissionDraftAdmin(admin.ModelAdmin):
+    list_display = ('assignment', 'student', 'revision', 'updated_at')
+    list_filter = ('assignment__course',)
+    search_fields = ('assignment__title', 'student__email')
+    readonly_fields = ('revision', 'updated_at')
+
+
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ('text_preview', 'assignment', 'question_type', 'points', 'order')
@@ -0,0 +1,86 @@
+"""SQL-side answer analytics for assignments"""
+from django.db.models import Avg, Count, Max, Min, Q
+
+from .models import Choice, Question, QuestionResponse
+
+COMMON_VALUES_LIMIT = 5
+
+
+def answer_distribution(assignment):
+    """Per-question answer distributions, aggregated in SQL over the typed answer columns.
+
+    Multiple choice questions count the responses selecting each choice
+    (``selected_choice_id``); numerical questions report the count, mean,
+    min, max and most common ``numeric_value``s. Answers that did not parse
+    into a typed value are counted as ``invalid``. Costs four queries
+    whatever the number of responses.
+    """
+    questions = Question.objects.filter(assignment=assignment).order_by('order', 'id').values_list(
+        'id', 'question_type', 'points'
+    )
+    responses = QuestionResponse.objects.filter(question__assignment=assignment).order_by()
+
+    totals = {
+        row['question_id']: row
+        for row in responses.values('question_id').annotate(
+            responses=Count('id'),
+            correct=Count('id', filter=Q(is_correct=True)),
+            selected=Count('selected_choice'),
+            numeric=Count('numeric_value'),
+            mean=Avg('numeric_value'),
+            minimum=Min('numeric_value'),
+            maximum=Max('numeric_value'),
+        )
+    }
+
+    choice_counts = {
+        (question_id, choice_id): count
+        for question_id, choice_id, count in responses.filter(selected_choice__isnull=False).values(
+            'question_id', 'selected_choice_id'
+        ).annotate(count=Count('id')).values_list('question_id', 'selected_choice_id', 'count')
+    }
+    choices = {}
+    for question_id, choice_id, text, is_correct in Choice.objects.filter(
+        question__assignment=assignment
+    ).order_by('question_id', 'order', 'id').values_list('question_id', 'id', 'text', 'is_correct'):
+        choices.setdefault(question_id, []).append({
+            'choice_id': choice_id,
+            'text': text,
+            'is_correct': is_correct,
+            'count': choice_counts.get((question_id, choice_id), 0),
+        })
+
+    common_values = {}
+    for question_id, value, count in responses.filter(numeric_value__isnull=False).values(
+        'question_id', 'numeric_value'
+    ).annotate(count=Count('id')).order_by('question_id', '-count', 'numeric_value').values_list(
+        'question_id', 'numeric_value', 'count'
+    ):
+        values = common_values.setdefault(question_id, [])
+        if len(values) < COMMON_VALUES_LIMIT:
+            values.append({'value': value, 'count': count})
+
+    data = []
+    for question_id, question_type, points in questions:
+        row = totals.get(question_id, {})
+        entry = {
+            'question_id': question_id,
+            'question_type': question_type,
+            'points': points,
+            'responses': row.get('responses', 0),
+            'correct': row.get('correct', 0),
+        }
+        if question_type == 'multiple_choice':
+            entry['invalid'] = entry['responses'] - row.get('selected', 0)
+            entry['choices'] = choices.get(question_id, [])
+        elif question_type == 'numerical':
+            entry['invalid'] = entry['responses'] - row.get('numeric', 0)
+            entry['numeric'] = {
+                'count': row.get('numeric', 0),
+                'mean': row.get('mean'),
+                'min': row.get('minimum'),
+                'max': row.get('maximum'),
+                'common_values': common_values.get(question_id, []),
+            }
+        data.append(entry)
+    return {'assignment_id': assignment.id, 'questions': data}
@@ -0,0 +1,227 @@
+"""Compiled, cached answer keys for auto-grading assignment responses"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.core.cache import cache
+
+from .models import Choice, Question
+
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60 * 24
+# Part of the shared cache key, so keys pickled by older code are never read back
+ANSWER_KEY_FORMAT = 2
+LOCAL_CACHE_SIZE = 256
+
+_local_keys = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _readonly(values, dtype):
+    array = np.array(values, dtype=dtype)
+    array.setflags(write=False)
+    return array
+
+
+class AnswerKey:
+    """Immutable grading key for one assignment.
+
+    Holds, per question and in question order: the question type, point
+    value, first correct choice ID and every choice ID (multiple choice) and
+    numeric target and tolerance (NaN when unset). Parsing and grading a
+    response are pure lookups.
+    """
+
+    __slots__ = (
+        'assignment_id', 'version', 'question_ids', 'question_types', 'points',
+        'numeric_targets', 'numeric_tolerances', 'correct_choices', 'choice_ids', '_index',
+    )
+
+    def __init__(self, assignment_id, version, questions, correct_choices, choice_ids):
+        set_ = object.__setattr__
+        set_(self, 'assignment_id', assignment_id)
+        set_(self, 'version', version)
+        set_(self, 'question_ids', tuple(q[0] for q in questions))
+        set_(self, 'question_types', tuple(q[1] for q in questions))
+        set_(self, 'points', _readonly([q[2] for q in questions], int))
+        set_(self, 'numeric_targets', _readonly(
+            [np.nan if q[3] is None else q[3] for q in questions], float
+        ))
+        set_(self, 'numeric_tolerances', _readonly([q[4] for q in questions], float))
+        set_(self, 'correct_choices', dict(correct_choices))
+        set_(self, 'choice_ids', {
+            question_id: frozenset(ids) for question_id, ids in choice_ids.items()
+        })
+        set_(self, '_index', {question_id: i for i, question_id in enumerate(self.question_ids)})
+
+    def __setattr__(self, name, value):
+        raise AttributeError('AnswerKey is immutable')
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def __contains__(self, question_id):
+        return question_id in self._index
+
+    @property
+    def total_points(self):
+        return int(self.points.sum())
+
+    def parse(self, question_id, response_text):
+        """Typed form of an answer: ``(selected_choice_id, numeric_value)``.
+
+        A multiple choice answer keeps its choice ID only when it names one
+        of the question's choices; a numerical answer keeps a finite float.
+        Everything else, including every answer to a text question, is None.
+        """
+        question_type = self.question_types[self._index[question_id]]
+        if question_type == 'multiple_choice':
+            try:
+                choice_id = int(response_text)
+            except (ValueError, TypeError):
+                return None, None
+            return (choice_id if choice_id in self.choice_ids.get(question_id, ()) else None), None
+        if question_type == 'numerical':
+            try:
+                value = float(response_text)
+            except (ValueError, TypeError):
+                return None, None
+            return None, (value if math.isfinite(value) else None)
+        return None, None
+
+    def grade_parsed(self, question_id, selected_choice_id, numeric_value):
+        """Grade a typed answer: ``(is_correct, points_earned)``, or None if it needs manual grading"""
+        i = self._index[question_id]
+        question_type = self.question_types[i]
+        points = int(self.points[i])
+
+        if question_type == 'multiple_choice':
+            # Missing or invalid selections are marked incorrect
+            if selected_choice_id is not None and selected_choice_id == self.correct_choices.get(question_id):
+                return True, points
+            return False, 0
+
+        if question_type == 'numerical':
+            target = self.numeric_targets[i]
+            if (
+                numeric_value is not None and not np.isnan(target)
+                and abs(numeric_value - target) <= self.numeric_tolerances[i]
+            ):
+                return True, points
+            return False, 0
+
+        # Text responses are not auto-graded
+        return None
+
+    def grade(self, question_id, response_text):
+        """Grade one raw answer: ``(is_correct, points_earned)``, or None if it needs manual grading"""
+        return self.grade_parsed(question_id, *self.parse(question_id, response_text))
+
+    def grade_many(self, question_ids, selected_choice_ids, numeric_values):
+        """Vectorized ``grade_parsed`` over parallel sequences of typed answers.
+
+        Returns ``(is_correct, points_earned, gradable)`` arrays, where
+        ``gradable`` is False for responses that need manual grading.
+        """
+        positions = np.array([self._index[question_id] for question_id in question_ids], dtype=int)
+        types = np.array(self.question_types, dtype=object)[positions]
+        is_choice = types == 'multiple_choice'
+        is_numeric = types == 'numerical'
+
+        # Missing answers become NaN, which never compares equal or within tolerance
+        selected = np.array(
+            [np.nan if choice_id is None else choice_id for choice_id in selected_choice_ids], dtype=float
+        )
+        values = np.array([np.nan if value is None else value for value in numeric_values], dtype=float)
+        expected_choice = np.array(
+            [float(self.correct_choices.get(question_id, np.nan)) for question_id in question_ids]
+        )
+        with np.errstate(invalid='ignore'):
+            correct = np.where(
+                is_choice,
+                selected == expected_choice,
+                is_numeric & (
+                    np.abs(values - self.numeric_targets[positions])
+                    <= self.numeric_tolerances[positions]
+                ),
+            )
+        points = np.where(correct, self.points[positions], 0)
+        return correct, points, is_choice | is_numeric
+
+
+def _version_key(assignment_id):
+    return f'answer_key:version:{assignment_id}'
+
+
+def answer_key_version(assignment_id):
+    """Current cache version of an assignment's answer key"""
+    key = _version_key(assignment_id)
+    # Seed with a timestamp so an evicted counter never reuses an old version
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def invalidate_answer_key(assignment_id):
+    """Bump the assignment's answer key version so every process rebuilds it"""
+    try:
+        cache.incr(_version_key(assignment_id))
+    except ValueError:
+        cache.set(_version_key(assignment_id), time.time_ns(), timeout=None)
+    with _local_lock:
+        _local_keys.pop(assignment_id, None)
+
+
+def build_answer_key(assignment_id, version=None):
+    """Compile an assignment's answer key from the database (two queries)"""
+    questions = Question.objects.filter(assignment_id=assignment_id).order_by(
+        'order', 'id'
+    ).values_list('id', 'question_type', 'points', 'correct_answer_numeric', 'numeric_tolerance')
+
+    correct_choices = {}
+    choice_ids = {}
+    choices = Choice.objects.filter(question__assignment_id=assignment_id).order_by(
+        'question_id', 'order', 'id'
+    ).values_list('question_id', 'id', 'is_correct')
+    for question_id, choice_id, is_correct in choices:
+        choice_ids.setdefault(question_id, []).append(choice_id)
+        if is_correct:
+            # The first correct choice is the answer, as in manual grading
+            correct_choices.setdefault(question_id, choice_id)
+
+    return AnswerKey(assignment_id, version, list(questions), correct_choices, choice_ids)
+
+
+def get_answer_key(assignment_id):
+    """Return the compiled answer key for an assignment.
+
+    Keys are looked up in this process first, then in the shared cache, and
+    only compiled from the database when neither holds the current version.
+    """
+    version = answer_key_version(assignment_id)
+
+    with _local_lock:
+        answer_key = _local_keys.get(assignment_id)
+        if answer_key is not None and answer_key.version == version:
+            _local_keys.move_to_end(assignment_id)
+            return answer_key
+
+    shared_key = f'answer_key:{ANSWER_KEY_FORMAT}:{assignment_id}:{version}'
+    answer_key = cache.get(shared_key)
+    if answer_key is None:
+        answer_key = build_answer_key(assignment_id, version)
+        cache.set(shared_key, answer_key, ANSWER_KEY_CACHE_TIMEOUT)
+
+    with _local_lock:
+        _local_keys[assignment_id] = answer_key
+        _local_keys.move_to_end(assignment_id)
+        while len(_local_keys) > LOCAL_CACHE_SIZE:
+            _local_keys.popitem(last=False)
+    return answer_key
@@ -0,0 +1,235 @@
+"""Cache-first autosave of in-progress assignment attempts"""
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from django.utils.connection import ConnectionProxy
+
+from .models import AssignmentSubmission, SubmissionDraft
+
+# Drafts have their own cache (see ``CACHES`` in settings), shared by every worker in production
+cache = ConnectionProxy(caches, 'drafts')
+
+# Drafts idle for longer than this drop out of the cache; the flushed row remains
+DRAFT_CACHE_TIMEOUT = 60 * 60 * 6
+# A draft is written to the database at most once per interval
+DRAFT_FLUSH_INTERVAL = 30
+DRAFT_FLUSH_BATCH_SIZE = 500
+DRAFT_FIELDS = ['answer', 'responses', 'revision', 'updated_at']
+# How long a writer may hold a draft's lock, and how long others wait for it
+DRAFT_LOCK_TIMEOUT = 10
+DRAFT_LOCK_WAIT_TIMEOUT = 5.0
+DRAFT_LOCK_POLL_INTERVAL = 0.02
+
+
+class DraftClosed(Exception):
+    """Raised when saving a draft for an assignment the student already submitted"""
+
+
+class DraftBusy(Exception):
+    """Raised when another write to the same draft holds its lock for too long"""
+
+
+def _cache_key(assignment_id, student_id):
+    return f'assignment-draft:{assignment_id}:{student_id}'
+
+
+def _acquire(lock):
+    """Take ``lock`` with ``cache.add``, waiting up to ``DRAFT_LOCK_WAIT_TIMEOUT`` seconds"""
+    deadline = time.monotonic() + DRAFT_LOCK_WAIT_TIMEOUT
+    while not cache.add(lock, True, DRAFT_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(DRAFT_LOCK_POLL_INTERVAL)
+    return True
+
+
+def _process_local():
+    """Whether the draft cache lives in this process alone, so a cached save could be lost"""
+    return isinstance(caches['drafts'], LocMemCache)
+
+
+def _empty_draft():
+    return {
+        'answer': '', 'responses': {}, 'revision': 0, 'updated_at': None,
+        'flushed_revision': 0, 'flushed_at': 0.0,
+    }
+
+
+def _load(assignment_id, student_id):
+    """The cached draft blob, read through from the database on a miss"""
+    draft = cache.get(_cache_key(assignment_id, student_id))
+    if draft is not None:
+        return draft
+
+    row = SubmissionDraft.objects.filter(
+        assignment_id=assignment_id, student_id=student_id
+    ).values(*DRAFT_FIELDS).first()
+    if row is not None:
+        draft = {**row, 'flushed_revision': row['revision'], 'flushed_at': time.time()}
+    elif AssignmentSubmission.objects.filter(assignment_id=assignment_id, student_id=student_id).exists():
+        draft = {'submitted': True}
+    else:
+        draft = _empty_draft()
+    cache.set(_cache_key(assignment_id, student_id), draft, DRAFT_CACHE_TIMEOUT)
+    return draft
+
+
+def _draft_row(assignment_id, student_id, draft):
+    return SubmissionDraft(
+        assignment_id=assignment_id,
+        student_id=student_id,
+        **{field: draft[field] for field in DRAFT_FIELDS},
+    )
+
+
+def _write(rows):
+    """Upsert draft rows with one statement per batch"""
+    SubmissionDraft.objects.bulk_create(
+        rows,
+        batch_size=DRAFT_FLUSH_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['assignment', 'student'],
+        update_fields=DRAFT_FIELDS,
+    )
+
+
+def get_draft(assignment_id, student_id):
+    """The student's current draft (``None`` once submitted)"""
+    draft = _load(assignment_id, student_id)
+    return None if draft.get('submitted') else draft
+
+
+def save_draft(assignment_id, student_id, responses, answer=None):
+    """Merge changed answers into the student's draft.
+
+    ``responses`` maps question ID to response text; questions not
+    mentioned keep their saved text. Every save updates the cached blob,
+    but the database row is only rewritten when the last write is older
+    than ``DRAFT_FLUSH_INTERVAL`` seconds, so a burst of saves costs one
+    write. ``flush_drafts`` picks up whatever is still only cached. With a
+    process-local cache every save is written through.
+
+    Saves of the same draft are serialized with a ``cache.add`` lock, shared
+    with ``closing_draft``, so overlapping saves (two tabs, a retried
+    autosave) keep each other's answers and a save racing the submission
+    cannot reopen the draft. Raises ``DraftBusy`` if the lock stays taken.
+    """
+    lock = f'{_cache_key(assignment_id, student_id)}:lock'
+    if not _acquire(lock):
+        raise DraftBusy
+    try:
+        # Read under the lock, so a submission that closed the draft meanwhile is seen
+        draft = _load(assignment_id, student_id)
+        if draft.get('submitted'):
+            raise DraftClosed
+        draft['responses'].update({str(question_id): text for question_id, text in responses.items()})
+        if answer is not None:
+            draft['answer'] = answer
+        draft['revision'] += 1
+        draft['updated_at'] = timezone.now()
+
+        now = time.time()
+        if now - draft['flushed_at'] >= DRAFT_FLUSH_INTERVAL or _process_local():
+            _write([_draft_row(assignment_id, student_id, draft)])
+            draft['flushed_revision'], draft['flushed_at'] = draft['revision'], now
+        cache.set(_cache_key(assignment_id, student_id), draft, DRAFT_CACHE_TIMEOUT)
+        return draft
+    finally:
+        cache.delete(lock)
+
+
+def draft_responses(draft, responses_data=()):
+    """Submission responses from a draft, overridden by any sent with the submit request"""
+    sent = {}
+    for item in responses_data or ():
+        if isinstance(item, dict):
+            sent[str(item.get('question_id'))] = item
+    merged = [
+        {'question_id': question_id, 'response_text': text}
+        for question_id, text in draft['responses'].items()
+        if question_id not in sent
+    ]
+    return merged + list(sent.values())
+
+
+@contextmanager
+def closing_draft(assignment_id, student_id):
+    """Hold the student's draft closed while its submission is written.
+
+    Takes the draft's lock and marks the draft submitted before handing it
+    to the block (``None`` if it was already submitted), and keeps the lock
+    until the block is done. A save arriving meanwhile waits and is then
+    refused with ``DraftClosed``, rather than merging an answer the
+    submission will not include. The draft row is deleted once the block
+    completes; if the block raises, the draft is put back. Raises
+    ``DraftBusy`` if the lock stays taken.
+    """
+    key = _cache_key(assignment_id, student_id)
+    lock = f'{key}:lock'
+    if not _acquire(lock):
+        raise DraftBusy
+    try:
+        draft = _load(assignment_id, student_id)
+        cache.set(key, {'submitted': True}, DRAFT_CACHE_TIMEOUT)
+        try:
+            yield None if draft.get('submitted') else draft
+        except BaseException:
+            cache.set(key, draft, DRAFT_CACHE_TIMEOUT)
+            raise
+        if draft.get('revision'):
+            SubmissionDraft.objects.filter(assignment_id=assignment_id, student_id=student_id).delete()
+    finally:
+        cache.delete(lock)
+
+
+def draft_data(assignment_id, draft):
+    """API representation of a draft blob"""
+    return {
+        'assignment': assignment_id,
+        'answer': draft['answer'],
+        'responses': [
+            {'question_id': int(question_id), 'response_text': text}
+            for question_id, text in draft['responses'].items()
+        ],
+        'revision': draft['revision'],
+        'updated_at': draft['updated_at'],
+    }
+
+
+def _flush_batch(rows):
+    keys = {_cache_key(row[0], row[1]): row for row in rows}
+    pending = []
+    for key, draft in cache.get_many(list(keys)).items():
+        assignment_id, student_id, revision = keys[key]
+        if not draft.get('submitted') and draft['revision'] > revision:
+            pending.append(_draft_row(assignment_id, student_id, draft))
+    _write(pending)
+    return len(pending)
+
+
+def flush_drafts(since=None):
+    """Write cached draft revisions the database does not have yet.
+
+    Scans draft rows updated within the cache lifetime (or since
+    ``since``), reads their cached blobs with ``get_many`` and upserts the
+    newer ones in batches. Returns the number of drafts written.
+    """
+    if since is None:
+        since = timezone.now() - timedelta(seconds=DRAFT_CACHE_TIMEOUT)
+    rows = SubmissionDraft.objects.filter(updated_at__gte=since).order_by('id').values_list(
+        'assignment_id', 'student_id', 'revision'
+    )
+    written = 0
+    batch = []
+    for row in rows.iterator(chunk_size=DRAFT_FLUSH_BATCH_SIZE):
+        batch.append(row)
+        if len(batch) == DRAFT_FLUSH_BATCH_SIZE:
+            written += _flush_batch(batch)
+            batch = []
+    if batch:
+        written += _flush_batch(batch)
+    return written
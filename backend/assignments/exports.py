@@ -0,0 +1,65 @@
+"""Row sources for streaming assignment exports"""
+from .models import AssignmentSubmission, QuestionResponse
+
+EXPORT_CHUNK_SIZE = 2000
+
+SUBMISSION_COLUMNS = [
+    ('submission_id', 'id'),
+    ('student_id', 'student_id'),
+    ('student_email', 'student__email'),
+    ('student_first_name', 'student__first_name'),
+    ('student_last_name', 'student__last_name'),
+    ('submitted_at', 'submitted_at'),
+    ('is_late', 'is_late'),
+    ('total_score', 'total_score'),
+    ('graded_count', 'graded_count'),
+    ('question_count', 'question_count'),
+    ('grading_status', 'grading_status'),
+]
+
+RESPONSE_COLUMNS = [
+    ('response_id', 'id'),
+    ('submission_id', 'submission_id'),
+    ('student_id', 'submission__student_id'),
+    ('student_email', 'submission__student__email'),
+    ('question_id', 'question_id'),
+    ('question_order', 'question__order'),
+    ('question_type', 'question__question_type'),
+    ('points_possible', 'question__points'),
+    ('response_text', 'response_text'),
+    ('is_correct', 'is_correct'),
+    ('points_earned', 'points_earned'),
+    ('graded', 'graded'),
+    ('teacher_remarks', 'teacher_remarks'),
+    ('graded_at', 'graded_at'),
+]
+
+
+def _export(queryset, columns):
+    header = [name for name, _ in columns]
+    rows = queryset.values_list(*[path for _, path in columns]).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return header, rows
+
+
+def submission_export(assignment):
+    """``(header, rows)`` with one row per submission, read in chunks"""
+    return _export(
+        AssignmentSubmission.objects.filter(assignment=assignment).order_by('id'),
+        SUBMISSION_COLUMNS,
+    )
+
+
+def response_export(assignment):
+    """``(header, rows)`` with one row per question response, read in chunks"""
+    return _export(
+        QuestionResponse.objects.filter(submission__assignment=assignment).order_by(
+            'submission_id', 'question__order', 'question_id'
+        ),
+        RESPONSE_COLUMNS,
+    )
+
+
+EXPORTS = {
+    'submissions': submission_export,
+    'responses': response_export,
+}
@@ -0,0 +1,235 @@
+"""Batched grading pipeline for assignment submissions"""
+from django.db import transaction
+from django.utils import timezone
+
+from courses.models import CourseMembership
+from gradebook.bulk import upsert_grade_entries
+from gradebook.models import GradeEntry
+from .answer_keys import get_answer_key
+from .models import AssignmentSubmission, QuestionResponse
+from .progress import PROGRESS_FIELDS, progress_from_responses, refresh_grading_progress
+
+
+def grade_responses(submission, answer_key, responses_data, graded_at=None):
+    """Build graded, unsaved ``QuestionResponse`` rows for a submission.
+
+    Answers are parsed once into their typed columns and graded by lookup
+    in the compiled ``answer_key``. Entries for unknown questions are
+    skipped, and only the first answer to each question is kept.
+    """
+    graded_at = graded_at or timezone.now()
+    responses = {}
+    for response_data in responses_data:
+        try:
+            question_id = int(response_data.get('question_id'))
+        except (TypeError, ValueError):
+            continue
+        if question_id not in answer_key or question_id in responses:
+            continue
+
+        response = QuestionResponse(
+            submission=submission,
+            question_id=question_id,
+            response_text=response_data.get('response_text', ''),
+        )
+        response.selected_choice_id, response.numeric_value = answer_key.parse(
+            question_id, response.response_text
+        )
+        result = answer_key.grade_parsed(question_id, response.selected_choice_id, response.numeric_value)
+        if result is not None:
+            response.is_correct, response.points_earned = result
+            response.graded = True
+            response.graded_at = graded_at
+        responses[question_id] = response
+    return list(responses.values())
+
+
+def _grade_comment(grader, rubric_graded=False):
+    if rubric_graded:
+        return 'Rubric graded'
+    return 'Graded' if grader else 'Auto-graded'
+
+
+def save_submission_grade(submission, score, grader=None):
+    """Create or update the student's grade entry for a submission's score"""
+    membership = CourseMembership.objects.filter(
+        user_id=submission.student_id,
+        course_id=submission.assignment.course_id,
+        role='student',
+        status='active',
+    ).first()
+    if membership is None:
+        return None  # Student not enrolled, skip grade entry
+
+    grade_entry, _ = GradeEntry.objects.update_or_create(
+        membership=membership,
+        assignment=submission.assignment,
+        defaults={
+            'grade': score,
+            'graded_by': grader,
+            'comments': _grade_comment(grader),
+        }
+    )
+    return grade_entry
+
+
+def sync_submission_grades(assignment, grades, grader=None, rubric_graded=()):
+    """Write grade entries for many students of one assignment at once.
+
+    ``grades`` maps student user ID to the grade to record. Without a
+    ``grader`` existing entries keep their grader and comments; with one,
+    entries are marked as graded by them. Students in ``rubric_graded`` get
+    the rubric comment, as when an assessment is saved on its own. Students
+    who are no longer active in the course are skipped. Returns the number
+    of entries written.
+    """
+    memberships = dict(CourseMembership.objects.filter(
+        course_id=assignment.course_id,
+        user_id__in=list(grades),
+        role='student',
+        status='active',
+    ).values_list('user_id', 'id'))
+
+    return upsert_grade_entries(
+        assignment.course,
+        [
+            GradeEntry(
+                membership_id=memberships[student_id],
+                assignment_id=assignment.id,
+                grade=grade,
+                graded_by=grader,
+                comments=_grade_comment(grader, student_id in rubric_graded),
+            )
+            for student_id, grade in grades.items()
+            if student_id in memberships
+        ],
+        update_fields=['grade', 'graded_by', 'comments'] if grader else ['grade'],
+    )
+
+
+def submission_grades(submission_ids):
+    """Grade to record for each of the submissions that has one, keyed by student ID.
+
+    Reads the stored progress columns. A rubric-assessed submission combines
+    its question score with the rubric total; any other gets a grade once
+    every question is graded. Returns ``(grades, rubric_graded)``, the
+    latter the set of students whose grade includes a rubric total.
+    """
+    grades = {}
+    rubric_graded = set()
+    rows = AssignmentSubmission.objects.filter(id__in=submission_ids).order_by(
+        'id', 'rubric_assessments__id'
+    ).values_list('id', 'student_id', 'total_score', 'graded_count', 'question_count',
+                  'rubric_assessments__total_score')
+    seen = set()
+    for submission_id, student_id, score, graded_count, question_count, rubric_total in rows:
+        if submission_id in seen:
+            continue  # Only the first rubric assessment counts
+        seen.add(submission_id)
+        if rubric_total is not None:
+            grades[student_id] = score + int(rubric_total)
+            rubric_graded.add(student_id)
+        elif question_count > 0 and graded_count == question_count:
+            grades[student_id] = score
+    return grades, rubric_graded
+
+
+def bulk_grade_responses(assignment, grades, grader):
+    """Manually grade many responses of one assignment in a single transaction.
+
+    ``grades`` is a list of ``{'response_id', 'points_earned',
+    'teacher_remarks'}`` dicts. Every response is checked against its
+    question's points in one query before anything is written; the
+    responses are then written with ``bulk_update``, the affected
+    submissions' progress refreshed and their grade entries upserted as a
+    set. Raises ``ValueError`` with per-response messages when validation
+    fails.
+    """
+    by_id = {item['response_id']: item for item in grades}
+    rows = {
+        row['id']: row for row in QuestionResponse.objects.filter(
+            id__in=list(by_id), submission__assignment=assignment
+        ).values('id', 'submission_id', 'question__points')
+    }
+
+    errors = {}
+    for response_id, item in by_id.items():
+        row = rows.get(response_id)
+        if row is None:
+            errors[response_id] = 'Question response not found'
+        elif item['points_earned'] > row['question__points']:
+            errors[response_id] = f"Points must be between 0 and {row['question__points']}"
+    if errors:
+        raise ValueError(errors)
+
+    graded_at = timezone.now()
+    updates = [
+        QuestionResponse(
+            id=response_id,
+            points_earned=item['points_earned'],
+            is_correct=item['points_earned'] == rows[response_id]['question__points'],
+            graded=True,
+            teacher_remarks=item.get('teacher_remarks', ''),
+            graded_at=graded_at,
+        )
+        for response_id, item in by_id.items()
+    ]
+    submission_ids = sorted({row['submission_id'] for row in rows.values()})
+
+    with transaction.atomic():
+        # Lock in a fixed order so concurrent graders of the same submissions serialize
+        list(AssignmentSubmission.objects.select_for_update().filter(
+            id__in=submission_ids
+        ).order_by('id').values_list('id', flat=True))
+        QuestionResponse.objects.bulk_update(
+            updates,
+            ['points_earned', 'is_correct', 'graded', 'teacher_remarks', 'graded_at'],
+            batch_size=1000,
+        )
+        refresh_grading_progress(submission_ids)
+        grades, rubric_graded = submission_grades(submission_ids)
+        entries = sync_submission_grades(assignment, grades, grader, rubric_graded)
+
+    return {
+        'assignment_id': assignment.id,
+        'responses_graded': len(updates),
+        'submissions_affected': len(submission_ids),
+        'grade_entries_updated': entries,
+        'submissions': list(AssignmentSubmission.objects.filter(id__in=submission_ids).order_by(
+            'id'
+        ).values('id', 'student_id', 'total_score', 'graded_count', 'question_count', 'grading_status')),
+    }
+
+
+def submit_assignment(assignment, student, answer, responses_data):
+    """Create a submission, auto-grade its responses and record the grade.
+
+    Responses are graded in memory against the assignment's cached answer
+    key and written with a single ``bulk_create``, and the stored grading
+    progress and grade entry are computed from those rows in the same
+    transaction, so the query count does not grow with the number of
+    questions.
+
+    Returns ``(submission, created)``; nothing is written when the student
+    has already submitted.
+    """
+    answer_key = get_answer_key(assignment.id)
+
+    with transaction.atomic():
+        submission, created = AssignmentSubmission.objects.get_or_create(
+            assignment=assignment,
+            student=student,
+            defaults={'answer': answer}
+        )
+        if not created:
+            return submission, False
+
+        responses = grade_responses(submission, answer_key, responses_data)
+        QuestionResponse.objects.bulk_create(responses)
+        progress_from_responses(submission, responses, len(answer_key))
+        submission.save(update_fields=PROGRESS_FIELDS)
+
+        if submission.fully_graded:
+            save_submission_grade(submission, submission.total_score)
+
+    return submission, True
@@ -0,0 +1,154 @@
+"""Queued submission ingestion for deadline surges"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .answer_keys import get_answer_key
+from .grading import grade_responses, sync_submission_grades
+from .models import AssignmentSubmission, QuestionResponse
+from .progress import PROGRESS_FIELDS, progress_from_responses
+
+INGEST_BATCH_SIZE = 200
+
+
+def ingestion_queued():
+    """Whether submissions are queued for the workers instead of graded inline"""
+    return settings.SUBMISSION_INGESTION == 'queue'
+
+
+def _raw_responses(responses_data):
+    """The JSON-safe part of the submitted responses, as stored on the queue"""
+    if not isinstance(responses_data, (list, tuple)):
+        return []
+    return [
+        {'question_id': item.get('question_id'), 'response_text': str(item.get('response_text', ''))}
+        for item in responses_data
+        if isinstance(item, dict)
+    ]
+
+
+def enqueue_submission(assignment, student, answer, responses_data):
+    """Record a submission and its raw responses with a single insert.
+
+    The ``(assignment, student)`` unique constraint rejects a second
+    submission and ``is_late`` is set on save as usual; grading is left to
+    ``drain_queue``. Returns ``(submission, created)`` like
+    ``submit_assignment``.
+    """
+    try:
+        with transaction.atomic():
+            submission = AssignmentSubmission.objects.create(
+                assignment=assignment,
+                student=student,
+                answer=answer,
+                grading_status='queued',
+                queued_responses=_raw_responses(responses_data),
+            )
+    except IntegrityError:
+        return None, False
+    return submission, True
+
+
+def drain_batch(batch_size=INGEST_BATCH_SIZE):
+    """Grade the oldest queued submissions in one transaction.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several
+    workers can drain concurrently. Responses for the whole batch are
+    written with one ``bulk_create``, progress with one ``bulk_update`` and
+    grade entries with one upsert per assignment. Returns the number of
+    submissions graded.
+    """
+    with transaction.atomic():
+        submissions = list(
+            AssignmentSubmission.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(grading_status='queued')
+            .select_related('assignment__course')
+            .order_by('submitted_at', 'id')[:batch_size]
+        )
+        if not submissions:
+            return 0
+
+        graded_at = timezone.now()
+        responses = []
+        by_assignment = defaultdict(list)
+        for submission in submissions:
+            answer_key = get_answer_key(submission.assignment_id)
+            graded = grade_responses(submission, answer_key, submission.queued_responses or [], graded_at)
+            progress_from_responses(submission, graded, len(answer_key))
+            submission.queued_responses = None
+            responses.extend(graded)
+            by_assignment[submission.assignment_id].append(submission)
+
+        QuestionResponse.objects.bulk_create(responses, batch_size=1000)
+        AssignmentSubmission.objects.bulk_update(
+            submissions, PROGRESS_FIELDS + ['queued_responses'], batch_size=1000
+        )
+        for batch in by_assignment.values():
+            grades = {s.student_id: s.total_score for s in batch if s.fully_graded}
+            if grades:
+                sync_submission_grades(batch[0].assignment, grades)
+
+    return len(submissions)
+
+
+def drain_queue(batch_size=INGEST_BATCH_SIZE, limit=None):
+    """Grade queued submissions batch by batch until the queue (or ``limit``) is exhausted"""
+    total = 0
+    while limit is None or total < limit:
+        size = batch_size if limit is None else min(batch_size, limit - total)
+        graded = drain_batch(size)
+        if not graded:
+            break
+        total += graded
+    return total
+
+
+def concurrent_drain_supported():
+    """Whether the database can hand disjoint batches to parallel workers"""
+    return connection.features.has_select_for_update_skip_locked
+
+
+def queue_stats(queryset=None):
+    """Depth of the ingestion queue and the age of its oldest submission"""
+    if queryset is None:
+        queryset = AssignmentSubmission.objects.all()
+    stats = queryset.filter(grading_status='queued').aggregate(
+        depth=Count('id'), oldest_submitted_at=Min('submitted_at')
+    )
+    oldest = stats['oldest_submitted_at']
+    stats['lag_seconds'] = (
+        round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0.0
+    )
+    return stats
+
+
+def queue_position(submission):
+    """Number of queued submissions that will be graded before this one"""
+    return AssignmentSubmission.objects.filter(grading_status='queued').filter(
+        Q(submitted_at__lt=submission.submitted_at)
+        | Q(submitted_at=submission.submitted_at, id__lt=submission.id)
+    ).count()
+
+
+def submission_status(submission, position=True):
+    """Polling payload for a submission; queued ones report their place in the queue"""
+    data = {
+        'id': submission.id,
+        'assignment': submission.assignment_id,
+        'submitted_at': submission.submitted_at,
+        'is_late': submission.is_late,
+        'grading_status': submission.grading_status,
+    }
+    if submission.grading_status == 'queued':
+        if position:
+            data['queue_position'] = queue_position(submission)
+    else:
+        data.update(
+            total_score=submission.total_score,
+            graded_count=submission.graded_count,
+            question_count=submission.question_count,
+        )
+    return data
@@ -0,0 +1,204 @@
+"""Classical item analysis of an assignment's response matrix"""
+import warnings
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Sum
+
+from .answer_keys import answer_key_version
+from .models import AssignmentSubmission, Choice, Question, QuestionResponse
+
+ITEM_ANALYSIS_CACHE_TIMEOUT = 60 * 60
+
+
+class ItemMatrix:
+    """Dense submission x question score matrix for one assignment.
+
+    Rows are the assignment's graded or pending submissions (queued ones
+    have no responses yet), columns its questions in display order. A cell
+    holds the points earned, 0 when the student left the question out, or
+    NaN while the response awaits manual grading. Multiple choice
+    selections are kept as parallel ``(row, choice column)`` arrays.
+    Loading costs four queries regardless of the number of submissions.
+    """
+
+    def __init__(self, assignment, submission_ids, questions, choices, responses):
+        self.assignment = assignment
+        self.submission_ids = np.array(sorted(submission_ids), dtype=np.int64)
+        self.questions = list(questions)
+        self.choices = list(choices)
+        self.points = np.array([points for _, _, points in self.questions], dtype=float)
+        self.scores = np.zeros((len(self.submission_ids), len(self.questions)))
+
+        question_ids = np.array([question_id for question_id, _, _ in self.questions], dtype=np.int64)
+        choice_ids = np.array([choice_id for _, choice_id, _, _ in self.choices], dtype=np.int64)
+
+        # One float row per response; None becomes NaN (ungraded points, no valid selection)
+        responses = np.array(list(responses), dtype=float).reshape(-1, 4)
+        rows = _positions(self.submission_ids, responses[:, 0].astype(np.int64))
+        columns = _positions(question_ids, responses[:, 1].astype(np.int64))
+        known = (rows >= 0) & (columns >= 0)
+        self.scores[rows[known], columns[known]] = responses[known, 2]
+
+        has_choice = known & ~np.isnan(responses[:, 3])
+        selection_choices = _positions(choice_ids, responses[has_choice, 3].astype(np.int64))
+        self.selection_rows = rows[has_choice][selection_choices >= 0]
+        self.selection_choices = selection_choices[selection_choices >= 0]
+
+    @classmethod
+    def for_assignment(cls, assignment):
+        submission_ids = AssignmentSubmission.objects.filter(assignment=assignment).exclude(
+            grading_status='queued'
+        ).values_list('id', flat=True)
+        questions = Question.objects.filter(assignment=assignment).order_by('order', 'id').values_list(
+            'id', 'question_type', 'points'
+        )
+        choices = Choice.objects.filter(
+            question__assignment=assignment, question__question_type='multiple_choice'
+        ).order_by('question__order', 'question_id', 'order', 'id').values_list(
+            'question_id', 'id', 'text', 'is_correct'
+        )
+        responses = QuestionResponse.objects.filter(
+            submission__assignment=assignment
+        ).order_by().values_list('submission_id', 'question_id', 'points_earned', 'selected_choice_id')
+        return cls(assignment, submission_ids, questions, choices, responses.iterator(chunk_size=5000))
+
+
+def _positions(known_ids, ids):
+    """Index of each of ``ids`` in the ``known_ids`` array, -1 when absent"""
+    if not len(known_ids):
+        return np.full(len(ids), -1, dtype=np.int64)
+    order = np.argsort(known_ids, kind='stable')
+    found = np.clip(np.searchsorted(known_ids, ids, sorter=order), 0, len(known_ids) - 1)
+    positions = order[found]
+    return np.where(known_ids[positions] == ids, positions, -1)
+
+
+def _correlate(x, y, mask):
+    """Pearson correlation of matching columns of ``x`` and ``y`` over ``mask``ed rows"""
+    n = mask.sum(axis=0)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    dx = np.where(mask, x - x.sum(axis=0) / n, 0.0)
+    dy = np.where(mask, y - y.sum(axis=0) / n, 0.0)
+    return (dx * dy).sum(axis=0) / np.sqrt((dx * dx).sum(axis=0) * (dy * dy).sum(axis=0))
+
+
+def _clean(value):
+    value = float(value)
+    return None if np.isnan(value) or np.isinf(value) else round(value, 4)
+
+
+def compute_item_analysis(matrix):
+    """Difficulty, discrimination, distractor and reliability statistics.
+
+    - ``difficulty`` (p-value) is the mean share of the question's points
+      earned, i.e. the proportion correct for one-point questions.
+    - ``discrimination`` is the point-biserial (Pearson) correlation of the
+      question score with the rest of the student's total, so the question
+      does not correlate with itself.
+    - Each choice reports its selection count and rate and the correlation
+      of choosing it with the total score; good distractors go negative.
+    - ``kr20`` is computed over submissions with every response graded. For
+      questions worth more than one point it is Cronbach's alpha, which
+      reduces to KR-20 for right/wrong items.
+    """
+    scores, points = matrix.scores, matrix.points
+    students, items = scores.shape
+    graded = ~np.isnan(scores)
+
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        # Questions nobody answered (or worth no points) legitimately yield NaN
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+
+        earned = np.nan_to_num(scores)
+        totals = earned.sum(axis=1)
+        difficulty = np.where(graded, earned, 0.0).sum(axis=0) / graded.sum(axis=0) / points
+        discrimination = _correlate(earned, totals[:, None] - earned, graded)
+
+        complete = graded.all(axis=1)
+        complete_scores = scores[complete]
+        total_variance = complete_scores.sum(axis=1).var() if len(complete_scores) else np.nan
+        if items > 1 and len(complete_scores) > 1:
+            kr20 = items / (items - 1) * (1 - complete_scores.var(axis=0).sum() / total_variance)
+        else:
+            kr20 = np.nan
+
+        choice_count = len(matrix.choices)
+        selected = np.zeros((students, choice_count))
+        selected[matrix.selection_rows, matrix.selection_choices] = 1.0
+        choice_counts = selected.sum(axis=0)
+        choice_discrimination = _correlate(selected, totals[:, None], np.ones_like(selected, dtype=bool))
+
+    choices = {}
+    for j, (question_id, choice_id, text, is_correct) in enumerate(matrix.choices):
+        choices.setdefault(question_id, []).append({
+            'choice_id': choice_id,
+            'text': text,
+            'is_correct': is_correct,
+            'count': int(choice_counts[j]),
+            'rate': _clean(choice_counts[j] / students) if students else None,
+            'discrimination': _clean(choice_discrimination[j]),
+        })
+
+    data = []
+    for j, (question_id, question_type, question_points) in enumerate(matrix.questions):
+        item = {
+            'question_id': question_id,
+            'question_type': question_type,
+            'points': question_points,
+            'graded': int(graded[:, j].sum()),
+            'difficulty': _clean(difficulty[j]),
+            'discrimination': _clean(discrimination[j]),
+        }
+        if question_type == 'multiple_choice':
+            item['choices'] = choices.get(question_id, [])
+            item['no_selection'] = students - sum(choice['count'] for choice in item['choices'])
+        data.append(item)
+
+    return {
+        'assignment_id': matrix.assignment.id,
+        'submissions': students,
+        'complete_submissions': int(complete.sum()),
+        'mean_score': _clean(totals.mean()) if students else None,
+        'score_std': _clean(totals.std()) if students else None,
+        'kr20': _clean(kr20),
+        'items': data,
+    }
+
+
+def _grading_stamp(assignment):
+    """Digest of the submissions' grading progress, which changes whenever their responses are graded.
+
+    Reads the denormalized progress columns kept by ``assignments.progress``
+    rather than the response rows, so a cache hit stays one small aggregate.
+    """
+    stamp = AssignmentSubmission.objects.filter(assignment=assignment).exclude(
+        grading_status='queued'
+    ).aggregate(
+        submissions=Count('id'),
+        graded=Sum('graded_count'),
+        scores=Sum(F('total_score') * F('id')),
+        submitted_at=Max('submitted_at'),
+    )
+    submitted_at = stamp['submitted_at'].timestamp() if stamp['submitted_at'] else 0
+    return f"{stamp['submissions']}:{stamp['graded']}:{stamp['scores']}:{submitted_at}"
+
+
+def get_item_analysis(assignment):
+    """Return the cached item analysis for an assignment, computing it on a miss.
+
+    Entries are keyed on the latest submission and the submissions' graded
+    counts and scores, so new submissions, manual grades and regrades all
+    produce a fresh analysis without explicit invalidation. The answer key
+    version, bumped whenever a question or choice is written or removed,
+    covers edits that leave the submissions untouched.
+    """
+    key = 'item_analysis:{}:{}:{}'.format(
+        assignment.id, answer_key_version(assignment.id), _grading_stamp(assignment)
+    )
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = compute_item_analysis(ItemMatrix.for_assignment(assignment))
+        cache.set(key, analysis, ITEM_ANALYSIS_CACHE_TIMEOUT)
+    return analysis
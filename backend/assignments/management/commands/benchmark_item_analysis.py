@@ -0,0 +1,129 @@
+"""Benchmark the item analysis of large synthetic exams"""
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import Account
+from assignments.item_analysis import ItemMatrix, compute_item_analysis, get_item_analysis
+from assignments.models import Assignment, AssignmentSubmission, Choice, Question, QuestionResponse
+from courses.models import Course, CourseMembership
+from users.models import User
+
+
+class _Rollback(Exception):
+    """Raised to discard the synthetic benchmark data"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Build synthetic exams of increasing size and report how long loading the '
+        'response matrix, computing the item statistics and serving a cached '
+        'analysis take. All data is created inside a transaction that is rolled '
+        'back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--submissions', type=int, nargs='+', default=[1000, 10000],
+            help='Submission counts to benchmark (default: 1000 10000)',
+        )
+        parser.add_argument(
+            '--questions', type=int, default=100,
+            help='Multiple choice questions per exam (default: 100)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'submissions':>12} {'questions':>10} {'queries':>8} {'load ms':>10} "
+            f"{'compute ms':>11} {'cached ms':>10} {'kr20':>8}"
+        )
+        try:
+            with transaction.atomic():
+                account = Account.objects.create(name='Item Analysis Benchmark', slug='item-analysis-benchmark')
+                for size in options['submissions']:
+                    assignment = self._build_exam(account, size, options['questions'])
+
+                    with CaptureQueriesContext(connection) as ctx:
+                        started = time.perf_counter()
+                        matrix = ItemMatrix.for_assignment(assignment)
+                        loaded = time.perf_counter()
+                        analysis = compute_item_analysis(matrix)
+                        computed = time.perf_counter()
+                    get_item_analysis(assignment)
+                    cached_started = time.perf_counter()
+                    get_item_analysis(assignment)
+                    cached = time.perf_counter()
+
+                    self.stdout.write(
+                        f"{size:>12} {options['questions']:>10} {len(ctx.captured_queries):>8} "
+                        f"{(loaded - started) * 1000:>10.1f} {(computed - loaded) * 1000:>11.1f} "
+                        f"{(cached - cached_started) * 1000:>10.1f} {analysis['kr20']!s:>8}"
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _build_exam(self, account, submissions, questions):
+        """Create an exam answered by students of varying ability"""
+        rng = np.random.default_rng(submissions)
+        course = Course.unscoped.create(
+            account=account, code=f'ITEMS-{submissions}', name=f'Item analysis {submissions}'
+        )
+        users = [
+            User(account=account, email=f'item-bench-{submissions}-{i}@example.com')
+            for i in range(submissions)
+        ]
+        for user in users:
+            user.set_unusable_password()
+        users = User.objects.bulk_create(users, batch_size=2000)
+        CourseMembership.objects.bulk_create([
+            CourseMembership(user=user, course=course, role='student') for user in users
+        ], batch_size=2000)
+
+        assignment = Assignment.objects.create(
+            course=course, type='test', title='Benchmark exam',
+            due_date=timezone.now() + timedelta(days=7), points_possible=questions,
+        )
+        items = Question.objects.bulk_create([
+            Question(
+                assignment=assignment, question_type='multiple_choice',
+                text=f'Question {j}', points=1, order=j,
+            )
+            for j in range(questions)
+        ])
+        choices = Choice.objects.bulk_create([
+            Choice(question=question, text=f'Option {k}', is_correct=k == 0, order=k)
+            for question in items
+            for k in range(4)
+        ])
+
+        # Students answer correctly with a probability that grows with ability minus difficulty
+        ability = rng.normal(size=(submissions, 1))
+        difficulty = rng.normal(size=(1, questions))
+        correct = rng.random((submissions, questions)) < 1 / (1 + np.exp(difficulty - ability))
+        wrong_choice = rng.integers(1, 4, size=(submissions, questions))
+
+        rows = []
+        for i, user in enumerate(users):
+            submission = AssignmentSubmission(assignment=assignment, student=user)
+            submission.set_grading_progress(int(correct[i].sum()), questions, questions)
+            rows.append(submission)
+        rows = AssignmentSubmission.objects.bulk_create(rows, batch_size=2000)
+        graded_at = timezone.now()
+        for start in range(0, submissions, 500):
+            responses = []
+            for i in range(start, min(start + 500, submissions)):
+                for j, question in enumerate(items):
+                    choice = choices[j * 4 + (0 if correct[i, j] else wrong_choice[i, j])]
+                    responses.append(QuestionResponse(
+                        submission=rows[i], question=question, response_text=str(choice.id),
+                        selected_choice=choice, is_correct=bool(correct[i, j]),
+                        points_earned=int(correct[i, j]), graded=True, graded_at=graded_at,
+                    ))
+            QuestionResponse.objects.bulk_create(responses, batch_size=2000)
+        return assignment
@@ -0,0 +1,118 @@
+"""Compare the nested submissions listing with the normalized grading roster"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from assignments.models import Assignment, AssignmentSubmission, Choice, Question, QuestionResponse
+from courses.models import Course, CourseMembership
+from users.models import User
+
+
+class _Rollback(Exception):
+    """Raised to discard the synthetic benchmark data"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Build synthetic quizzes of increasing roster size and report the payload '
+        'size, query count and latency of the submissions listing versus the '
+        'normalized roster endpoint. All data is created inside a transaction '
+        'that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rosters', type=int, nargs='+', default=[30, 100, 300],
+            help='Submission counts to benchmark (default: 30 100 300)',
+        )
+        parser.add_argument(
+            '--questions', type=int, default=40,
+            help='Multiple choice questions per quiz (default: 40)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'endpoint':>12} {'students':>10} {'questions':>10} {'queries':>8} {'KiB':>10} {'ms':>10}"
+        )
+        try:
+            with transaction.atomic():
+                account = Account.objects.create(name='Roster Benchmark', slug='roster-benchmark')
+                instructor = User.objects.create(account=account, email='roster-bench-instructor@example.com')
+                client = APIClient(SERVER_NAME='localhost')
+                client.force_authenticate(instructor)
+                client.credentials(HTTP_X_ACCOUNT_SLUG=account.slug)
+
+                for size in options['rosters']:
+                    assignment = self._build_quiz(account, instructor, size, options['questions'])
+                    for endpoint in ('submissions', 'roster'):
+                        with CaptureQueriesContext(connection) as ctx:
+                            started = time.perf_counter()
+                            response = client.get(f'/api/assignments/{assignment.id}/{endpoint}/')
+                            if response.streaming:
+                                body = b''.join(response.streaming_content)
+                            else:
+                                body = response.content
+                            elapsed = (time.perf_counter() - started) * 1000
+                        self.stdout.write(
+                            f"{endpoint:>12} {size:>10} {options['questions']:>10} "
+                            f"{len(ctx.captured_queries):>8} {len(body) / 1024:>10.1f} {elapsed:>10.1f}"
+                        )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _build_quiz(self, account, instructor, students, questions):
+        """Create a quiz with every student's submission fully answered"""
+        course = Course.unscoped.create(
+            account=account, code=f'ROSTER-{students}', name=f'Roster {students}'
+        )
+        CourseMembership.objects.create(user=instructor, course=course, role='instructor')
+
+        users = [
+            User(account=account, email=f'roster-bench-{students}-{i}@example.com')
+            for i in range(students)
+        ]
+        for user in users:
+            user.set_unusable_password()
+        users = User.objects.bulk_create(users)
+        CourseMembership.objects.bulk_create([
+            CourseMembership(user=user, course=course, role='student') for user in users
+        ])
+
+        assignment = Assignment.objects.create(
+            course=course, type='quiz', title='Benchmark quiz',
+            due_date=timezone.now() + timedelta(days=7), points_possible=questions,
+        )
+        items = Question.objects.bulk_create([
+            Question(
+                assignment=assignment, question_type='multiple_choice',
+                text=f'Question {j}', points=1, order=j,
+            )
+            for j in range(questions)
+        ])
+        Choice.objects.bulk_create([
+            Choice(question=question, text=f'Option {k}', is_correct=k == 0, order=k)
+            for question in items
+            for k in range(4)
+        ])
+
+        submissions = AssignmentSubmission.objects.bulk_create([
+            AssignmentSubmission(assignment=assignment, student=user) for user in users
+        ])
+        graded_at = timezone.now()
+        QuestionResponse.objects.bulk_create([
+            QuestionResponse(
+                submission=submission, question=question, response_text=str((i + j) % 4),
+                is_correct=(i + j) % 4 == 0, points_earned=int((i + j) % 4 == 0),
+                graded=True, graded_at=graded_at,
+            )
+            for i, submission in enumerate(submissions)
+            for j, question in enumerate(items)
+        ], batch_size=2000)
+        return assignment
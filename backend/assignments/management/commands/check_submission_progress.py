@@ -0,0 +1,55 @@
+"""Verify and repair the denormalized grading progress of submissions"""
+from django.core.management.base import BaseCommand, CommandError
+
+from assignments.models import Assignment, AssignmentSubmission
+from assignments.progress import PROGRESS_FIELDS, PROGRESS_BATCH_SIZE, stale_progress
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the stored total_score, graded_count, question_count and '
+        'grading_status of submissions with their question responses, and '
+        'optionally rewrite the rows that drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assignment', type=int, nargs='+', dest='assignment_ids',
+            help='Only check submissions of these assignment IDs (default: every submission)',
+        )
+        parser.add_argument(
+            '--repair', action='store_true',
+            help='Write the recomputed values for submissions that are out of date',
+        )
+
+    def handle(self, *args, **options):
+        submissions = AssignmentSubmission.objects.all()
+        if options['assignment_ids']:
+            found = set(Assignment.objects.filter(
+                id__in=options['assignment_ids']
+            ).values_list('id', flat=True))
+            missing = set(options['assignment_ids']) - found
+            if missing:
+                raise CommandError(f"Unknown assignment IDs: {', '.join(map(str, sorted(missing)))}")
+            submissions = submissions.filter(assignment_id__in=options['assignment_ids'])
+
+        stale = []
+        for submission in stale_progress(submissions):
+            stale.append(submission)
+            self.stdout.write(
+                f'Submission {submission.id} should have ' + ', '.join(
+                    f'{field}={getattr(submission, field)}' for field in PROGRESS_FIELDS
+                )
+            )
+
+        if not stale:
+            self.stdout.write(self.style.SUCCESS('All submission progress columns are consistent'))
+            return
+        if not options['repair']:
+            self.stdout.write(self.style.WARNING(
+                f'{len(stale)} submissions out of date; rerun with --repair to fix them'
+            ))
+            return
+
+        AssignmentSubmission.objects.bulk_update(stale, PROGRESS_FIELDS, batch_size=PROGRESS_BATCH_SIZE)
+        self.stdout.write(self.style.SUCCESS(f'Repaired {len(stale)} submissions'))
@@ -0,0 +1,125 @@
+"""Grade submissions recorded in queued ingestion mode"""
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from assignments.ingestion import (
+    INGEST_BATCH_SIZE, concurrent_drain_supported, drain_batch, queue_stats,
+)
+
+# Longest a worker waits before retrying after consecutive failed batches
+MAX_FAILURE_BACKOFF = 60.0
+
+
+class Command(BaseCommand):
+    help = (
+        'Drain the submission ingestion queue with a pool of local workers, '
+        'auto-grading queued submissions and writing their grade entries in '
+        'batches. Runs until interrupted unless --once is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Worker threads claiming batches in parallel (default: 4)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=INGEST_BATCH_SIZE,
+            help=f'Submissions graded per transaction (default: {INGEST_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds an idle worker waits before polling again (default: 1)',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit as soon as the queue is empty',
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Print queue depth and lag, then exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self._write_stats()
+            return
+
+        workers = max(1, options['workers'])
+        if workers > 1 and not concurrent_drain_supported():
+            self.stderr.write(
+                f'{connection.vendor} cannot skip locked rows; draining with a single worker.'
+            )
+            workers = 1
+
+        self._write_stats()
+        stop = threading.Event()
+        graded = [0] * workers
+        failed = [0] * workers
+        threads = [
+            threading.Thread(
+                target=self._work, args=(i, graded, failed, stop, options), name=f'ingest-{i}', daemon=True
+            )
+            for i in range(workers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        elapsed = time.perf_counter() - started
+        summary = f'Graded {sum(graded)} submission(s) with {workers} worker(s) in {elapsed:.1f}s'
+        if sum(failed):
+            self.stderr.write(self.style.ERROR(f'{summary}; {sum(failed)} batch(es) failed.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{summary}.'))
+        self._write_stats()
+
+    def _work(self, index, graded, failed, stop, options):
+        """Claim and grade batches until stopped (or, with --once, until the queue is empty).
+
+        A failed batch is rolled back and reported; the worker then backs
+        off, doubling the wait while failures repeat, and tries again. With
+        --once it stops instead, as it would only claim the same rows again.
+        """
+        failures = 0
+        try:
+            while not stop.is_set():
+                try:
+                    count = drain_batch(options['batch_size'])
+                except Exception as exc:
+                    failed[index] += 1
+                    failures += 1
+                    self.stderr.write(f'{threading.current_thread().name}: batch failed: {exc!r}')
+                    # Drop a connection the error may have left unusable
+                    connection.close()
+                    if options['once']:
+                        return
+                    stop.wait(min(options['poll_interval'] * 2 ** failures, MAX_FAILURE_BACKOFF))
+                    continue
+                failures = 0
+                graded[index] += count
+                if count:
+                    continue
+                if options['once']:
+                    return
+                stop.wait(options['poll_interval'])
+        finally:
+            connection.close()
+
+    def _write_stats(self):
+        stats = queue_stats()
+        oldest = stats['oldest_submitted_at']
+        self.stdout.write(
+            f"Queue depth: {stats['depth']}, lag: {stats['lag_seconds']}s"
+            + (f', oldest submitted at {oldest.isoformat()}' if oldest else '')
+        )
@@ -0,0 +1,28 @@
+"""Write autosaved drafts that only live in the cache to the database"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from assignments.drafts import flush_drafts
+
+
+class Command(BaseCommand):
+    help = (
+        'Flush cached submission draft revisions that have not reached the '
+        'database yet. Run it every minute or so (e.g. from cron) so an '
+        'evicted or lost cache entry costs at most that much typing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since-minutes', type=int,
+            help='Only consider drafts flushed within this many minutes (default: the draft cache lifetime)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since_minutes'] is not None:
+            since = timezone.now() - timedelta(minutes=options['since_minutes'])
+        written = flush_drafts(since)
+        self.stdout.write(self.style.SUCCESS(f'Flushed {written} draft(s).'))
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.9 on 2026-10-17 00:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_announcement'),
+        ('assignments', '0004_assignment_rubric'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssignmentGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('weight', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('drop_lowest', models.PositiveIntegerField(default=0)),
+                ('order', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignment_groups', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Assignment Group',
+                'verbose_name_plural': 'Assignment Groups',
+                'db_table': 'assignment_groups',
+                'ordering': ['order', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='group',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assignments', to='assignments.assignmentgroup'),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentgroup',
+            index=models.Index(fields=['course'], name='assignment__course__e8d125_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.9 on 2026-10-17 01:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_grading_progress(apps, schema_editor):
+    """Populate the progress columns from existing responses"""
+    AssignmentSubmission = apps.get_model('assignments', 'AssignmentSubmission')
+    Question = apps.get_model('assignments', 'Question')
+
+    graded = Q(question_responses__graded=True)
+    questions = Question.objects.filter(assignment=OuterRef('assignment')).order_by().values(
+        'assignment'
+    ).annotate(total=Count('id')).values('total')
+    rows = AssignmentSubmission.objects.annotate(
+        computed_score=Coalesce(Sum('question_responses__points_earned', filter=graded), 0),
+        computed_graded=Count('question_responses', filter=graded),
+        computed_questions=Coalesce(Subquery(questions), 0),
+    ).order_by('id').only('id')
+
+    batch = []
+    for submission in rows.iterator(chunk_size=1000):
+        question_count, graded_count = submission.computed_questions, submission.computed_graded
+        submission.total_score = submission.computed_score
+        submission.graded_count = graded_count
+        submission.question_count = question_count
+        if question_count == 0 or graded_count == question_count:
+            submission.grading_status = 'complete'
+        elif graded_count == 0:
+            submission.grading_status = 'pending'
+        else:
+            submission.grading_status = 'partial'
+        batch.append(submission)
+        if len(batch) == 1000:
+            AssignmentSubmission.objects.bulk_update(
+                batch, ['total_score', 'graded_count', 'question_count', 'grading_status']
+            )
+            batch = []
+    AssignmentSubmission.objects.bulk_update(
+        batch, ['total_score', 'graded_count', 'question_count', 'grading_status']
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0005_assignmentgroup_assignment_group_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignmentsubmission',
+            name='graded_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='assignmentsubmission',
+            name='grading_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('partial', 'Partial'), ('complete', 'Complete')], default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='assignmentsubmission',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='assignmentsubmission',
+            name='total_score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentsubmission',
+            index=models.Index(fields=['assignment', 'grading_status'], name='assignment__assignm_4435bc_idx'),
+        ),
+        migrations.RunPython(backfill_grading_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-17 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0006_submission_grading_progress'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignmentsubmission',
+            index=models.Index(fields=['-submitted_at', '-id'], name='assignment__submitt_4dbd48_idx'),
+        ),
+    ]
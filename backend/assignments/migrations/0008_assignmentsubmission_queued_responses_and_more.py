@@ -0,0 +1,27 @@
+# Generated by Django 4.2.9 on 2026-10-17 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0007_assignmentsubmission_assignment__submitt_4dbd48_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignmentsubmission',
+            name='queued_responses',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='assignmentsubmission',
+            name='grading_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('partial', 'Partial'), ('complete', 'Complete'), ('queued', 'Queued')], default='pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentsubmission',
+            index=models.Index(fields=['grading_status', 'submitted_at'], name='assignment__grading_e25978_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.9 on 2026-10-17 01:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('assignments', '0008_assignmentsubmission_queued_responses_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionDraft',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer', models.TextField(blank=True, default='')),
+                ('responses', models.JSONField(blank=True, default=dict)),
+                ('revision', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='drafts', to='assignments.assignment')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_drafts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Submission Draft',
+                'verbose_name_plural': 'Submission Drafts',
+                'db_table': 'submission_drafts',
+                'unique_together': {('assignment', 'student')},
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.9 on 2026-10-17 01:24
+
+import math
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BACKFILL_BATCH_SIZE = 2000
+
+
+def _typed_answer(question_type, response_text, choices, question_id):
+    """``(selected_choice_id, numeric_value)`` as parsed on submit"""
+    try:
+        if question_type == 'multiple_choice':
+            choice_id = int(response_text)
+            return (choice_id if (question_id, choice_id) in choices else None), None
+        value = float(response_text)
+        return None, (value if math.isfinite(value) else None)
+    except (ValueError, TypeError):
+        return None, None
+
+
+def backfill_typed_answers(apps, schema_editor):
+    """Parse existing multiple choice and numerical answers into the typed columns, in id batches"""
+    QuestionResponse = apps.get_model('assignments', 'QuestionResponse')
+    Choice = apps.get_model('assignments', 'Choice')
+
+    responses = QuestionResponse.objects.filter(
+        question__question_type__in=['multiple_choice', 'numerical']
+    ).order_by('id').values_list('id', 'question_id', 'question__question_type', 'response_text')
+    last_id = 0
+    while True:
+        rows = list(responses.filter(id__gt=last_id)[:BACKFILL_BATCH_SIZE])
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        question_ids = {question_id for _, question_id, question_type, _ in rows if question_type == 'multiple_choice'}
+        choices = set(Choice.objects.filter(question_id__in=question_ids).values_list('question_id', 'id'))
+        updates = []
+        for response_id, question_id, question_type, response_text in rows:
+            selected_choice_id, numeric_value = _typed_answer(question_type, response_text, choices, question_id)
+            if selected_choice_id is not None or numeric_value is not None:
+                updates.append(QuestionResponse(
+                    id=response_id, selected_choice_id=selected_choice_id, numeric_value=numeric_value
+                ))
+        QuestionResponse.objects.bulk_update(updates, ['selected_choice', 'numeric_value'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0009_submissiondraft'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionresponse',
+            name='numeric_value',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='questionresponse',
+            name='selected_choice',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='selections', to='assignments.choice'),
+        ),
+        migrations.AddIndex(
+            model_name='questionresponse',
+            index=models.Index(fields=['question', 'selected_choice'], name='question_re_questio_07f4f0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionresponse',
+            index=models.Index(fields=['question', 'numeric_value'], name='question_re_questio_9fc24b_idx'),
+        ),
+        migrations.RunPython(backfill_typed_answers, migrations.RunPython.noop),
+    ]
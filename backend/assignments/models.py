@@ -4,6 +4,58 @@ from courses.models import Course
 from users.models import User
 
 
+# Question types graded automatically against the answer key
+AUTO_GRADED_TYPES = ('multiple_choice', 'numerical')
+
+
+GRADING_STATUS_CHOICES = [
+    ('pending', 'Pending'),
+    ('partial', 'Partial'),
+    ('complete', 'Complete'),
+    ('queued', 'Queued'),  # Received, waiting for the ingestion workers to grade it
+]
+
+
+def grading_status_for(question_count, graded_count):
+    """Grading status of a submission with ``graded_count`` of ``question_count`` questions graded"""
+    if question_count == 0:
+        return 'complete'  # No questions to grade
+    if graded_count == 0:
+        return 'pending'
+    if graded_count == question_count:
+        return 'complete'
+    return 'partial'
+
+
+class AssignmentGroup(models.Model):
+    """Weighted grading category within a course (e.g. 'Homework - 20%')"""
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='assignment_groups',
+        db_index=True
+    )
+    name = models.CharField(max_length=200)
+    weight = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    drop_lowest = models.PositiveIntegerField(default=0)
+    order = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'assignment_groups'
+        verbose_name = 'Assignment Group'
+        verbose_name_plural = 'Assignment Groups'
+        ordering = ['order', 'id']
+        indexes = [
+            models.Index(fields=['course']),
+        ]
+
+    def __str__(self):
+        return f"{self.course.code} - {self.name} ({self.weight}%)"
+
+
 class Assignment(models.Model):
     """Base assignment model"""
     
@@ -27,6 +79,14 @@ class Assignment(models.Model):
         blank=True,
         db_index=True,
     )
+    group = models.ForeignKey(
+        AssignmentGroup,
+        on_delete=models.SET_NULL,
+        related_name='assignments',
+        null=True,
+        blank=True,
+        db_index=True,
+    )
     type = models.CharField(
         max_length=20, 
         choices=TYPE_CHOICES,
@@ -90,7 +150,7 @@ class Assignment(models.Model):
         questions = self.questions.all()
         if not questions.exists():
             return False
-        return all(q.question_type in ['multiple_choice', 'numerical'] for q in questions)
+        return all(q.question_type in AUTO_GRADED_TYPES for q in questions)
 
 
 class QuizManager(models.Manager):
@@ -242,6 +302,14 @@ class AssignmentSubmission(models.Model):
     answer = models.TextField(blank=True, default='')
     submitted_at = models.DateTimeField(auto_now_add=True, db_index=True)
     is_late = models.BooleanField(default=False)
+
+    # Denormalized grading progress, maintained by assignments.progress
+    total_score = models.IntegerField(default=0)
+    graded_count = models.PositiveIntegerField(default=0)
+    question_count = models.PositiveIntegerField(default=0)
+    grading_status = models.CharField(max_length=10, choices=GRADING_STATUS_CHOICES, default='pending')
+    # Raw responses of a queued submission, cleared once assignments.ingestion grades them
+    queued_responses = models.JSONField(null=True, blank=True)
     
     class Meta:
         db_table = 'assignment_submissions'
@@ -253,6 +321,9 @@ class AssignmentSubmission(models.Model):
             models.Index(fields=['assignment']),
             models.Index(fields=['student']),
             models.Index(fields=['submitted_at']),
+            models.Index(fields=['assignment', 'grading_status']),
+            models.Index(fields=['-submitted_at', '-id']),
+            models.Index(fields=['grading_status', 'submitted_at']),
         ]
     
     def __str__(self):
@@ -264,10 +335,20 @@ class AssignmentSubmission(models.Model):
             self.is_late = timezone.now() > self.assignment.due_date
         super().save(*args, **kwargs)
     
+    def _graded_responses(self):
+        """Graded responses, served from prefetched rows when they are loaded"""
+        if 'question_responses' in getattr(self, '_prefetched_objects_cache', {}):
+            return [r for r in self.question_responses.all() if r.graded]
+        return self.question_responses.filter(graded=True)
+
     def calculate_score(self):
-        """Calculate total score from graded question responses"""
+        """Calculate total score from graded question responses.
+
+        Recomputed from the responses; serializers read the stored
+        ``total_score`` column instead.
+        """
         total = 0
-        for response in self.question_responses.filter(graded=True):
+        for response in self._graded_responses():
             if response.points_earned is not None:
                 total += response.points_earned
         return total
@@ -275,21 +356,62 @@ class AssignmentSubmission(models.Model):
     def is_fully_graded(self):
         """Check if all question responses have been graded"""
         total_questions = self.assignment.questions.count()
-        graded_responses = self.question_responses.filter(graded=True).count()
+        graded_responses = len(self._graded_responses())
         return total_questions > 0 and total_questions == graded_responses
     
     def get_grading_status(self):
         """Get grading status: 'complete', 'partial', or 'pending'"""
         total_questions = self.assignment.questions.count()
-        graded_responses = self.question_responses.filter(graded=True).count()
-        
-        if total_questions == 0:
-            return 'complete'  # No questions to grade
-        if graded_responses == 0:
-            return 'pending'
-        if graded_responses == total_questions:
-            return 'complete'
-        return 'partial'
+        graded_responses = len(self._graded_responses())
+        return grading_status_for(total_questions, graded_responses)
+
+    @property
+    def fully_graded(self):
+        """Stored counterpart of ``is_fully_graded()``"""
+        return self.question_count > 0 and self.graded_count == self.question_count
+
+    def set_grading_progress(self, total_score, graded_count, question_count):
+        """Set the denormalized progress columns (the caller saves them)"""
+        self.total_score = total_score
+        self.graded_count = graded_count
+        self.question_count = question_count
+        self.grading_status = grading_status_for(question_count, graded_count)
+
+
+class SubmissionDraft(models.Model):
+    """In-progress answers of a student's attempt, autosaved before submit.
+
+    Saves land in the cache first (see ``assignments.drafts``); this row is
+    the periodically flushed copy, promoted to ``QuestionResponse`` rows on
+    submit.
+    """
+    
+    assignment = models.ForeignKey(
+        Assignment,
+        on_delete=models.CASCADE,
+        related_name='drafts',
+        db_index=True
+    )
+    student = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='submission_drafts',
+        db_index=True
+    )
+    answer = models.TextField(blank=True, default='')
+    # Question ID (as a string) -> response text
+    responses = models.JSONField(default=dict, blank=True)
+    revision = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    class Meta:
+        db_table = 'submission_drafts'
+        verbose_name = 'Submission Draft'
+        verbose_name_plural = 'Submission Drafts'
+        unique_together = [['assignment', 'student']]
+    
+    def __str__(self):
+        return f"Draft of {self.assignment_id} by {self.student_id} (rev {self.revision})"
 
 
 class QuestionResponse(models.Model):
@@ -308,6 +430,15 @@ class QuestionResponse(models.Model):
         db_index=True
     )
     response_text = models.TextField(blank=True, default='')
+    # Typed copies of auto-gradable answers, parsed once when the response is written
+    selected_choice = models.ForeignKey(
+        Choice,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='selections'
+    )
+    numeric_value = models.FloatField(null=True, blank=True)
     is_correct = models.BooleanField(null=True, blank=True)
     points_earned = models.IntegerField(null=True, blank=True)
     graded = models.BooleanField(default=False)
@@ -323,6 +454,8 @@ class QuestionResponse(models.Model):
             models.Index(fields=['submission']),
             models.Index(fields=['question']),
             models.Index(fields=['graded']),
+            models.Index(fields=['question', 'selected_choice']),
+            models.Index(fields=['question', 'numeric_value']),
         ]
     
     def __str__(self):
@@ -330,52 +463,21 @@ class QuestionResponse(models.Model):
     
     def auto_grade(self):
         """Automatically grade multiple choice and numerical questions"""
-        question = self.question
-        
-        if question.question_type == 'multiple_choice':
-            # Check if selected choice is correct
-            try:
-                selected_choice_id = int(self.response_text)
-                correct_choice = question.choices.filter(is_correct=True).first()
-                if correct_choice and selected_choice_id == correct_choice.id:
-                    self.is_correct = True
-                    self.points_earned = question.points
-                else:
-                    self.is_correct = False
-                    self.points_earned = 0
-                self.graded = True
-                self.graded_at = timezone.now()
-            except (ValueError, TypeError):
-                # Invalid response, mark as incorrect
-                self.is_correct = False
-                self.points_earned = 0
-                self.graded = True
-                self.graded_at = timezone.now()
-        
-        elif question.question_type == 'numerical':
-            # Check if answer is within tolerance
-            try:
-                student_answer = float(self.response_text)
-                correct_answer = question.correct_answer_numeric
-                tolerance = question.numeric_tolerance
-                
-                if correct_answer is not None and abs(student_answer - correct_answer) <= tolerance:
-                    self.is_correct = True
-                    self.points_earned = question.points
-                else:
-                    self.is_correct = False
-                    self.points_earned = 0
-                self.graded = True
-                self.graded_at = timezone.now()
-            except (ValueError, TypeError):
-                # Invalid response, mark as incorrect
-                self.is_correct = False
-                self.points_earned = 0
-                self.graded = True
-                self.graded_at = timezone.now()
-        
+        from .answer_keys import build_answer_key, get_answer_key
+
+        answer_key = get_answer_key(self.question.assignment_id)
+        if self.question_id not in answer_key:
+            # Question created in a transaction that has not committed yet
+            answer_key = build_answer_key(self.question.assignment_id)
+        self.selected_choice_id, self.numeric_value = answer_key.parse(self.question_id, self.response_text)
+        result = answer_key.grade_parsed(self.question_id, self.selected_choice_id, self.numeric_value)
+
         # Text responses are not auto-graded
         # They remain with graded=False until manual grading
-        
+        if result is not None:
+            self.is_correct, self.points_earned = result
+            self.graded = True
+            self.graded_at = timezone.now()
+
         self.save()
         return self.graded
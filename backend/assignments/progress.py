@@ -0,0 +1,86 @@
+"""Denormalized grading progress columns on assignment submissions"""
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import AssignmentSubmission, Question
+
+PROGRESS_FIELDS = ['total_score', 'graded_count', 'question_count', 'grading_status']
+PROGRESS_BATCH_SIZE = 1000
+
+
+def with_computed_progress(queryset):
+    """Annotate submissions with their grading progress as computed from the responses"""
+    graded = Q(question_responses__graded=True)
+    questions = Question.objects.filter(assignment=OuterRef('assignment')).order_by().values(
+        'assignment'
+    ).annotate(total=Count('id')).values('total')
+    return queryset.annotate(
+        computed_score=Coalesce(Sum('question_responses__points_earned', filter=graded), 0),
+        computed_graded=Count('question_responses', filter=graded),
+        computed_questions=Coalesce(Subquery(questions), 0),
+    )
+
+
+def _apply_computed(submission):
+    """Copy computed progress onto the stored columns; True when anything changed"""
+    before = [getattr(submission, field) for field in PROGRESS_FIELDS]
+    submission.set_grading_progress(
+        submission.computed_score, submission.computed_graded, submission.computed_questions
+    )
+    return before != [getattr(submission, field) for field in PROGRESS_FIELDS]
+
+
+def stale_progress(queryset):
+    """Yield submissions whose stored progress differs from their responses.
+
+    Yielded instances already carry the corrected values, unsaved. Queued
+    submissions have no responses yet and are left to the ingestion workers.
+    """
+    queryset = queryset.exclude(grading_status='queued')
+    rows = with_computed_progress(queryset.order_by('id')).only('id', *PROGRESS_FIELDS)
+    for submission in rows.iterator(chunk_size=PROGRESS_BATCH_SIZE):
+        if _apply_computed(submission):
+            yield submission
+
+
+def refresh_grading_progress(submission_ids):
+    """Recompute and store the progress columns of many submissions.
+
+    Only rows whose values changed are written, with ``bulk_update``.
+    Returns the number of submissions updated.
+    """
+    submission_ids = list(submission_ids)
+    changed = []
+    for start in range(0, len(submission_ids), PROGRESS_BATCH_SIZE):
+        batch = AssignmentSubmission.objects.filter(
+            id__in=submission_ids[start:start + PROGRESS_BATCH_SIZE]
+        )
+        changed.extend(stale_progress(batch))
+    AssignmentSubmission.objects.bulk_update(changed, PROGRESS_FIELDS, batch_size=PROGRESS_BATCH_SIZE)
+    return len(changed)
+
+
+def update_submission_progress(submission):
+    """Recompute one submission's progress in place and save it.
+
+    The submission row is locked first so concurrent graders of the same
+    submission serialize, and the last one to commit sees every response.
+    Call inside a transaction.
+    """
+    # Locked on its own: FOR UPDATE cannot be combined with the aggregates
+    AssignmentSubmission.objects.select_for_update().filter(pk=submission.pk).values_list('pk').get()
+    computed = with_computed_progress(AssignmentSubmission.objects.filter(pk=submission.pk)).values_list(
+        'computed_score', 'computed_graded', 'computed_questions'
+    ).get()
+    submission.set_grading_progress(*computed)
+    submission.save(update_fields=PROGRESS_FIELDS)
+    return submission
+
+
+def progress_from_responses(submission, responses, question_count):
+    """Set progress from freshly graded, unsaved responses (no queries)"""
+    graded = [response for response in responses if response.graded]
+    submission.set_grading_progress(
+        sum(response.points_earned or 0 for response in graded), len(graded), question_count
+    )
+
@@ -0,0 +1,181 @@
+"""Bulk regrading of auto-graded responses after an answer key or point change"""
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .answer_keys import get_answer_key
+from .grading import sync_submission_grades
+from .models import AUTO_GRADED_TYPES, AssignmentSubmission, QuestionResponse
+from .progress import refresh_grading_progress
+
+REGRADE_BATCH_SIZE = 2000
+
+
+def _batches(items, size=REGRADE_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _submission_totals(submission_ids):
+    """Current score, graded count, student and rubric total per submission"""
+    totals = {}
+    for batch in _batches(submission_ids):
+        rows = QuestionResponse.objects.filter(submission_id__in=batch).values(
+            'submission_id'
+        ).annotate(
+            score=Sum('points_earned', filter=Q(graded=True)),
+            graded=Count('id', filter=Q(graded=True)),
+        ).order_by()
+        for row in rows:
+            totals[row['submission_id']] = {
+                'score': row['score'] or 0, 'graded': row['graded'], 'rubric': None,
+            }
+        submissions = AssignmentSubmission.objects.filter(id__in=batch).values_list(
+            'id', 'student_id', 'rubric_assessments__total_score'
+        )
+        for submission_id, student_id, rubric_total in submissions:
+            entry = totals.setdefault(submission_id, {'score': 0, 'graded': 0, 'rubric': None})
+            entry['student_id'] = student_id
+            if rubric_total is not None and entry['rubric'] is None:
+                entry['rubric'] = int(rubric_total)
+    return totals
+
+
+def regrade_assignment(assignment, question_ids=None, dry_run=False):
+    """Re-evaluate every auto-gradable response of an assignment against its current key.
+
+    Restricting ``question_ids`` regrades only those questions. The typed
+    answer columns of all responses are compared against the answer key as
+    arrays, with no parsing of response text; changed rows
+    are written back with ``bulk_update``, and the affected submissions'
+    stored progress and students' grade entries recomputed in batches.
+    With ``dry_run`` nothing is written.
+
+    Returns a summary of what changed (or would change). Raises
+    ``ValueError`` for question IDs that are not auto-gradable questions of
+    the assignment.
+    """
+    answer_key = get_answer_key(assignment.id)
+    gradable = [
+        question_id for question_id, question_type
+        in zip(answer_key.question_ids, answer_key.question_types)
+        if question_type in AUTO_GRADED_TYPES
+    ]
+    if question_ids is not None:
+        requested = set(question_ids)
+        unknown = requested - set(gradable)
+        if unknown:
+            raise ValueError(
+                f"Not auto-gradable questions of this assignment: {sorted(unknown)}"
+            )
+        gradable = [question_id for question_id in gradable if question_id in requested]
+
+    rows = list(QuestionResponse.objects.filter(question_id__in=gradable).order_by('id').values_list(
+        'id', 'submission_id', 'question_id', 'selected_choice_id', 'numeric_value',
+        'is_correct', 'points_earned', 'graded'
+    ))
+    summary = {
+        'assignment_id': assignment.id,
+        'dry_run': dry_run,
+        'question_ids': gradable,
+        'responses_checked': len(rows),
+        'responses_changed': 0,
+        'newly_correct': 0,
+        'newly_incorrect': 0,
+        'points_delta': 0,
+        'submissions_affected': 0,
+        'grade_entries_updated': 0,
+        'questions': [],
+        'submissions': [],
+    }
+    if not rows:
+        return summary
+
+    (response_ids, submission_ids, row_questions, selected_choices, numeric_values,
+     old_correct, old_points, old_graded) = zip(*rows)
+    new_correct, new_points, _ = answer_key.grade_many(row_questions, selected_choices, numeric_values)
+
+    was_graded = np.array(old_graded, dtype=bool)
+    was_correct = np.array([value is True for value in old_correct])
+    previous_points = np.array(
+        [points if graded and points is not None else 0 for points, graded in zip(old_points, old_graded)]
+    )
+    stored_points = np.array([-1 if points is None else points for points in old_points])
+    changed = ~was_graded | (was_correct != new_correct) | (stored_points != new_points)
+    newly_correct = changed & new_correct & ~was_correct
+    newly_incorrect = changed & ~new_correct & was_correct
+    point_deltas = new_points - previous_points
+
+    row_questions = np.array(row_questions)
+    for question_id in gradable:
+        mask = row_questions == question_id
+        summary['questions'].append({
+            'question_id': question_id,
+            'responses': int(mask.sum()),
+            'changed': int((changed & mask).sum()),
+            'newly_correct': int((newly_correct & mask).sum()),
+            'newly_incorrect': int((newly_incorrect & mask).sum()),
+            'points_delta': int(point_deltas[mask].sum()),
+        })
+
+    # Per-submission score and graded-count changes
+    submission_ids = np.array(submission_ids)
+    affected, inverse = np.unique(submission_ids, return_inverse=True)
+    score_deltas = np.zeros(len(affected), dtype=int)
+    graded_deltas = np.zeros(len(affected), dtype=int)
+    np.add.at(score_deltas, inverse, point_deltas)
+    np.add.at(graded_deltas, inverse, (~was_graded).astype(int))
+    touched = (score_deltas != 0) | (graded_deltas != 0)
+    affected = affected[touched]
+    score_deltas = score_deltas[touched]
+    graded_deltas = graded_deltas[touched]
+
+    totals = _submission_totals(affected.tolist())
+    grades = {}
+    for submission_id, score_delta, graded_delta in zip(affected.tolist(), score_deltas, graded_deltas):
+        current = totals[submission_id]
+        new_score = current['score'] + int(score_delta)
+        summary['submissions'].append({
+            'submission_id': submission_id,
+            'student_id': current['student_id'],
+            'old_score': current['score'],
+            'new_score': new_score,
+        })
+        # Same rules as submit and rubric grading: rubric-graded submissions
+        # combine both scores, others get a grade once every question is graded
+        if current['rubric'] is not None:
+            grades[current['student_id']] = new_score + current['rubric']
+        elif current['graded'] + int(graded_delta) == len(answer_key):
+            grades[current['student_id']] = new_score
+
+    summary.update({
+        'responses_changed': int(changed.sum()),
+        'newly_correct': int(newly_correct.sum()),
+        'newly_incorrect': int(newly_incorrect.sum()),
+        'points_delta': int(point_deltas.sum()),
+        'submissions_affected': int(len(affected)),
+        'grade_entries_updated': len(grades),
+    })
+    if dry_run:
+        return summary
+
+    graded_at = timezone.now()
+    updates = [
+        QuestionResponse(
+            id=response_ids[i],
+            is_correct=bool(new_correct[i]),
+            points_earned=int(new_points[i]),
+            graded=True,
+            graded_at=graded_at,
+        )
+        for i in np.flatnonzero(changed)
+    ]
+    with transaction.atomic():
+        QuestionResponse.objects.bulk_update(
+            updates, ['is_correct', 'points_earned', 'graded', 'graded_at'],
+            batch_size=REGRADE_BATCH_SIZE,
+        )
+        refresh_grading_progress(affected.tolist())
+        summary['grade_entries_updated'] = sync_submission_grades(assignment, grades)
+    return summary
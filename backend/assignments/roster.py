@@ -0,0 +1,130 @@
+"""Normalized, streamed grading roster for one assignment"""
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import AssignmentSubmission, QuestionResponse
+from .progress import PROGRESS_FIELDS
+
+ROSTER_BATCH_SIZE = 200
+
+RESPONSE_FIELDS = (
+    'id', 'question_id', 'response_text', 'is_correct', 'points_earned',
+    'graded', 'teacher_remarks', 'graded_at',
+)
+
+
+def _dumps(value):
+    return json.dumps(value, cls=JSONEncoder)
+
+
+def _rubric_assessments(submission_ids):
+    """First rubric assessment of each submission, with its criterion scores"""
+    from rubrics.models import RubricAssessment, RubricCriterionScore
+
+    assessments = {}
+    rows = RubricAssessment.objects.filter(submission_id__in=submission_ids).select_related(
+        'graded_by'
+    ).order_by('submission_id', 'id')
+    for assessment in rows:
+        if assessment.submission_id in assessments:
+            continue
+        assessments[assessment.submission_id] = {
+            'id': assessment.id,
+            'rubric': assessment.rubric_id,
+            'total_score': str(assessment.total_score),
+            'graded_by': assessment.graded_by_id,
+            'graded_by_name': (
+                assessment.graded_by.get_full_name() or assessment.graded_by.email
+                if assessment.graded_by else None
+            ),
+            'graded_at': assessment.graded_at,
+            'criterion_scores': [],
+        }
+
+    by_id = {assessment['id']: assessment for assessment in assessments.values()}
+    scores = RubricCriterionScore.objects.filter(assessment_id__in=list(by_id)).order_by(
+        'assessment_id', 'id'
+    ).values('id', 'assessment_id', 'criterion_id', 'selected_rating_id', 'comments')
+    for score in scores:
+        by_id[score['assessment_id']]['criterion_scores'].append({
+            'id': score['id'],
+            'criterion': score['criterion_id'],
+            'selected_rating': score['selected_rating_id'],
+            'comments': score['comments'],
+        })
+    return assessments
+
+
+def roster_submissions(assignment):
+    """Yield one normalized dict per submission, newest first, loaded in batches.
+
+    Responses carry only their own columns and the question ID; question,
+    choice and rubric definitions are sent once in the roster header.
+    """
+    submission_ids = list(
+        assignment.submissions.order_by('-submitted_at', '-id').values_list('id', flat=True)
+    )
+    for start in range(0, len(submission_ids), ROSTER_BATCH_SIZE):
+        batch = submission_ids[start:start + ROSTER_BATCH_SIZE]
+        submissions = AssignmentSubmission.objects.filter(id__in=batch).select_related('student').only(
+            'id', 'answer', 'submitted_at', 'is_late', *PROGRESS_FIELDS, 'student__id',
+            'student__email', 'student__first_name', 'student__last_name',
+        ).in_bulk()
+
+        responses = {}
+        rows = QuestionResponse.objects.filter(submission_id__in=batch).order_by(
+            'submission_id', 'question__order', 'question_id'
+        ).values('submission_id', *RESPONSE_FIELDS)
+        for row in rows:
+            responses.setdefault(row.pop('submission_id'), []).append(row)
+        assessments = _rubric_assessments(batch)
+
+        for submission_id in batch:
+            submission = submissions[submission_id]
+            student = submission.student
+            yield {
+                'id': submission.id,
+                'student': {
+                    'id': student.id,
+                    'email': student.email,
+                    'first_name': student.first_name,
+                    'last_name': student.last_name,
+                },
+                'answer': submission.answer,
+                'submitted_at': submission.submitted_at,
+                'is_late': submission.is_late,
+                'total_score': submission.total_score,
+                'is_fully_graded': submission.fully_graded,
+                'grading_status': submission.grading_status,
+                'rubric_assessment': assessments.get(submission_id),
+                'responses': responses.get(submission_id, []),
+            }
+
+
+def stream_roster(assignment):
+    """Yield the JSON roster document for an assignment in chunks.
+
+    The assignment, its questions with choices and its rubric appear once
+    at the top, followed by every submission streamed in batches of
+    ``ROSTER_BATCH_SIZE``.
+    """
+    from rubrics.serializers import RubricSerializer
+    from .serializers import AssignmentSerializer, QuestionSerializer
+
+    questions = list(assignment.questions.prefetch_related('choices').order_by('order', 'id'))
+    serializer = AssignmentSerializer(assignment)
+    for name in ('questions', 'rubric_info', 'course_info'):
+        serializer.fields.pop(name)
+
+    rubric = None
+    if assignment.rubric_id is not None:
+        rubric = RubricSerializer(assignment.rubric).data
+
+    yield '{"assignment": ' + _dumps(serializer.data)
+    yield ', "questions": ' + _dumps(QuestionSerializer(questions, many=True).data)
+    yield ', "rubric": ' + _dumps(rubric)
+    yield ', "submissions": ['
+    for i, submission in enumerate(roster_submissions(assignment)):
+        yield (', ' if i else '') + _dumps(submission)
+    yield ']}'
@@ -1,12 +1,28 @@
 """Serializers for assignments app"""
+from django.db.models import Count, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
-from .models import Assignment, Quiz, Test, Homework, AssignmentSubmission, Question, Choice, QuestionResponse
+from .models import (
+    AUTO_GRADED_TYPES, Assignment, AssignmentGroup, Quiz, Test, Homework, AssignmentSubmission,
+    Question, Choice, QuestionResponse,
+)
 from courses.models import Course
 from courses.serializers import CourseSerializer
 from courses.utils import sanitize_html
+from config.serializers import DynamicFieldsMixin
+from users.access import get_access
 from users.serializers import UserBasicSerializer
 
 
+def _per_assignment(queryset, aggregate):
+    """Correlated subquery computing one aggregate per outer assignment row"""
+    return Coalesce(Subquery(
+        queryset.filter(assignment=OuterRef('pk')).order_by().values('assignment').annotate(
+            value=aggregate
+        ).values('value')
+    ), 0)
+
+
 class ChoiceSerializer(serializers.ModelSerializer):
     """Serializer for Choice model"""
     
@@ -118,7 +134,62 @@ class QuestionResponseSubmitSerializer(serializers.Serializer):
         return sanitize_html(value)
 
 
-class AssignmentSerializer(serializers.ModelSerializer):
+class BulkGradeItemSerializer(serializers.Serializer):
+    """One manually graded response in a bulk grading request"""
+
+    response_id = serializers.IntegerField()
+    points_earned = serializers.IntegerField(min_value=0)
+    teacher_remarks = serializers.CharField(allow_blank=True, required=False, default='')
+
+
+class BulkGradeSerializer(serializers.Serializer):
+    """Batch of manually graded responses for one assignment"""
+
+    grades = BulkGradeItemSerializer(many=True, allow_empty=False, max_length=5000)
+
+    def validate_grades(self, value):
+        response_ids = [item['response_id'] for item in value]
+        if len(set(response_ids)) != len(response_ids):
+            raise serializers.ValidationError('Each response can only be graded once per request.')
+        return value
+
+
+class DraftResponseSerializer(serializers.Serializer):
+    """One autosaved answer in a draft"""
+
+    question_id = serializers.IntegerField()
+    response_text = serializers.CharField(allow_blank=True, trim_whitespace=False, max_length=50000)
+
+
+class SubmissionDraftSerializer(serializers.Serializer):
+    """Changed answers sent by an autosave"""
+
+    responses = DraftResponseSerializer(many=True, required=False, max_length=500)
+    answer = serializers.CharField(allow_blank=True, required=False, trim_whitespace=False, max_length=50000)
+
+
+class AssignmentGroupSerializer(serializers.ModelSerializer):
+    """Serializer for AssignmentGroup model"""
+
+    assignment_ids = serializers.PrimaryKeyRelatedField(
+        source='assignments', many=True, read_only=True
+    )
+
+    class Meta:
+        model = AssignmentGroup
+        fields = [
+            'id', 'course', 'name', 'weight', 'drop_lowest', 'order',
+            'assignment_ids', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'course', 'created_at', 'updated_at']
+
+    def validate_weight(self, value):
+        if not 0 <= value <= 100:
+            raise serializers.ValidationError('Weight must be between 0 and 100.')
+        return value
+
+
+class AssignmentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Assignment model"""
 
     course_info = CourseSerializer(source='course', read_only=True)
@@ -141,6 +212,13 @@ class AssignmentSerializer(serializers.ModelSerializer):
         required=False,
         allow_null=True,
     )
+    group_id = serializers.PrimaryKeyRelatedField(
+        source='group',
+        queryset=AssignmentGroup.objects.all(),
+        write_only=True,
+        required=False,
+        allow_null=True,
+    )
     has_rubric = serializers.SerializerMethodField()
     rubric_info = serializers.SerializerMethodField()
     is_overdue = serializers.SerializerMethodField()
@@ -157,7 +235,7 @@ class AssignmentSerializer(serializers.ModelSerializer):
         model = Assignment
         fields = [
             'id', 'course', 'course_info', 'course_id', 'module', 'module_id',
-            'type', 'title',
+            'group', 'group_id', 'type', 'title',
             'description', 'start_date', 'due_date', 'points_possible',
             'rubric', 'rubric_id', 'has_rubric', 'rubric_info',
             'created_at',
@@ -165,11 +243,64 @@ class AssignmentSerializer(serializers.ModelSerializer):
             'is_auto_gradable', 'submission_count', 'questions',
             'question_count', 'total_question_points'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'course']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'course', 'group']
+        expandable_fields = ['course_info', 'rubric_info', 'questions']
     
+    @staticmethod
+    def setup_eager_loading(queryset, user=None, fields=None):
+        """Annotate per-assignment counts and prefetch everything the serializer reads.
+
+        Submission and question counts come from SQL subqueries rather than
+        loaded rows, so a page costs a fixed number of queries whatever the
+        submission volume. When ``fields`` (the bound fields being rendered)
+        is given, annotations and relations for omitted fields are skipped.
+        """
+        def wants(name):
+            return fields is None or name in fields
+
+        annotations = {}
+        if wants('submission_count'):
+            annotations['num_submissions'] = _per_assignment(AssignmentSubmission.objects.all(), Count('id'))
+        if wants('question_count') or wants('is_auto_gradable'):
+            annotations['num_questions'] = _per_assignment(Question.objects.all(), Count('id'))
+        if wants('is_auto_gradable'):
+            annotations['num_manual_questions'] = _per_assignment(
+                Question.objects.exclude(question_type__in=AUTO_GRADED_TYPES), Count('id')
+            )
+        if wants('total_question_points'):
+            annotations['question_points'] = _per_assignment(Question.objects.all(), Sum('points'))
+        queryset = queryset.annotate(**annotations)
+
+        if wants('course_info'):
+            course_fields = fields['course_info'].fields if fields is not None else None
+            queryset = queryset.prefetch_related(Prefetch(
+                'course',
+                queryset=CourseSerializer.setup_eager_loading(Course.unscoped.all(), user, course_fields),
+            ))
+        if wants('rubric_info'):
+            rubric_model = Assignment.rubric.field.related_model
+            queryset = queryset.prefetch_related(Prefetch(
+                'rubric',
+                queryset=rubric_model.objects.select_related('created_by').prefetch_related(
+                    'criteria__ratings'
+                ).annotate(num_assignments=Count('assignments')),
+            ))
+        if wants('questions'):
+            queryset = queryset.prefetch_related('questions__choices')
+        return queryset
+
     def validate_description(self, value):
         return sanitize_html(value)
 
+    def validate(self, attrs):
+        group = attrs.get('group')
+        course = attrs.get('course') or getattr(self.instance, 'course', None)
+        if group is not None and course is not None and group.course_id != course.id:
+            raise serializers.ValidationError({
+                'group_id': 'Assignment group must belong to the same course.'
+            })
+        return attrs
+
     def get_has_rubric(self, obj):
         return obj.rubric_id is not None
 
@@ -192,19 +323,27 @@ class AssignmentSerializer(serializers.ModelSerializer):
         return obj.is_editable_by_teacher()
 
     def get_is_auto_gradable(self, obj):
+        if hasattr(obj, 'num_manual_questions'):
+            return obj.num_questions > 0 and obj.num_manual_questions == 0
         return obj.is_auto_gradable()
 
     def get_submission_count(self, obj):
+        if hasattr(obj, 'num_submissions'):
+            return obj.num_submissions
         return obj.submissions.count()
 
     def get_question_count(self, obj):
+        if hasattr(obj, 'num_questions'):
+            return obj.num_questions
         return obj.questions.count()
 
     def get_total_question_points(self, obj):
+        if hasattr(obj, 'question_points'):
+            return obj.question_points
         return sum(q.points for q in obj.questions.all())
 
 
-class AssignmentSubmissionSerializer(serializers.ModelSerializer):
+class AssignmentSubmissionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for AssignmentSubmission model"""
     
     assignment_info = AssignmentSerializer(source='assignment', read_only=True)
@@ -230,10 +369,33 @@ class AssignmentSubmissionSerializer(serializers.ModelSerializer):
             'is_fully_graded', 'grading_status', 'rubric_assessment'
         ]
         read_only_fields = ['id', 'submitted_at', 'is_late', 'assignment', 'student']
+        expandable_fields = ['assignment_info', 'question_responses', 'rubric_assessment']
+
+    @staticmethod
+    def setup_eager_loading(queryset, user=None, fields=None):
+        """Load the relations the requested submission fields read"""
+        def wants(name):
+            return fields is None or name in fields
+
+        if wants('student_info'):
+            queryset = queryset.select_related('student')
+        if wants('assignment_info'):
+            assignment_fields = fields['assignment_info'].fields if fields is not None else None
+            queryset = queryset.prefetch_related(Prefetch(
+                'assignment',
+                queryset=AssignmentSerializer.setup_eager_loading(
+                    Assignment.objects.all(), user, assignment_fields
+                ),
+            ))
+        if wants('max_score'):
+            queryset = queryset.prefetch_related('assignment__questions')
+        if wants('question_responses'):
+            queryset = queryset.prefetch_related('question_responses__question__choices')
+        return queryset
     
     def get_total_score(self, obj):
         """Get total score from graded question responses"""
-        return obj.calculate_score()
+        return obj.total_score
     
     def get_max_score(self, obj):
         """Get maximum possible score from assignment questions"""
@@ -241,11 +403,11 @@ class AssignmentSubmissionSerializer(serializers.ModelSerializer):
     
     def get_is_fully_graded(self, obj):
         """Check if all questions have been graded"""
-        return obj.is_fully_graded()
+        return obj.fully_graded
     
     def get_grading_status(self, obj):
         """Get grading status"""
-        return obj.get_grading_status()
+        return obj.grading_status
 
     def get_rubric_assessment(self, obj):
         """Get rubric assessment if one exists"""
@@ -263,11 +425,7 @@ class AssignmentSubmissionSerializer(serializers.ModelSerializer):
             assignment = attrs.get('assignment')
             
             # Check if student is enrolled in the course
-            if not assignment.course.memberships.filter(
-                user=request.user, 
-                role='student',
-                status='active'
-            ).exists():
+            if not get_access(request).is_course_student(assignment.course_id):
                 raise serializers.ValidationError(
                     "You must be enrolled as a student in the course to submit this assignment."
                 )
@@ -327,7 +485,7 @@ class AssignmentSubmissionStudentSerializer(serializers.ModelSerializer):
     def get_total_score(self, obj):
         """Get total score only if after due date"""
         if obj.assignment.is_overdue():
-            return obj.calculate_score()
+            return obj.total_score
         return None
     
     def get_max_score(self, obj):
@@ -337,11 +495,11 @@ class AssignmentSubmissionStudentSerializer(serializers.ModelSerializer):
     def get_is_fully_graded(self, obj):
         """Check if fully graded (only show after due date)"""
         if obj.assignment.is_overdue():
-            return obj.is_fully_graded()
+            return obj.fully_graded
         return None
 
 
-class AssignmentStudentSerializer(serializers.ModelSerializer):
+class AssignmentStudentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Assignment model - student view (hides correct answers)"""
 
     course_info = CourseSerializer(source='course', read_only=True)
@@ -366,6 +524,7 @@ class AssignmentStudentSerializer(serializers.ModelSerializer):
             'questions', 'question_count', 'total_question_points', 'my_submission'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'course']
+        expandable_fields = ['course_info', 'rubric_info', 'questions']
 
     def get_has_rubric(self, obj):
         return obj.rubric_id is not None
@@ -386,9 +545,13 @@ class AssignmentStudentSerializer(serializers.ModelSerializer):
         return obj.is_available_for_students()
 
     def get_question_count(self, obj):
+        if hasattr(obj, 'num_questions'):
+            return obj.num_questions
         return obj.questions.count()
 
     def get_total_question_points(self, obj):
+        if hasattr(obj, 'question_points'):
+            return obj.question_points
         return sum(q.points for q in obj.questions.all())
 
     def get_my_submission(self, obj):
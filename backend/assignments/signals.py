@@ -0,0 +1,88 @@
+"""Signal handlers that keep answer keys, cached student views and submission progress in step with edits"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from courses.models import Course, CourseMembership
+from rubrics.models import Rubric, RubricCriterion, RubricRating
+from .answer_keys import invalidate_answer_key
+from .models import Assignment, AssignmentSubmission, Choice, Homework, Question, Quiz, Test
+from .progress import refresh_grading_progress
+from .student_view import invalidate_course_student_views, invalidate_student_view
+
+
+def _invalidate(assignment_id):
+    invalidate_answer_key(assignment_id)
+    invalidate_student_view(assignment_id)
+
+    def again():
+        # Bump again once committed, so a key rebuilt from pre-commit rows is discarded
+        invalidate_answer_key(assignment_id)
+        invalidate_student_view(assignment_id)
+    transaction.on_commit(again)
+
+
+def _invalidate_course(course_id):
+    invalidate_course_student_views(course_id)
+    transaction.on_commit(lambda: invalidate_course_student_views(course_id))
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    """Recompile the assignment's answer key after a question is written or removed"""
+    _invalidate(instance.assignment_id)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_count_changed(sender, instance, created=True, **kwargs):
+    """Refresh stored grading progress of existing submissions when a question is added or removed"""
+    if not created:
+        return  # Edits leave the count alone; post_delete sends no ``created``
+    assignment_id = instance.assignment_id
+
+    def refresh():
+        refresh_grading_progress(
+            AssignmentSubmission.objects.filter(assignment_id=assignment_id).values_list('id', flat=True)
+        )
+    transaction.on_commit(refresh)
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def choice_changed(sender, instance, **kwargs):
+    """Recompile the assignment's answer key after a choice is written or removed"""
+    try:
+        assignment_id = instance.question.assignment_id
+    except Question.DoesNotExist:
+        # Deleted along with its question, which already invalidated the key
+        return
+    _invalidate(assignment_id)
+
+
+@receiver([post_save, post_delete], sender=Assignment)
+@receiver([post_save, post_delete], sender=Quiz)
+@receiver([post_save, post_delete], sender=Test)
+@receiver([post_save, post_delete], sender=Homework)
+@receiver([post_save, post_delete], sender=CourseMembership)
+@receiver([post_save, post_delete], sender=Rubric)
+def course_content_changed(sender, instance, **kwargs):
+    """Drop cached student views that embed the assignment, course summary or rubric"""
+    _invalidate_course(instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=Course)
+def course_changed(sender, instance, **kwargs):
+    """Drop cached student views that embed the course summary"""
+    _invalidate_course(instance.id)
+
+
+@receiver([post_save, post_delete], sender=RubricCriterion)
+@receiver([post_save, post_delete], sender=RubricRating)
+def rubric_content_changed(sender, instance, **kwargs):
+    """Drop cached student views that embed the edited rubric"""
+    try:
+        criterion = instance if isinstance(instance, RubricCriterion) else instance.criterion
+        course_id = criterion.rubric.course_id
+    except (RubricCriterion.DoesNotExist, Rubric.DoesNotExist):
+        return  # Deleted along with its rubric, which already invalidated the views
+    _invalidate_course(course_id)
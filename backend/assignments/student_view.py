@@ -0,0 +1,126 @@
+"""Shared, cached student view of an assignment"""
+import time
+
+from django.core.cache import cache
+
+from .models import Assignment, AssignmentSubmission
+from .serializers import (
+    AssignmentSerializer, AssignmentStudentSerializer, AssignmentSubmissionStudentSerializer,
+)
+
+STUDENT_VIEW_CACHE_TIMEOUT = 60 * 60
+# How long a builder may hold the build lock, and how long others wait for it
+BUILD_LOCK_TIMEOUT = 10
+BUILD_WAIT_TIMEOUT = 5.0
+BUILD_POLL_INTERVAL = 0.05
+# Computed for every request; everything else in the body is the same for all students
+PER_REQUEST_FIELDS = ('is_overdue', 'has_started', 'is_available', 'my_submission')
+
+
+def _assignment_version_key(assignment_id):
+    return f'student_view:version:assignment:{assignment_id}'
+
+
+def _course_version_key(course_id):
+    return f'student_view:version:course:{course_id}'
+
+
+def _version(key):
+    # Seed with a timestamp so an evicted counter never reuses an old version
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_student_view(assignment_id):
+    """Discard the cached student view of one assignment (its questions or choices changed)"""
+    _bump(_assignment_version_key(assignment_id))
+
+
+def invalidate_course_student_views(course_id):
+    """Discard the cached student views of every assignment in a course.
+
+    For changes to what the bodies embed from outside the assignment's own
+    questions: the assignment rows, the course summary and rubrics.
+    """
+    _bump(_course_version_key(course_id))
+
+
+def build_student_view(assignment_id):
+    """Render the student-independent part of ``AssignmentStudentSerializer``"""
+    fields = AssignmentStudentSerializer(context={}).fields
+    assignment = AssignmentSerializer.setup_eager_loading(
+        Assignment.objects.filter(pk=assignment_id), None, fields
+    ).get()
+    data = dict(AssignmentStudentSerializer(assignment, context={}).data)
+    for name in PER_REQUEST_FIELDS:
+        data.pop(name, None)
+    return data
+
+
+def get_student_view(assignment):
+    """The cached shared body for ``assignment``, built by a single caller at a time.
+
+    Bodies are keyed by the assignment's and its course's versions. On a
+    miss the first caller takes a build lock with ``cache.add`` and renders
+    the body; concurrent callers poll for it instead of rendering it again,
+    and only build it themselves if it has not appeared after
+    ``BUILD_WAIT_TIMEOUT`` seconds.
+    """
+    key = 'student_view:{}:{}:{}'.format(
+        assignment.id,
+        _version(_assignment_version_key(assignment.id)),
+        _version(_course_version_key(assignment.course_id)),
+    )
+    body = cache.get(key)
+    if body is not None:
+        return body
+
+    lock = f'{key}:building'
+    if cache.add(lock, True, BUILD_LOCK_TIMEOUT):
+        try:
+            body = build_student_view(assignment.id)
+            cache.set(key, body, STUDENT_VIEW_CACHE_TIMEOUT)
+        finally:
+            cache.delete(lock)
+        return body
+
+    deadline = time.monotonic() + BUILD_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(BUILD_POLL_INTERVAL)
+        body = cache.get(key)
+        if body is not None:
+            return body
+    return build_student_view(assignment.id)
+
+
+def student_view_data(assignment, user, role):
+    """Full student view: the shared body plus the requesting user's parts.
+
+    ``role`` is the user's role in the course (``None`` for admins who are
+    not members); it fills in ``course_info.user_role``.
+    """
+    body = get_student_view(assignment)
+    submission = AssignmentSubmission.objects.filter(assignment=assignment, student=user).first()
+    if submission is not None:
+        submission.assignment = assignment
+    per_request = {
+        'is_overdue': assignment.is_overdue(),
+        'has_started': assignment.has_started(),
+        'is_available': assignment.is_available_for_students(),
+        'my_submission': (
+            AssignmentSubmissionStudentSerializer(submission).data if submission is not None else None
+        ),
+    }
+
+    data = {}
+    for name in AssignmentStudentSerializer.Meta.fields:
+        data[name] = per_request[name] if name in per_request else body[name]
+    data['course_info'] = {**body['course_info'], 'user_role': role}
+    return data
@@ -1,3 +1,81 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from accounts.resolution import invalidate_accounts
+from assignments.models import Assignment, Choice, Question
+from courses.models import Course, CourseMembership
+from users.models import User
+
+
+class AssignmentQueryCountTests(TestCase):
+    """Permission checks resolve the user's roles once per request, not once per object"""
+
+    def setUp(self):
+        self.account = Account.objects.create(name='Query Counts', slug='query-counts')
+        self.instructor = User.objects.create_user(
+            email='instructor@example.com', password='pw', account=self.account
+        )
+        self.student = User.objects.create_user(email='student@example.com', password='pw', account=self.account)
+        self.course = Course.unscoped.create(account=self.account, code='QC101', name='Query Counts')
+        CourseMembership.objects.create(user=self.instructor, course=self.course, role='instructor')
+        CourseMembership.objects.create(user=self.student, course=self.course, role='student')
+
+        now = timezone.now()
+        self.assignment = Assignment.objects.create(
+            course=self.course, type='quiz', title='Quiz', due_date=now + timedelta(days=1),
+            start_date=now - timedelta(days=1), points_possible=10,
+        )
+        responses = []
+        for k in range(2):
+            question = Question.objects.create(
+                assignment=self.assignment, question_type='multiple_choice', text='Pick one', points=1, order=k
+            )
+            correct = Choice.objects.create(question=question, text='a', is_correct=True, order=0)
+            Choice.objects.create(question=question, text='b', is_correct=False, order=1)
+            responses.append({'question_id': question.id, 'response_text': str(correct.id)})
+        question = Question.objects.create(
+            assignment=self.assignment, question_type='numerical', text='Value', points=2, order=2,
+            correct_answer_numeric=3.5, numeric_tolerance=0.1,
+        )
+        responses.append({'question_id': question.id, 'response_text': '3.5'})
+        self.homework = [
+            Assignment.objects.create(
+                course=self.course, type='homework', title=f'Homework {k}', due_date=now + timedelta(days=3),
+                start_date=now + timedelta(days=2), points_possible=5,
+            )
+            for k in range(6)
+        ]
+
+        student_client = self._client(self.student)
+        response = student_client.post(
+            f'/api/assignments/{self.assignment.id}/submit/', {'responses': responses}, format='json'
+        )
+        self.assertIn(response.status_code, (200, 201, 202))
+        self.client = self._client(self.instructor)
+        # Measure with a cold tenant lookup, so counts do not depend on test order
+        invalidate_accounts()
+
+    def _client(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        client.credentials(HTTP_X_ACCOUNT_SLUG=self.account.slug)
+        return client
+
+    def test_submissions(self):
+        with self.assertNumQueries(13):
+            response = self.client.get(f'/api/assignments/{self.assignment.id}/submissions/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
 
-# Create your tests here.
+    def test_bulk_delete(self):
+        # 12 outside a test, where the delete's transaction also logs BEGIN and COMMIT
+        with self.assertNumQueries(10):
+            response = self.client.post(
+                '/api/assignments/bulk-delete/', {'ids': [a.id for a in self.homework]}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Assignment.objects.filter(id__in=[a.id for a in self.homework]).exists())
@@ -1,7 +1,7 @@
 """URL routing for assignments app"""
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AssignmentViewSet, AssignmentSubmissionViewSet, QuestionViewSet
+from .views import AssignmentViewSet, AssignmentGroupViewSet, AssignmentSubmissionViewSet, QuestionViewSet
 
 app_name = 'assignments'
 
@@ -10,4 +10,10 @@ router.register(r'submissions', AssignmentSubmissionViewSet, basename='submissio
 router.register(r'questions', QuestionViewSet, basename='question')
 router.register(r'', AssignmentViewSet, basename='assignment')
 
-urlpatterns = router.urls
+# Nested group routes: /api/assignments/courses/{course_id}/groups/
+group_router = DefaultRouter()
+group_router.register(r'', AssignmentGroupViewSet, basename='assignment-group')
+
+urlpatterns = [
+    path('courses/<int:course_id>/groups/', include(group_router.urls)),
+] + router.urls
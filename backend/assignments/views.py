@@ -3,36 +3,67 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, prefetch_related_objects
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
-from .models import Assignment, AssignmentSubmission, Question, Choice, QuestionResponse
+from .models import Assignment, AssignmentGroup, AssignmentSubmission, Question, Choice, QuestionResponse
 from .serializers import (
-    AssignmentSerializer, AssignmentSubmissionSerializer, 
+    AssignmentSerializer, AssignmentGroupSerializer, AssignmentSubmissionSerializer, 
     QuestionSerializer, QuestionResponseSerializer,
-    QuestionResponseSubmitSerializer, AssignmentStudentSerializer,
-    AssignmentSubmissionStudentSerializer
+    QuestionResponseSubmitSerializer, AssignmentStudentSerializer, BulkGradeSerializer,
+    AssignmentSubmissionStudentSerializer, SubmissionDraftSerializer
 )
-from courses.models import Course, CourseMembership
-from gradebook.models import GradeEntry
-from users.permissions import IsInstructor, IsInstructorOrAdmin
+from .analytics import answer_distribution
+from .answer_keys import get_answer_key
+from .drafts import DraftBusy, DraftClosed, closing_draft, draft_data, draft_responses, get_draft, save_draft
+from .exports import EXPORTS
+from .grading import bulk_grade_responses, save_submission_grade, submit_assignment
+from .ingestion import enqueue_submission, ingestion_queued, queue_stats, submission_status
+from .item_analysis import get_item_analysis
+from .progress import update_submission_progress
+from .regrade import regrade_assignment
+from .roster import stream_roster
+from .student_view import student_view_data
+from config.exports import streaming_export
+from config.pagination import KeysetPagination
+from config.serializers import rendered_fields
+from courses.models import Course
+from users.access import get_access
+from users.permissions import IsAdmin, IsInstructor, IsInstructorOrAdmin
+
+
+SUBMISSION_ORDERINGS = ('submitted_at', 'total_score', 'graded_count', 'grading_status')
+# Orderings distinct enough to key cursors on; ties in the others are paged by number
+SUBMISSION_KEYSET_ORDERINGS = ('submitted_at',)
+
+
+def _filter_submissions(queryset, params):
+    """Apply ``?grading_status=`` and ``?ordering=`` to submissions, using the stored progress columns"""
+    grading_status = params.get('grading_status')
+    if grading_status:
+        queryset = queryset.filter(grading_status__in=grading_status.split(','))
+    ordering = params.get('ordering', '')
+    if ordering.lstrip('-') in SUBMISSION_ORDERINGS:
+        queryset = queryset.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+    return queryset
 
 
 class AssignmentViewSet(viewsets.ModelViewSet):
     """ViewSet for Assignment CRUD operations"""
     
-    queryset = Assignment.objects.select_related('course').prefetch_related(
-        'submissions',
-        'questions__choices'
-    )
+    queryset = Assignment.objects.select_related('course').prefetch_related('questions__choices')
     serializer_class = AssignmentSerializer
     
     def get_permissions(self):
         """Set permissions based on action"""
-        if self.action in ['create', 'update', 'partial_update', 'destroy', 'questions']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'questions', 'regrade', 'bulk_grade']:
             # Only instructors can modify assignments
             permission_classes = [permissions.IsAuthenticated, IsInstructor]
-        elif self.action in ['submissions']:
+        elif self.action in ['submissions', 'roster', 'export', 'answer_distribution', 'item_analysis']:
             permission_classes = [permissions.IsAuthenticated, IsInstructorOrAdmin]
         else:
             permission_classes = [permissions.IsAuthenticated]
@@ -42,9 +73,13 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         """Filter assignments by account and user role"""
         user = self.request.user
         account = getattr(self.request, 'account', None)
-        queryset = Assignment.objects.filter(
-            course__account=account
-        ).select_related('course').prefetch_related('submissions', 'questions__choices')
+        fields = rendered_fields(self) if self.action in ('list', 'retrieve') else None
+        queryset = Assignment.objects.filter(course__account=account)
+        if self.action in ('submit', 'draft', 'student_view'):
+            # Hot paths while a test is open: nothing but the course is read from the assignment
+            queryset = queryset.select_related('course')
+        else:
+            queryset = AssignmentSerializer.setup_eager_loading(queryset, user, fields)
 
         course_id = self.request.query_params.get('course')
         if course_id:
@@ -54,11 +89,11 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         if assignment_type:
             queryset = queryset.filter(type=assignment_type)
 
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
+        access = get_access(self.request)
+        if access.is_admin:
             return queryset.order_by('-due_date')
 
-        user_courses = user.memberships.filter(status='active').values_list('course_id', flat=True)
-        return queryset.filter(course_id__in=user_courses).order_by('-due_date')
+        return queryset.filter(course_id__in=access.member_course_ids).order_by('-due_date')
     
     def get_serializer_context(self):
         """Add request to serializer context"""
@@ -70,7 +105,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         """Validate user is instructor of the course before creating assignment"""
         course = serializer.validated_data.get('course')
         
-        if not self._is_course_instructor(self.request.user, course):
+        if not get_access(self.request).is_course_instructor(course):
             raise PermissionDenied("You can only create assignments for courses you instruct.")
         
         serializer.save()
@@ -79,7 +114,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         """Validate user is instructor of the course before updating assignment"""
         assignment = self.get_object()
         
-        if not self._is_course_instructor(self.request.user, assignment.course):
+        if not get_access(self.request).is_course_instructor(assignment.course):
             raise PermissionDenied("You can only update assignments in courses you instruct.")
         
         # Check if assignment is still editable (before start date)
@@ -93,7 +128,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
     
     def perform_destroy(self, instance):
         """Validate user is instructor of the course before deleting assignment"""
-        if not self._is_course_instructor(self.request.user, instance.course):
+        if not get_access(self.request).is_course_instructor(instance.course):
             raise PermissionDenied("You can only delete assignments from courses you instruct.")
         
         # Check if assignment is still editable (before start date)
@@ -112,7 +147,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         user = request.user
         
         # Check if user is a student in the course
-        if not self._is_course_student(user, assignment.course):
+        if not get_access(request).is_course_student(assignment.course):
             return Response(
                 {'error': 'You must be enrolled as a student in the course to submit this assignment.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -131,12 +166,45 @@ class AssignmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Use get_or_create to handle race conditions atomically
-        submission, created = AssignmentSubmission.objects.get_or_create(
-            assignment=assignment,
-            student=user,
-            defaults={'answer': request.data.get('answer', '')}
-        )
+        # The draft stays closed, under its lock, until the submission is written,
+        # so a last autosave racing the submit is refused instead of lost
+        try:
+            with closing_draft(assignment.id, user.id) as draft:
+                return self._record_submission(request, assignment, draft)
+        except DraftBusy:
+            return Response(
+                {'error': 'A save of these answers is still in progress. Please retry.'},
+                status=status.HTTP_409_CONFLICT
+            )
+    
+    def _record_submission(self, request, assignment, draft):
+        """Write the submission of ``request.user``, promoting any autosaved ``draft``"""
+        user = request.user
+        answer = request.data.get('answer', '')
+        responses = request.data.get('responses', [])
+        # Autosaved answers are promoted along with the submission
+        if draft is not None:
+            answer = answer or draft['answer']
+            responses = draft_responses(draft, responses)
+        
+        if ingestion_queued():
+            # Deadline surge mode: one insert now, graded by drain_submission_queue
+            submission, created = enqueue_submission(assignment, user, answer, responses)
+            if not created:
+                return Response(
+                    {'error': 'You have already submitted this assignment.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return Response(
+                {
+                    **submission_status(submission, position=False),
+                    'status_url': reverse('assignments:submission-ingestion-status', args=[submission.id]),
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+        
+        # Grades all responses in memory and writes them in one transaction
+        submission, created = submit_assignment(assignment, user, answer, responses)
         
         if not created:
             return Response(
@@ -144,54 +212,122 @@ class AssignmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Process question responses
-        responses_data = request.data.get('responses', [])
-        for response_data in responses_data:
-            question_id = response_data.get('question_id')
-            response_text = response_data.get('response_text', '')
-            
-            try:
-                question = assignment.questions.get(id=question_id)
-                question_response = QuestionResponse.objects.create(
-                    submission=submission,
-                    question=question,
-                    response_text=response_text
+        prefetch_related_objects([submission], 'question_responses__question__choices')
+        serializer = AssignmentSubmissionSerializer(submission, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get', 'patch'])
+    def draft(self, request, pk=None):
+        """Read or autosave the in-progress answers of an attempt (Students only).
+
+        ``PATCH`` sends only the changed answers; they are merged into the
+        cached draft and written to the database at most every
+        ``DRAFT_FLUSH_INTERVAL`` seconds. The draft is promoted to real
+        responses by ``submit``.
+        """
+        assignment = self.get_object()
+        user = request.user
+        
+        if not get_access(request).is_course_student(assignment.course):
+            return Response(
+                {'error': 'You must be enrolled as a student in the course to save answers.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if request.method == 'GET':
+            draft = get_draft(assignment.id, user.id)
+            if draft is None:
+                return Response(
+                    {'error': 'You have already submitted this assignment.'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-                # Auto-grade if applicable
-                question_response.auto_grade()
-            except Question.DoesNotExist:
-                continue
+            return Response(draft_data(assignment.id, draft))
         
-        # Create grade entry if fully auto-gradable
-        self._create_grade_entry_if_complete(submission)
+        if not assignment.has_started() or assignment.is_overdue():
+            return Response(
+                {'error': 'This assignment is not open for answers.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
-        serializer = AssignmentSubmissionSerializer(submission, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        serializer = SubmissionDraftSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        responses = {
+            item['question_id']: item['response_text']
+            for item in serializer.validated_data.get('responses', [])
+        }
+        unknown = sorted(set(responses) - set(get_answer_key(assignment.id).question_ids))
+        if unknown:
+            return Response(
+                {'error': 'Some questions do not belong to this assignment', 'question_ids': unknown},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            draft = save_draft(assignment.id, user.id, responses, serializer.validated_data.get('answer'))
+        except DraftClosed:
+            return Response(
+                {'error': 'You have already submitted this assignment.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except DraftBusy:
+            return Response(
+                {'error': 'Another save of these answers is still in progress. Please retry.'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(draft_data(assignment.id, draft))
     
-    def _create_grade_entry_if_complete(self, submission):
-        """Create grade entry if all questions are graded"""
-        if submission.is_fully_graded():
-            # Get the student's membership in the course
+    @action(detail=True, methods=['post'])
+    def regrade(self, request, pk=None):
+        """Re-evaluate auto-graded responses against the current answer key (Instructors only)"""
+        assignment = self.get_object()
+        
+        if not get_access(request).is_course_instructor(assignment.course):
+            return Response(
+                {'error': 'You can only regrade assignments in courses you instruct.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        question_ids = request.data.get('question_ids')
+        if question_ids is not None:
             try:
-                membership = CourseMembership.objects.get(
-                    user=submission.student,
-                    course=submission.assignment.course,
-                    role='student',
-                    status='active'
-                )
-                
-                # Create or update the grade entry
-                GradeEntry.objects.update_or_create(
-                    membership=membership,
-                    assignment=submission.assignment,
-                    defaults={
-                        'grade': submission.calculate_score(),
-                        'graded_by': None,  # Auto-graded
-                        'comments': 'Auto-graded'
-                    }
+                question_ids = [int(question_id) for question_id in question_ids]
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'question_ids must be a list of question IDs'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-            except CourseMembership.DoesNotExist:
-                pass  # Student not enrolled, skip grade entry
+        dry_run = str(request.data.get('dry_run', False)).lower() in ('true', '1')
+        
+        try:
+            summary = regrade_assignment(assignment, question_ids=question_ids, dry_run=dry_run)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(summary)
+    
+    @action(detail=True, methods=['post'], url_path='bulk-grade')
+    def bulk_grade(self, request, pk=None):
+        """Manually grade many responses across this assignment's submissions (Instructors only)"""
+        assignment = self.get_object()
+        
+        if not get_access(request).is_course_instructor(assignment.course):
+            return Response(
+                {'error': 'You can only grade submissions for courses you instruct.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = BulkGradeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            summary = bulk_grade_responses(assignment, serializer.validated_data['grades'], request.user)
+        except ValueError as e:
+            return Response(
+                {'error': 'Some responses could not be graded.', 'responses': e.args[0]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(summary)
     
     @action(detail=True, methods=['get'])
     def submissions(self, request, pk=None):
@@ -199,18 +335,83 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         assignment = self.get_object()
         
         # Check permission: admin or course instructor
-        if not self._is_course_instructor(request.user, assignment.course) and not hasattr(request.user, 'admin_profile'):
+        if not get_access(request).is_course_instructor(assignment.course):
             return Response(
                 {'error': 'You do not have permission to view submissions for this assignment'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        submissions = assignment.submissions.select_related('student').prefetch_related(
-            'question_responses__question__choices'
-        ).order_by('-submitted_at')
+        submissions = _filter_submissions(
+            assignment.submissions.select_related('student').prefetch_related(
+                'question_responses__question__choices'
+            ).order_by('-submitted_at'),
+            request.query_params,
+        )
         serializer = AssignmentSubmissionSerializer(submissions, many=True, context={'request': request})
         
         return Response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def roster(self, request, pk=None):
+        """Stream every submission in a normalized grading roster (Instructors/Admins only).
+
+        Unlike ``submissions``, the assignment, question and rubric
+        definitions are sent once and each submission only carries its own
+        response rows keyed by question ID.
+        """
+        assignment = self.get_object()
+
+        if not get_access(request).is_course_instructor(assignment.course):
+            return Response(
+                {'error': 'You do not have permission to view submissions for this assignment'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return StreamingHttpResponse(stream_roster(assignment), content_type='application/json')
+
+    @action(detail=True, methods=['get'], url_path='export/(?P<dataset>submissions|responses)')
+    def export(self, request, pk=None, dataset=None):
+        """Stream submissions or responses as CSV / NDJSON (Instructors/Admins only).
+
+        ``?output=csv|ndjson`` picks the format and ``?compress=gzip``
+        compresses the stream.
+        """
+        assignment = self.get_object()
+
+        if not get_access(request).is_course_instructor(assignment.course):
+            return Response(
+                {'error': 'You do not have permission to export submissions for this assignment'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        header, rows = EXPORTS[dataset](assignment)
+        return streaming_export(request, f'assignment-{assignment.id}-{dataset}', header, rows)
+
+    @action(detail=True, methods=['get'], url_path='answer-distribution')
+    def answer_distribution(self, request, pk=None):
+        """Per-question answer distributions for auto-graded questions (Instructors/Admins only)"""
+        assignment = self.get_object()
+
+        if not get_access(request).is_course_instructor(assignment.course):
+            return Response(
+                {'error': 'You do not have permission to view analytics for this assignment'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return Response(answer_distribution(assignment))
+
+    @action(detail=True, methods=['get'], url_path='item-analysis')
+    def item_analysis(self, request, pk=None):
+        """Difficulty, discrimination, distractor and KR-20 statistics (Instructors/Admins only)"""
+        assignment = self.get_object()
+
+        if not get_access(request).is_course_instructor(assignment.course):
+            return Response(
+                {'error': 'You do not have permission to view analytics for this assignment'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return Response(get_item_analysis(assignment))
     
     @action(detail=True, methods=['get', 'post'])
     def questions(self, request, pk=None):
@@ -218,7 +419,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         assignment = self.get_object()
         
         # Verify user is an instructor of the course
-        if not self._is_course_instructor(request.user, assignment.course):
+        if not get_access(request).is_course_instructor(assignment.course):
             return Response(
                 {'error': 'You can only manage questions for assignments in courses you instruct.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -246,44 +447,25 @@ class AssignmentViewSet(viewsets.ModelViewSet):
     def student_view(self, request, pk=None):
         """Get assignment with questions (without correct answers) for students"""
         assignment = self.get_object()
+        access = get_access(request)
+        role = access.course_role(assignment.course_id)
         
         # Check if user is a student or member of the course
-        if not self._is_course_member(request.user, assignment.course):
+        if not access.is_course_member(assignment.course_id):
             return Response(
                 {'error': 'You must be enrolled in the course to view this assignment.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        serializer = AssignmentStudentSerializer(assignment, context={'request': request})
-        return Response(serializer.data)
-    
-    def _is_course_instructor(self, user, course):
-        """Check if user is an instructor of the course"""
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user,
-            role='instructor',
-            status='active'
-        ).exists()
-    
-    def _is_course_student(self, user, course):
-        """Check if user is a student in the course"""
-        return course.memberships.filter(
-            user=user,
-            role='student',
-            status='active'
-        ).exists()
+        if 'fields' in request.query_params or 'expand' in request.query_params:
+            # Sparse fieldsets are rendered per request rather than from the shared body
+            prefetch_related_objects([assignment], 'questions__choices')
+            serializer = AssignmentStudentSerializer(assignment, context={'request': request})
+            return Response(serializer.data)
+        
+        # Questions, choices, rubric and course summary come from a body shared by all students
+        return Response(student_view_data(assignment, request.user, role))
     
-    def _is_course_member(self, user, course):
-        """Check if user is a member of the course (any role)"""
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user,
-            status='active'
-        ).exists()
-
     @action(detail=False, methods=['post'], url_path='bulk-delete')
     def bulk_delete(self, request):
         """Bulk delete assignments by IDs (Instructors only)"""
@@ -297,7 +479,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         errors = []
         to_delete = []
         for assignment in assignments:
-            if not self._is_course_instructor(request.user, assignment.course):
+            if not get_access(request).is_course_instructor(assignment.course_id):
                 errors.append(f'No permission to delete "{assignment.title}".')
                 continue
             if not assignment.is_editable_by_teacher():
@@ -320,29 +502,24 @@ class QuestionViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter questions by account and user role"""
-        user = self.request.user
         account = getattr(self.request, 'account', None)
         queryset = Question.objects.filter(
             assignment__course__account=account
         ).select_related('assignment__course').prefetch_related('choices')
 
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
+        access = get_access(self.request)
+        if access.is_admin:
             return queryset.order_by('order')
 
-        instructor_courses = user.memberships.filter(
-            role='instructor',
-            status='active'
-        ).values_list('course_id', flat=True)
-
         return queryset.filter(
-            assignment__course_id__in=instructor_courses
+            assignment__course_id__in=access.instructor_course_ids
         ).order_by('order')
     
     def perform_update(self, serializer):
         """Validate user is instructor of the course before updating question"""
         question = self.get_object()
         
-        if not self._is_course_instructor(self.request.user, question.assignment.course):
+        if not get_access(self.request).is_course_instructor(question.assignment.course):
             raise PermissionDenied("You can only update questions in courses you instruct.")
         
         # Check if assignment is still editable (before start date)
@@ -355,7 +532,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
     
     def perform_destroy(self, instance):
         """Validate user is instructor of the course before deleting question"""
-        if not self._is_course_instructor(self.request.user, instance.assignment.course):
+        if not get_access(self.request).is_course_instructor(instance.assignment.course):
             raise PermissionDenied("You can only delete questions from courses you instruct.")
         
         # Check if assignment is still editable (before start date)
@@ -372,7 +549,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
         question = self.get_object()
         
         # Verify user is instructor of the course
-        if not self._is_course_instructor(request.user, question.assignment.course):
+        if not get_access(request).is_course_instructor(question.assignment.course):
             raise PermissionDenied("You can only reorder questions in courses you instruct.")
         
         # Check if assignment is still editable (before start date)
@@ -391,47 +568,52 @@ class QuestionViewSet(viewsets.ModelViewSet):
         
         return Response({'status': 'Order updated', 'order': question.order})
     
-    def _is_course_instructor(self, user, course):
-        """Check if user is an instructor of the course"""
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user,
-            role='instructor',
-            status='active'
-        ).exists()
-
 
 class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
     """ViewSet for viewing and managing submissions"""
 
     serializer_class = AssignmentSubmissionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    @property
+    def cursor_ordering(self):
+        """Keyset ordering, following ``?ordering=`` (``None`` pages low-cardinality sorts by number)"""
+        ordering = self.request.query_params.get('ordering', '')
+        if ordering.lstrip('-') in SUBMISSION_KEYSET_ORDERINGS:
+            return (ordering, '-id' if ordering.startswith('-') else 'id')
+        if ordering.lstrip('-') in SUBMISSION_ORDERINGS:
+            return None
+        return ('-submitted_at', '-id')
 
     def get_queryset(self):
         """Filter submissions by account and user role"""
         user = self.request.user
         account = getattr(self.request, 'account', None)
-        queryset = AssignmentSubmission.objects.filter(
-            assignment__course__account=account
-        ).select_related(
-            'assignment__course', 'student'
-        ).prefetch_related(
-            'question_responses__question__choices', 'assignment__questions'
-        )
+        queryset = AssignmentSubmission.objects.filter(assignment__course__account=account)
+        if self.action in ('list', 'retrieve'):
+            queryset = AssignmentSubmissionSerializer.setup_eager_loading(
+                queryset, user, rendered_fields(self)
+            )
+        else:
+            queryset = queryset.select_related('assignment__course', 'student')
 
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return queryset.order_by('-submitted_at')
+        queryset = _filter_submissions(queryset.order_by('-submitted_at'), self.request.query_params)
 
-        instructor_courses = user.memberships.filter(
-            role='instructor',
-            status='active'
-        ).values_list('course_id', flat=True)
+        access = get_access(self.request)
+        if access.is_admin:
+            return queryset
 
         return queryset.filter(
             Q(student=user) |
-            Q(assignment__course_id__in=instructor_courses)
-        ).order_by('-submitted_at')
+            Q(assignment__course_id__in=access.instructor_course_ids)
+        )
+    
+    def get_permissions(self):
+        """Set permissions based on action"""
+        if self.action == 'ingestion_queue':
+            return [permissions.IsAuthenticated(), IsAdmin()]
+        return [permission() for permission in self.permission_classes]
     
     def get_serializer_context(self):
         """Add request to serializer context"""
@@ -446,13 +628,27 @@ class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    @action(detail=True, methods=['get'], url_path='status')
+    def ingestion_status(self, request, pk=None):
+        """Poll a submission's grading status, including its place in the ingestion queue"""
+        submission = self.get_object()
+        return Response(submission_status(submission))
+    
+    @action(detail=False, methods=['get'], url_path='ingestion')
+    def ingestion_queue(self, request):
+        """Depth and lag of the account's submission ingestion queue (Admins only)"""
+        stats = queue_stats(
+            AssignmentSubmission.objects.filter(assignment__course__account=request.account)
+        )
+        return Response({'mode': settings.SUBMISSION_INGESTION, **stats})
+    
     @action(detail=True, methods=['post'], url_path='grade-response')
     def grade_response(self, request, pk=None):
         """Grade a text response question (Instructors/Admins only)"""
         submission = self.get_object()
         
         # Verify user is instructor of the course or admin
-        if not self._is_course_instructor(request.user, submission.assignment.course):
+        if not get_access(request).is_course_instructor(submission.assignment.course):
             return Response(
                 {'error': 'You can only grade submissions for courses you instruct.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -490,10 +686,11 @@ class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
         question_response.graded = True
         question_response.teacher_remarks = teacher_remarks
         question_response.graded_at = timezone.now()
-        question_response.save()
-        
-        # Create grade entry if all questions are now graded
-        self._create_grade_entry_if_complete(submission, request.user)
+        with transaction.atomic():
+            question_response.save()
+            update_submission_progress(submission)
+            # Create grade entry if all questions are now graded
+            self._create_grade_entry_if_complete(submission, request.user)
         
         serializer = QuestionResponseSerializer(question_response)
         return Response(serializer.data)
@@ -520,7 +717,7 @@ class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
         submission = self.get_object()
         
         # Only allow students to view their own submissions
-        if submission.student != request.user and not self._is_course_instructor(request.user, submission.assignment.course):
+        if submission.student != request.user and not get_access(request).is_course_instructor(submission.assignment.course):
             return Response(
                 {'error': 'You can only view your own submissions.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -537,35 +734,44 @@ class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
     
     def _create_grade_entry_if_complete(self, submission, grader=None):
         """Create grade entry if all questions are graded"""
-        if submission.is_fully_graded():
-            # Get the student's membership in the course
-            try:
-                membership = CourseMembership.objects.get(
-                    user=submission.student,
-                    course=submission.assignment.course,
-                    role='student',
-                    status='active'
-                )
-                
-                # Create or update the grade entry
-                GradeEntry.objects.update_or_create(
-                    membership=membership,
-                    assignment=submission.assignment,
-                    defaults={
-                        'grade': submission.calculate_score(),
-                        'graded_by': grader,
-                        'comments': 'Graded' if grader else 'Auto-graded'
-                    }
-                )
-            except CourseMembership.DoesNotExist:
-                pass  # Student not enrolled, skip grade entry
+        if submission.fully_graded:
+            save_submission_grade(submission, submission.total_score, grader)
     
-    def _is_course_instructor(self, user, course):
-        """Check if user is an instructor of the course"""
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user,
-            role='instructor',
-            status='active'
-        ).exists()
+
+class AssignmentGroupViewSet(viewsets.ModelViewSet):
+    """CRUD for weighted assignment groups scoped to a course."""
+
+    serializer_class = AssignmentGroupSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _get_course(self):
+        course_id = self.kwargs.get('course_id')
+        account = getattr(self.request, 'account', None)
+        return get_object_or_404(Course, id=course_id, account=account)
+
+    def get_queryset(self):
+        course = self._get_course()
+        return AssignmentGroup.objects.filter(course=course).prefetch_related('assignments')
+
+    def get_permissions(self):
+        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+            return [permissions.IsAuthenticated(), IsInstructor()]
+        return [permissions.IsAuthenticated()]
+
+    def perform_create(self, serializer):
+        course = self._get_course()
+        if not get_access(self.request).is_course_instructor(course):
+            raise PermissionDenied("You can only create assignment groups for courses you instruct.")
+        serializer.save(course=course)
+
+    def perform_update(self, serializer):
+        group = self.get_object()
+        if not get_access(self.request).is_course_instructor(group.course):
+            raise PermissionDenied("You can only update assignment groups in courses you instruct.")
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        if not get_access(self.request).is_course_instructor(instance.course):
+            raise PermissionDenied("You can only delete assignment groups from courses you instruct.")
+        # Assignments in the group become ungrouped (SET_NULL)
+        instance.delete()
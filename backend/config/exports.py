@@ -0,0 +1,90 @@
+"""Streaming CSV / NDJSON export responses"""
+import csv
+import datetime
+import json
+import zlib
+from decimal import Decimal
+
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+OUTPUT_PARAM = 'output'
+COMPRESS_PARAM = 'compress'
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+# Rows between explicit gzip flushes, so compressed output keeps flowing
+GZIP_FLUSH_ROWS = 500
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def csv_lines(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def ndjson_lines(header, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), cls=JSONEncoder) + '\n'
+
+
+def gzip_chunks(lines):
+    """Gzip a stream of text lines on the fly"""
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for i, line in enumerate(lines, start=1):
+        data = compressor.compress(line.encode('utf-8'))
+        if i % GZIP_FLUSH_ROWS == 0:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_options(request):
+    """``(output, gzip)`` requested through ``?output=csv|ndjson`` and ``?compress=gzip``"""
+    output = request.query_params.get(OUTPUT_PARAM, 'csv').lower()
+    if output not in EXPORT_CONTENT_TYPES:
+        raise ValidationError({OUTPUT_PARAM: f"Choose one of: {', '.join(EXPORT_CONTENT_TYPES)}."})
+    compress = request.query_params.get(COMPRESS_PARAM, '').lower()
+    if compress not in ('', 'gzip'):
+        raise ValidationError({COMPRESS_PARAM: 'Only gzip is supported.'})
+    return output, compress == 'gzip'
+
+
+def streaming_export(request, filename, header, rows):
+    """Stream ``rows`` (an iterator of tuples matching ``header``) as a file download.
+
+    Nothing is materialized: rows are encoded and, when asked for,
+    compressed as they are produced, so the first bytes are sent before the
+    underlying query has been fully read.
+    """
+    output, compress = export_options(request)
+    lines = csv_lines(header, rows) if output == 'csv' else ndjson_lines(header, rows)
+    filename = f'{filename}.{output}'
+    if compress:
+        response = StreamingHttpResponse(gzip_chunks(lines), content_type='application/gzip')
+        filename += '.gz'
+    else:
+        response = StreamingHttpResponse(lines, content_type=EXPORT_CONTENT_TYPES[output])
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,61 @@
+"""Shared pagination classes"""
+from collections import OrderedDict
+
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+COUNT_PARAM = 'include_count'
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor (keyset) pagination with an opt-in page-number fallback.
+
+    Pages are fetched with ``WHERE <ordering field> < <cursor>`` instead of
+    ``OFFSET``, and no ``COUNT(*)`` is run unless ``?include_count=true`` is
+    sent. The ordering comes from the view's ``cursor_ordering`` (e.g.
+    ``('-created_at', '-id')``), which should be backed by a matching index.
+
+    DRF only puts the first ordering field in the cursor and pages through
+    ties by ``OFFSET`` (capped at ``offset_cutoff``), so that field must be
+    close to unique. Views sorting on a low-cardinality column return
+    ``None`` from ``cursor_ordering`` to be paged by number instead.
+
+    Clients that still send ``?page=`` get the previous
+    ``PageNumberPagination`` responses unchanged.
+    """
+
+    ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def __init__(self):
+        self.legacy = None
+        self.count = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        unkeyed = hasattr(view, 'cursor_ordering') and view.cursor_ordering is None
+        if unkeyed or PageNumberPagination.page_query_param in request.query_params:
+            self.legacy = PageNumberPagination()
+            if unkeyed:
+                # Keep honouring ?page_size= on every page of the fallback
+                self.legacy.page_size_query_param = self.page_size_query_param
+                self.legacy.max_page_size = self.max_page_size
+            return self.legacy.paginate_queryset(queryset, request, view)
+        if request.query_params.get(COUNT_PARAM, '').lower() in ('true', '1'):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None) or self.ordering
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
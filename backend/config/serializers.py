@@ -0,0 +1,82 @@
+"""Shared serializer helpers"""
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def _parse_paths(value):
+    return {path.strip() for path in (value or '').split(',') if path.strip()}
+
+
+def _child_paths(paths, name):
+    prefix = f'{name}.'
+    return {path[len(prefix):] for path in paths if path.startswith(prefix)}
+
+
+class DynamicFieldsMixin:
+    """Let read requests choose a serializer's fields with ``?fields=`` and ``?expand=``.
+
+    Without either parameter the full, legacy representation is rendered.
+    Once a client passes one, it gets only what it asked for: ``fields``
+    lists the fields to keep (every field that is not expandable when
+    omitted) and ``expand`` opts in to the heavier nested fields named in
+    ``Meta.expandable_fields``. Dotted paths reach into nested serializers
+    that use the mixin too, e.g. ``fields=id,assignment_info.title`` or
+    ``expand=assignment_info.course_info``. Writes always see every field.
+    """
+
+    def field_selection(self):
+        """``(fields, expand)`` chosen for this serializer, or None for the full shape"""
+        if hasattr(self, '_field_selection'):
+            return self._field_selection
+        root = self.root
+        if root is not self and not (isinstance(self.parent, serializers.ListSerializer) and self.parent is root):
+            # Nested inside a serializer that renders its full shape
+            return None
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        params = request.query_params
+        if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+            return None
+        requested = _parse_paths(params[FIELDS_PARAM]) if FIELDS_PARAM in params else None
+        return requested, _parse_paths(params.get(EXPAND_PARAM))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.field_selection()
+        if selection is None:
+            return fields
+
+        requested, expanded = selection
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        for name in list(fields):
+            child_fields = _child_paths(requested, name) if requested is not None else set()
+            child_expand = _child_paths(expanded, name)
+            if name in expanded or child_expand:
+                keep = True
+            elif requested is not None:
+                keep = name in requested or bool(child_fields)
+            else:
+                keep = name not in expandable
+            if not keep:
+                del fields[name]
+                continue
+
+            nested = fields[name]
+            if isinstance(nested, serializers.ListSerializer):
+                nested = nested.child
+            if isinstance(nested, DynamicFieldsMixin):
+                nested._field_selection = (child_fields or None, child_expand)
+        return fields
+
+
+def rendered_fields(view):
+    """Bound fields the view's serializer will render for this request.
+
+    Viewsets pass this to ``setup_eager_loading`` so relations and
+    annotations are only loaded for fields that are actually requested.
+    """
+    return view.get_serializer().fields
@@ -53,6 +53,7 @@ INSTALLED_APPS = [
     'pages',
     'rubrics',
     'notifications',
+    'reports',
 ]
 
 MIDDLEWARE = [
@@ -103,6 +104,42 @@ DATABASES = {
 }
 
 
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (e.g. Redis) in production so invalidation reaches every worker.
+# Autosaved answers (assignments/drafts.py) use their own "drafts" cache:
+# it holds up to DRAFT_FLUSH_INTERVAL seconds of answers not yet in the
+# database and the per-student draft lock, so with more than one worker
+# it must be shared as well. It defaults to the main backend; local
+# memory keeps a separate store sized by DRAFT_CACHE_MAX_ENTRIES and
+# writes every save through to the database.
+
+LOCMEM_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+CACHE_BACKEND = config('CACHE_BACKEND', default=LOCMEM_CACHE)
+CACHE_LOCATION = config('CACHE_LOCATION', default='syllabex')
+DRAFT_CACHE_BACKEND = config('DRAFT_CACHE_BACKEND', default=CACHE_BACKEND)
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
+    },
+    'drafts': {
+        'BACKEND': DRAFT_CACHE_BACKEND,
+        'LOCATION': config(
+            'DRAFT_CACHE_LOCATION',
+            default='syllabex-drafts' if DRAFT_CACHE_BACKEND == LOCMEM_CACHE else CACHE_LOCATION,
+        ),
+        'KEY_PREFIX': 'drafts',
+    },
+}
+if DRAFT_CACHE_BACKEND == LOCMEM_CACHE:
+    # The default of 300 entries would evict drafts before they are flushed
+    CACHES['drafts']['OPTIONS'] = {
+        'MAX_ENTRIES': config('DRAFT_CACHE_MAX_ENTRIES', default=100000, cast=int),
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -175,7 +212,7 @@ CORS_ALLOW_HEADERS = [
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -198,3 +235,9 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
+
+# Submission ingestion
+# 'sync' grades submissions inside the submit request. 'queue' only records
+# the raw responses and answers 202; run `python manage.py drain_submission_queue`
+# to grade them (use it around deadline surges).
+SUBMISSION_INGESTION = config('SUBMISSION_INGESTION', default='sync')
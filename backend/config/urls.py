@@ -58,6 +58,7 @@ urlpatterns = [
     path('api/pages/', include('pages.urls')),
     path('api/rubrics/', include('rubrics.urls')),
     path('api/notifications/', include('notifications.urls')),
+    path('api/reports/', include('reports.urls')),
 ]
 
 if settings.DEBUG:
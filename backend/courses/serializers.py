@@ -1,12 +1,18 @@
 """Serializers for courses app"""
+from operator import attrgetter
+
+from django.db.models import Count, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
+from config.serializers import DynamicFieldsMixin
 from .models import Course, CourseMembership, CourseModule, Announcement
 from .utils import sanitize_html
+from users.access import get_access
 from users.models import User
 from users.serializers import UserBasicSerializer
 
 
-class CourseMembershipSerializer(serializers.ModelSerializer):
+class CourseMembershipSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for CourseMembership model"""
     
     user_info = UserBasicSerializer(source='user', read_only=True)
@@ -29,6 +35,7 @@ class CourseMembershipSerializer(serializers.ModelSerializer):
             'course', 'course_id', 'role', 'status', 'enrolled_at'
         ]
         read_only_fields = ['id', 'enrolled_at', 'user', 'course']
+        expandable_fields = ['user_info']
     
     def validate(self, attrs):
         """Validate membership doesn't already exist"""
@@ -45,7 +52,7 @@ class CourseMembershipSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Course model"""
     
     student_count = serializers.SerializerMethodField()
@@ -62,18 +69,60 @@ class CourseSerializer(serializers.ModelSerializer):
             'instructor_count', 'instructors', 'user_role'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        expandable_fields = ['instructors']
+    
+    @staticmethod
+    def setup_eager_loading(queryset, user=None, fields=None):
+        """Annotate member counts and prefetch the memberships this serializer reads.
+
+        Only active instructors and ``user``'s own membership are loaded, so
+        cost does not grow with roster size. When ``fields`` is given, only
+        what those fields read is loaded.
+        """
+        def wants(name):
+            return fields is None or name in fields
+
+        def active_count(role):
+            return Coalesce(Subquery(
+                CourseMembership.objects.filter(
+                    course=OuterRef('pk'), role=role, status='active'
+                ).order_by().values('course').annotate(total=Count('id')).values('total')
+            ), 0)
+
+        if wants('student_count'):
+            queryset = queryset.annotate(active_student_count=active_count('student'))
+        if wants('instructor_count'):
+            queryset = queryset.annotate(active_instructor_count=active_count('instructor'))
+        if not (wants('instructors') or wants('user_role')):
+            return queryset
+
+        summary = Q(role='instructor')
+        if user is not None and user.is_authenticated:
+            summary |= Q(user=user)
+        return queryset.prefetch_related(Prefetch(
+            'memberships',
+            queryset=CourseMembership.objects.filter(summary, status='active').select_related('user'),
+            to_attr='summary_memberships',
+        ))
     
     def get_student_count(self, obj):
         """Get count of active students"""
+        if hasattr(obj, 'active_student_count'):
+            return obj.active_student_count
         return obj.get_active_student_count()
     
     def get_instructor_count(self, obj):
         """Get count of active instructors"""
+        if hasattr(obj, 'active_instructor_count'):
+            return obj.active_instructor_count
         return obj.get_active_instructor_count()
     
     def get_instructors(self, obj):
         """Get list of instructors for this course"""
-        instructors = obj.memberships.filter(role='instructor', status='active').select_related('user')
+        if hasattr(obj, 'summary_memberships'):
+            instructors = [m for m in obj.summary_memberships if m.role == 'instructor']
+        else:
+            instructors = obj.memberships.filter(role='instructor', status='active').select_related('user')
         return [
             {
                 'id': m.user.id,
@@ -93,8 +142,12 @@ class CourseSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             return None
         
-        membership = obj.memberships.filter(user=request.user, status='active').first()
-        return membership.role if membership else None
+        if hasattr(obj, 'summary_memberships'):
+            membership = next(
+                (m for m in obj.summary_memberships if m.user_id == request.user.id), None
+            )
+            return membership.role if membership else None
+        return get_access(request).course_role(obj)
 
 
 class CourseDetailSerializer(CourseSerializer):
@@ -104,6 +157,7 @@ class CourseDetailSerializer(CourseSerializer):
     
     class Meta(CourseSerializer.Meta):
         fields = CourseSerializer.Meta.fields + ['members']
+        expandable_fields = CourseSerializer.Meta.expandable_fields + ['members']
     
     def get_members(self, obj):
         """Get all active members of the course"""
@@ -142,37 +196,28 @@ class CourseModuleSerializer(serializers.ModelSerializer):
         return sanitize_html(value)
 
     def get_assignments(self, obj):
-        request = self.context.get('request')
-        user = request.user if request else None
-
         # If student and module is locked, hide assignments
-        if user and not self._is_instructor(user, obj.course):
-            if obj.is_locked:
-                return []
+        if not self._is_instructor(obj) and obj.is_locked:
+            return []
 
-        qs = obj.assignments.order_by('due_date')
-        return ModuleAssignmentSummarySerializer(qs, many=True).data
+        # Sorted here rather than with order_by, which would bypass the view's prefetch
+        assignments = sorted(obj.assignments.all(), key=attrgetter('due_date'))
+        return ModuleAssignmentSummarySerializer(assignments, many=True).data
 
     def get_pages(self, obj):
-        request = self.context.get('request')
-        user = request.user if request else None
-
-        if user and not self._is_instructor(user, obj.course):
+        pages = sorted(obj.pages.all(), key=attrgetter('order'))
+        if not self._is_instructor(obj):
             if obj.is_locked:
                 return []
-            qs = obj.pages.filter(is_published=True).order_by('order')
-        else:
-            qs = obj.pages.order_by('order')
+            pages = [page for page in pages if page.is_published]
 
         from pages.serializers import PageSummarySerializer
-        return PageSummarySerializer(qs, many=True).data
-
-    def _is_instructor(self, user, course):
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user, role='instructor', status='active'
-        ).exists()
+        return PageSummarySerializer(pages, many=True).data
+
+    def _is_instructor(self, obj):
+        """Whether the requesting user instructs the module's course (True without a request)"""
+        request = self.context.get('request')
+        return request is None or get_access(request).is_course_instructor(obj.course_id)
 
 
 class AnnouncementSerializer(serializers.ModelSerializer):
@@ -1,3 +1,56 @@
+from datetime import timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from accounts.resolution import invalidate_accounts
+from assignments.models import Assignment
+from courses.models import Course, CourseMembership, CourseModule
+from pages.models import Page
+from users.models import User
+
+
+class ModuleListQueryCountTests(TestCase):
+    """The module list costs the same number of queries however many modules the course has"""
+
+    def setUp(self):
+        self.account = Account.objects.create(name='Query Counts', slug='query-counts')
+        self.instructor = User.objects.create_user(
+            email='instructor@example.com', password='pw', account=self.account
+        )
+        self.course = Course.unscoped.create(account=self.account, code='QC101', name='Query Counts')
+        CourseMembership.objects.create(user=self.instructor, course=self.course, role='instructor')
+        self.client = APIClient()
+        self.client.force_authenticate(self.instructor)
+        self.client.credentials(HTTP_X_ACCOUNT_SLUG=self.account.slug)
+
+    def _add_modules(self, count):
+        now = timezone.now()
+        for k in range(count):
+            module = CourseModule.objects.create(
+                course=self.course, title=f'Module {k}', order=k, is_locked=bool(k % 2),
+                start_date=now, end_date=now + timedelta(days=9),
+            )
+            Assignment.objects.create(
+                course=self.course, module=module, title=f'Assignment {k}', due_date=now + timedelta(days=k),
+            )
+            Page.objects.create(course=self.course, module=module, title=f'Page {k}', is_published=True)
+
+    def _list_queries(self):
+        # Measure with a cold tenant lookup, so counts do not depend on test order
+        invalidate_accounts()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/courses/{self.course.id}/modules/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
 
-# Create your tests here.
+    def test_module_list(self):
+        self._add_modules(8)
+        eight = self._list_queries()
+        self._add_modules(8)
+        self.assertEqual(self._list_queries(), eight)
+        self.assertEqual(eight, 8)
@@ -5,11 +5,13 @@ from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError, PermissionDenied
 from django.db.models import Q
 from rest_framework import generics
+from config.serializers import rendered_fields
 from .models import Course, CourseMembership, CourseModule, Announcement
 from .serializers import (
     CourseSerializer, CourseDetailSerializer, CourseMembershipSerializer,
     CourseModuleSerializer, AnnouncementSerializer,
 )
+from users.access import get_access
 from users.models import User
 from users.permissions import IsAdmin, IsInstructorOrAdmin, IsCourseInstructorOrAdmin
 
@@ -39,17 +41,18 @@ class CourseViewSet(viewsets.ModelViewSet):
         """Filter courses by account and user role"""
         user = self.request.user
         account = getattr(self.request, 'account', None)
-        queryset = Course.unscoped.filter(account=account).prefetch_related('memberships__user')
+        fields = rendered_fields(self) if self.action in ('list', 'retrieve') else None
+        queryset = CourseSerializer.setup_eager_loading(
+            Course.unscoped.filter(account=account), user, fields
+        )
 
         # Admins see all courses in the account
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
+        access = get_access(self.request)
+        if access.is_admin:
             return queryset
 
         # Regular users see only their enrolled courses
-        return queryset.filter(
-            memberships__user=user,
-            memberships__status='active'
-        ).distinct()
+        return queryset.filter(id__in=access.member_course_ids)
     
     def get_serializer_class(self):
         """Use detailed serializer for retrieve action"""
@@ -73,7 +76,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         course = self.get_object()
         
         # Check permission: admin or course instructor
-        if not self._can_manage_course(request.user, course):
+        if not get_access(request).is_course_instructor(course):
             raise PermissionDenied("You don't have permission to manage this course.")
         
         user_id = request.data.get('user_id')
@@ -121,7 +124,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         course = self.get_object()
         
         # Check permission: admin or course instructor
-        if not self._can_manage_course(request.user, course):
+        if not get_access(request).is_course_instructor(course):
             raise PermissionDenied("You don't have permission to manage this course.")
         
         try:
@@ -150,7 +153,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         course = self.get_object()
         
         # Check permission: admin or course instructor
-        if not self._can_manage_course(request.user, course):
+        if not get_access(request).is_course_instructor(course):
             raise PermissionDenied("You don't have permission to manage this course.")
         
         new_role = request.data.get('role')
@@ -189,7 +192,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         course = self.get_object()
         
         # Check permission: admin, course instructor, or member of the course
-        if not self._can_view_course_members(request.user, course):
+        if not get_access(request).is_course_member(course):
             raise PermissionDenied("You don't have permission to view students in this course.")
         
         memberships = course.memberships.filter(
@@ -213,24 +216,6 @@ class CourseViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.data)
     
-    def _can_manage_course(self, user, course):
-        """Check if user can manage course members"""
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user,
-            role='instructor',
-            status='active'
-        ).exists()
-
-    def _can_view_course_members(self, user, course):
-        """Check if user can view course members"""
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user,
-            status='active'
-        ).exists()
 
 
 class CourseModuleViewSet(viewsets.ModelViewSet):
@@ -251,13 +236,6 @@ class CourseModuleViewSet(viewsets.ModelViewSet):
         except Course.DoesNotExist:
             raise ValidationError('Course not found.')
 
-    def _is_instructor(self, user, course):
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user, role='instructor', status='active'
-        ).exists()
-
     def get_queryset(self):
         course = self._get_course()
         return CourseModule.objects.filter(course=course).prefetch_related('assignments', 'pages')
@@ -269,19 +247,19 @@ class CourseModuleViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         course = self._get_course()
-        if not self._is_instructor(self.request.user, course):
+        if not get_access(self.request).is_course_instructor(course):
             raise PermissionDenied('Only instructors can create modules.')
         serializer.save(course=course)
 
     def perform_update(self, serializer):
         course = self._get_course()
-        if not self._is_instructor(self.request.user, course):
+        if not get_access(self.request).is_course_instructor(course):
             raise PermissionDenied('Only instructors can update modules.')
         serializer.save()
 
     def perform_destroy(self, instance):
         course = self._get_course()
-        if not self._is_instructor(self.request.user, course):
+        if not get_access(self.request).is_course_instructor(course):
             raise PermissionDenied('Only instructors can delete modules.')
         # Cascade delete assignments in this module (pages remain via SET_NULL)
         instance.assignments.all().delete()
@@ -290,7 +268,7 @@ class CourseModuleViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['patch'], url_path='toggle-lock')
     def toggle_lock(self, request, course_id=None, pk=None):
         course = self._get_course()
-        if not self._is_instructor(request.user, course):
+        if not get_access(request).is_course_instructor(course):
             raise PermissionDenied('Only instructors can lock/unlock modules.')
         module = self.get_object()
         module.is_locked = not module.is_locked
@@ -304,7 +282,7 @@ class CourseModuleViewSet(viewsets.ModelViewSet):
         from django.utils.dateparse import parse_date
 
         course = self._get_course()
-        if not self._is_instructor(request.user, course):
+        if not get_access(request).is_course_instructor(course):
             raise PermissionDenied('Only instructors can batch-modify modules.')
 
         modules_data = request.data.get('modules', [])
@@ -366,11 +344,11 @@ class CourseMembershipViewSet(viewsets.ModelViewSet):
         """Filter memberships by account and user role"""
         user = self.request.user
         account = getattr(self.request, 'account', None)
-        queryset = CourseMembership.objects.filter(
-            course__account=account
-        ).select_related('user', 'course')
+        queryset = CourseMembership.objects.filter(course__account=account)
+        if self.action not in ('list', 'retrieve') or 'user_info' in rendered_fields(self):
+            queryset = queryset.select_related('user')
 
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
+        if get_access(self.request).is_admin:
             return queryset
 
         return queryset.filter(user=user)
@@ -392,23 +370,16 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
         except Course.DoesNotExist:
             raise ValidationError('Course not found.')
 
-    def _is_instructor(self, user, course):
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user, role='instructor', status='active'
-        ).exists()
-
     def get_queryset(self):
         course = self._get_course()
         qs = Announcement.objects.filter(course=course).select_related('author', 'course')
-        if not self._is_instructor(self.request.user, course):
+        if not get_access(self.request).is_course_instructor(course):
             qs = qs.filter(is_published=True)
         return qs
 
     def perform_create(self, serializer):
         course = self._get_course()
-        if not self._is_instructor(self.request.user, course):
+        if not get_access(self.request).is_course_instructor(course):
             raise PermissionDenied('Only instructors can create announcements.')
         announcement = serializer.save(course=course, author=self.request.user)
         if announcement.is_published:
@@ -417,13 +388,13 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         course = self._get_course()
-        if not self._is_instructor(self.request.user, course):
+        if not get_access(self.request).is_course_instructor(course):
             raise PermissionDenied('Only instructors can update announcements.')
         serializer.save()
 
     def perform_destroy(self, instance):
         course = self._get_course()
-        if not self._is_instructor(self.request.user, course):
+        if not get_access(self.request).is_course_instructor(course):
             raise PermissionDenied('Only instructors can delete announcements.')
         instance.delete()
 
@@ -435,12 +406,7 @@ class RecentAnnouncementsView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        enrolled_courses = Course.unscoped.filter(
-            memberships__user=user,
-            memberships__status='active',
-        )
         return Announcement.objects.filter(
-            course__in=enrolled_courses,
+            course_id__in=get_access(self.request).member_course_ids,
             is_published=True,
         ).select_related('author', 'course')[:5]
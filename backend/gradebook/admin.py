@@ -1,6 +1,6 @@
 """Admin configuration for gradebook app"""
 from django.contrib import admin
-from .models import GradeEntry
+from .models import GradeEntry, GradebookSnapshot, GradingScheme
 
 
 @admin.register(GradeEntry)
@@ -39,3 +39,23 @@ class GradeEntryAdmin(admin.ModelAdmin):
     def graded_by_email(self, obj):
         return obj.graded_by.email if obj.graded_by else None
     graded_by_email.short_description = 'Graded By'
+
+
+@admin.register(GradebookSnapshot)
+class GradebookSnapshotAdmin(admin.ModelAdmin):
+    """Read-only view of materialized gradebook rows"""
+    
+    list_display = ['membership', 'course', 'total_points', 'total_points_possible', 'percentage', 'letter_grade', 'updated_at']
+    list_filter = ['course']
+    search_fields = ['membership__user__email']
+    readonly_fields = ['course', 'membership', 'grades', 'total_points', 'total_points_possible', 'percentage', 'letter_grade', 'updated_at']
+
+
+@admin.register(GradingScheme)
+class GradingSchemeAdmin(admin.ModelAdmin):
+    """Admin interface for course grading schemes"""
+    
+    list_display = ['course', 'apply_group_weights', 'updated_at']
+    list_filter = ['apply_group_weights']
+    search_fields = ['course__code', 'course__name']
+    readonly_fields = ['updated_at']
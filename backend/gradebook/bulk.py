@@ -0,0 +1,43 @@
+"""Set-based grade entry writes that keep snapshots and statistics in step"""
+from itertools import islice
+
+from django.db import transaction
+
+from .models import GradeEntry
+from .snapshots import rebuild_snapshots
+from .stats import invalidate_course_stats
+
+UPSERT_BATCH_SIZE = 1000
+
+
+def upsert_grade_entries(course, entries, update_fields=('grade', 'graded_by', 'comments')):
+    """Insert or update many grade entries for one course in batches.
+
+    ``entries`` is an iterable of unsaved ``GradeEntry`` instances; it is
+    consumed ``UPSERT_BATCH_SIZE`` rows at a time, so a generator is never
+    materialized. Rows that already exist for the same membership and
+    assignment get ``update_fields`` overwritten, and a single batch must
+    not contain the same pair twice. ``bulk_create`` skips the per-row
+    ``post_save`` handlers, so the affected snapshot rows are rebuilt and
+    the course statistics invalidated once at the end instead. Returns the
+    number of rows written.
+    """
+    entries = iter(entries)
+    membership_ids = set()
+    written = 0
+
+    with transaction.atomic():
+        while batch := list(islice(entries, UPSERT_BATCH_SIZE)):
+            GradeEntry.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=['membership', 'assignment'],
+                update_fields=list(update_fields),
+            )
+            membership_ids.update(entry.membership_id for entry in batch)
+            written += len(batch)
+        if written:
+            rebuild_snapshots(course, sorted(membership_ids))
+    if written:
+        invalidate_course_stats(course.id)
+    return written
@@ -0,0 +1,51 @@
+"""Row source for streaming course gradebook exports"""
+from assignments.models import Assignment, AssignmentGroup
+from .matrix import GradebookMatrix
+from .models import GradingScheme
+from .snapshots import snapshot_entries
+
+EXPORT_BATCH_SIZE = 500
+
+
+def gradebook_export(course):
+    """``(header, rows)`` with one row per active student and one column per assignment.
+
+    Students are read in batches of ``EXPORT_BATCH_SIZE``; each batch is a
+    small ``GradebookMatrix`` over the snapshot rows, so final grades use
+    the same weighting and drop rules as the gradebook endpoints while
+    memory stays bounded by the batch.
+    """
+    assignments = list(Assignment.objects.filter(course=course).order_by('due_date'))
+    groups = list(AssignmentGroup.objects.filter(course=course))
+    scheme = GradingScheme.for_course(course)
+    header = (
+        ['membership_id', 'user_id', 'user_email', 'user_name']
+        + [f'{assignment.title} [{assignment.id}]' for assignment in assignments]
+        + ['final_percentage', 'final_letter_grade']
+    )
+
+    def rows():
+        membership_ids = list(
+            GradebookMatrix.student_memberships(course).order_by('id').values_list('id', flat=True)
+        )
+        for start in range(0, len(membership_ids), EXPORT_BATCH_SIZE):
+            memberships = list(
+                GradebookMatrix.student_memberships(course).filter(
+                    id__in=membership_ids[start:start + EXPORT_BATCH_SIZE]
+                ).select_related('user', 'gradebook_snapshot').order_by('id')
+            )
+            matrix = GradebookMatrix(
+                course, memberships, assignments, snapshot_entries(course, memberships),
+                groups=groups, scheme=scheme,
+            )
+            for membership, cells, final_grade in zip(
+                matrix.memberships, matrix.cells, matrix.final_grade_rows()
+            ):
+                yield (
+                    [membership.id, membership.user.id, membership.user.email,
+                     membership.user.get_full_name()]
+                    + [None if cell is None else cell[0] for cell in cells]
+                    + [final_grade['percentage'], final_grade['letter_grade']]
+                )
+
+    return header, rows()
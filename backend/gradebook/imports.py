@@ -0,0 +1,176 @@
+"""Streaming CSV gradebook imports"""
+import csv
+import io
+
+from rest_framework import serializers
+
+from assignments.models import Assignment
+from courses.models import CourseMembership
+from .bulk import upsert_grade_entries
+from .models import GradeEntry
+
+STUDENT_COLUMNS = ('membership_id', 'user_email')
+REQUIRED_COLUMNS = ('assignment_id', 'grade')
+# Only the first errors are echoed back; the total is always reported
+MAX_REPORTED_ERRORS = 1000
+
+_grade_field = serializers.DecimalField(max_digits=5, decimal_places=2)
+_comments_field = serializers.CharField(allow_blank=True, required=False)
+
+
+class GradeImportError(ValueError):
+    """Raised when the uploaded file cannot be read as a grade import at all"""
+
+
+class GradeImport:
+    """Parse, validate and apply one CSV of grades for a course.
+
+    One row per grade, with an ``assignment_id`` and ``grade`` column,
+    the student as ``membership_id`` or ``user_email`` and optional
+    ``comments``. The course's student memberships, assignments and
+    existing grade pairs are loaded once up front; rows are then read
+    from the upload one at a time, checked against those lookups and
+    ``points_possible``, and the valid ones are streamed into
+    ``upsert_grade_entries``. Rows that fail are skipped and reported by
+    line number.
+    """
+
+    def __init__(self, course, grader):
+        self.course = course
+        self.grader = grader
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self.error_count = 0
+
+    def _load_lookups(self):
+        students = CourseMembership.objects.filter(course=self.course, role='student')
+        self.memberships = {}
+        self.membership_by_email = {}
+        for membership_id, email in students.values_list('id', 'user__email'):
+            self.memberships[membership_id] = email
+            self.membership_by_email[email.lower()] = membership_id
+        self.points_possible = dict(
+            Assignment.objects.filter(course=self.course).values_list('id', 'points_possible')
+        )
+        self.existing = set(
+            GradeEntry.objects.filter(assignment__course=self.course).values_list(
+                'membership_id', 'assignment_id'
+            )
+        )
+        self.seen = {}
+
+    def _reject(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': line, 'errors': errors})
+
+    def _resolve_student(self, row, errors):
+        membership_id = (row.get('membership_id') or '').strip()
+        if membership_id:
+            if not membership_id.isdigit() or int(membership_id) not in self.memberships:
+                errors['membership_id'] = 'No student with this membership ID in the course.'
+                return None
+            return int(membership_id)
+        email = (row.get('user_email') or '').strip().lower()
+        if not email:
+            errors['membership_id'] = 'Either membership_id or user_email is required.'
+            return None
+        if email not in self.membership_by_email:
+            errors['user_email'] = 'No student with this email in the course.'
+            return None
+        return self.membership_by_email[email]
+
+    def _validate(self, line, row):
+        """Return an unsaved ``GradeEntry`` for a valid row, or record its errors"""
+        errors = {}
+        membership_id = self._resolve_student(row, errors)
+
+        assignment_id = (row.get('assignment_id') or '').strip()
+        points_possible = None
+        if not assignment_id.isdigit() or int(assignment_id) not in self.points_possible:
+            errors['assignment_id'] = 'No assignment with this ID in the course.'
+        else:
+            assignment_id = int(assignment_id)
+            points_possible = self.points_possible[assignment_id]
+
+        try:
+            grade = _grade_field.run_validation((row.get('grade') or '').strip())
+        except serializers.ValidationError as exc:
+            errors['grade'] = exc.detail[0]
+        else:
+            if points_possible is not None and grade > points_possible:
+                errors['grade'] = f'Grade cannot exceed {points_possible} points.'
+
+        comments = _comments_field.run_validation(row.get('comments') or '')
+
+        if not errors:
+            key = (membership_id, assignment_id)
+            if key in self.seen:
+                errors['assignment_id'] = f'Duplicate grade for this student, first given on row {self.seen[key]}.'
+            else:
+                self.seen[key] = line
+
+        if errors:
+            self._reject(line, errors)
+            return None
+
+        if key in self.existing:
+            self.updated += 1
+        else:
+            self.created += 1
+        return GradeEntry(
+            membership_id=membership_id,
+            assignment_id=assignment_id,
+            grade=grade,
+            graded_by=self.grader,
+            comments=comments,
+        )
+
+    def _entries(self, reader):
+        for row in reader:
+            self.rows += 1
+            if None in row:
+                self._reject(reader.line_num, {'non_field_errors': 'Row has more cells than the header.'})
+                continue
+            entry = self._validate(reader.line_num, row)
+            if entry is not None:
+                yield entry
+
+    def run(self, upload, dry_run=False):
+        """Import the rows of a binary file object; returns the report"""
+        text = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+        reader = csv.DictReader(text)
+        try:
+            header = [name.strip() for name in reader.fieldnames or ()]
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise GradeImportError(f'Could not read the CSV header: {exc}')
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if missing:
+            raise GradeImportError(f"Missing required column(s): {', '.join(missing)}.")
+        if not any(name in header for name in STUDENT_COLUMNS):
+            raise GradeImportError(f"One of these columns is required: {', '.join(STUDENT_COLUMNS)}.")
+        reader.fieldnames = header
+
+        self._load_lookups()
+        entries = self._entries(reader)
+        try:
+            if dry_run:
+                for _ in entries:
+                    pass
+            else:
+                upsert_grade_entries(self.course, entries)
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise GradeImportError(f'Could not read row {reader.line_num}: {exc}')
+        return self.report(dry_run)
+
+    def report(self, dry_run=False):
+        return {
+            'dry_run': dry_run,
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
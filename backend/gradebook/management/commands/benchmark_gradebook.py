@@ -0,0 +1,109 @@
+"""Benchmark query counts and latency of the course gradebook builder"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import Account
+from assignments.models import Assignment, AssignmentGroup
+from courses.models import Course, CourseMembership
+from gradebook.matrix import GradebookMatrix
+from gradebook.models import GradeEntry, GradingScheme
+from gradebook.snapshots import rebuild_snapshots
+from users.models import User
+
+
+class _Rollback(Exception):
+    """Raised to discard the synthetic benchmark data"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Build synthetic courses of increasing roster size and report how many '
+        'queries and how long the course gradebook takes to build. All data is '
+        'created inside a transaction that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rosters', type=int, nargs='+', default=[10, 100, 400],
+            help='Student counts to benchmark (default: 10 100 400)',
+        )
+        parser.add_argument(
+            '--assignments', type=int, default=60,
+            help='Assignments per course (default: 60)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'source':>10} {'students':>10} {'assignments':>12} {'queries':>8} {'ms':>10}"
+        )
+        try:
+            with transaction.atomic():
+                account = Account.objects.create(
+                    name='Gradebook Benchmark', slug='gradebook-benchmark'
+                )
+                for size in options['rosters']:
+                    course = self._build_course(account, size, options['assignments'])
+                    rebuild_snapshots(course)
+                    for source, build in [
+                        ('entries', lambda c: GradebookMatrix.for_course(c).to_response()),
+                        ('snapshots', lambda c: GradebookMatrix.from_snapshots(c).to_response()),
+                        ('totals', lambda c: GradebookMatrix.from_snapshots(c).totals_response()),
+                    ]:
+                        with CaptureQueriesContext(connection) as ctx:
+                            started = time.perf_counter()
+                            build(course)
+                            elapsed = (time.perf_counter() - started) * 1000
+                        self.stdout.write(
+                            f"{source:>10} {size:>10} {options['assignments']:>12} "
+                            f"{len(ctx.captured_queries):>8} {elapsed:>10.1f}"
+                        )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _build_course(self, account, students, assignments):
+        """Create a course with a full grade matrix for the given sizes"""
+        course = Course.unscoped.create(
+            account=account, code=f'BENCH-{students}', name=f'Benchmark {students}'
+        )
+        groups = AssignmentGroup.objects.bulk_create([
+            AssignmentGroup(course=course, name='Homework', weight=40, drop_lowest=2),
+            AssignmentGroup(course=course, name='Exams', weight=60),
+        ])
+        GradingScheme.objects.create(course=course, apply_group_weights=True)
+
+        users = [
+            User(account=account, email=f'bench-{students}-{i}@example.com')
+            for i in range(students)
+        ]
+        for user in users:
+            user.set_unusable_password()
+        users = User.objects.bulk_create(users)
+
+        memberships = CourseMembership.objects.bulk_create([
+            CourseMembership(user=user, course=course, role='student')
+            for user in users
+        ])
+
+        due = timezone.now() + timedelta(days=30)
+        items = Assignment.objects.bulk_create([
+            Assignment(
+                course=course, type='homework', title=f'Assignment {j}',
+                due_date=due + timedelta(days=j), points_possible=100,
+                group=groups[j % 2],
+            )
+            for j in range(assignments)
+        ])
+
+        GradeEntry.objects.bulk_create([
+            GradeEntry(membership=m, assignment=a, grade=(i * 7 + j * 3) % 101)
+            for i, m in enumerate(memberships)
+            for j, a in enumerate(items)
+        ], batch_size=2000)
+
+        return course
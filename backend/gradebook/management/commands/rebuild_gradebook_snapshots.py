@@ -0,0 +1,36 @@
+"""Rebuild materialized gradebook snapshot rows from grade entries"""
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import Course
+from gradebook.snapshots import rebuild_snapshots
+from gradebook.stats import invalidate_course_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild GradebookSnapshot rows from grade_entries. Use after restoring '
+        'data or if snapshots are suspected to have drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course', type=int, nargs='+', dest='course_ids',
+            help='Only rebuild these course IDs (default: every course)',
+        )
+
+    def handle(self, *args, **options):
+        courses = Course.unscoped.all().order_by('id')
+        if options['course_ids']:
+            courses = courses.filter(id__in=options['course_ids'])
+            missing = set(options['course_ids']) - set(courses.values_list('id', flat=True))
+            if missing:
+                raise CommandError(f"Unknown course IDs: {', '.join(map(str, sorted(missing)))}")
+
+        total = 0
+        for course in courses.iterator():
+            rows = rebuild_snapshots(course)
+            invalidate_course_stats(course.id)
+            total += rows
+            self.stdout.write(f'{course.code}: {rows} snapshot rows')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} snapshot rows'))
@@ -0,0 +1,317 @@
+"""In-memory student x assignment grade matrix for course gradebooks"""
+import numpy as np
+
+from courses.models import CourseMembership
+from assignments.models import Assignment, AssignmentGroup
+from .models import GradeEntry, GradingScheme, calculate_percentage, letter_grade_for_percentage
+from .snapshots import snapshot_entries
+from .totals import compute_final_grades, letter_indices, scheme_letters
+
+
+class GradebookMatrix:
+    """Dense student x assignment grade matrix for a single course.
+
+    Rows are the course's active student memberships, columns are its
+    assignments ordered by due date. Each cell holds a ``(grade, graded_at)``
+    tuple, or ``None`` when the student has no grade for that assignment.
+    Loading a matrix costs five queries regardless of roster size, or four
+    when it is read from the materialized ``GradebookSnapshot`` rows; two of
+    those load the course's assignment groups and grading scheme.
+    """
+
+    def __init__(self, course, memberships, assignments, entries, groups=(), scheme=None):
+        self.course = course
+        self.memberships = list(memberships)
+        self.assignments = list(assignments)
+        self.groups = list(groups)
+        self.scheme = scheme or GradingScheme(course=course)
+        self.cutoffs = self.scheme.get_cutoffs()
+        self._final_grades = None
+        self.row_index = {m.id: i for i, m in enumerate(self.memberships)}
+        self.column_index = {a.id: j for j, a in enumerate(self.assignments)}
+        self.cells = [[None] * len(self.assignments) for _ in self.memberships]
+        self._filled = []
+
+        for membership_id, assignment_id, grade, graded_at in entries:
+            i = self.row_index.get(membership_id)
+            j = self.column_index.get(assignment_id)
+            if i is None or j is None:
+                continue
+            self.cells[i][j] = (grade, graded_at)
+            self._filled.append((i, j, float(grade)))
+
+    @classmethod
+    def student_memberships(cls, course, user_id=None):
+        """The course's active student memberships (the matrix rows), optionally one student's"""
+        memberships = CourseMembership.objects.filter(
+            course=course, role='student', status='active'
+        )
+        if user_id is not None:
+            memberships = memberships.filter(user_id=user_id)
+        return memberships
+
+    @classmethod
+    def for_course(cls, course, user_id=None):
+        """Load memberships, assignments and grade entries for a course.
+
+        Passing ``user_id`` restricts the rows to that student.
+        """
+        memberships = cls.student_memberships(course, user_id).select_related('user')
+
+        assignments = Assignment.objects.filter(course=course).order_by('due_date')
+
+        entries = GradeEntry.objects.filter(
+            assignment__course=course
+        ).order_by().values_list('membership_id', 'assignment_id', 'grade', 'graded_at')
+        if user_id is not None:
+            entries = entries.filter(membership__user_id=user_id)
+
+        return cls(
+            course, memberships, assignments, entries,
+            groups=AssignmentGroup.objects.filter(course=course),
+            scheme=GradingScheme.for_course(course),
+        )
+
+    @classmethod
+    def from_snapshots(cls, course, user_id=None):
+        """Load the matrix from materialized snapshot rows instead of grade entries"""
+        memberships = list(
+            cls.student_memberships(course, user_id).select_related('user', 'gradebook_snapshot')
+        )
+
+        assignments = Assignment.objects.filter(course=course).order_by('due_date')
+
+        return cls(
+            course, memberships, assignments, snapshot_entries(course, memberships),
+            groups=AssignmentGroup.objects.filter(course=course),
+            scheme=GradingScheme.for_course(course),
+        )
+
+    def as_arrays(self):
+        """Return ``(grades, points_possible)`` as float arrays.
+
+        ``grades`` has one row per membership and one column per assignment,
+        with NaN where no grade has been entered.
+        """
+        grades = np.full((len(self.memberships), len(self.assignments)), np.nan)
+        if self._filled:
+            rows, columns, values = zip(*self._filled)
+            grades[list(rows), list(columns)] = values
+        points = np.array([a.points_possible for a in self.assignments], dtype=float)
+        return grades, points
+
+    def final_grades(self):
+        """Return ``(group_percentages, final_percentages, dropped)`` for all students.
+
+        Computed once per matrix in a single vectorized pass; see
+        ``gradebook.totals.compute_final_grades``.
+        """
+        if self._final_grades is None:
+            grades, points = self.as_arrays()
+            positions = {group.id: g for g, group in enumerate(self.groups)}
+            group_index = np.array(
+                [positions.get(a.group_id, -1) for a in self.assignments], dtype=int
+            )
+            self._final_grades = compute_final_grades(
+                grades, points, group_index,
+                [(group.weight, group.drop_lowest) for group in self.groups],
+                self.scheme.apply_group_weights,
+            )
+        return self._final_grades
+
+    def final_letters(self, percentages):
+        """Scheme letter grades for an array of percentages (None where NaN)"""
+        letters = scheme_letters(self.cutoffs)
+        indices = letter_indices(np.nan_to_num(percentages, nan=-1.0), self.cutoffs)
+        return [
+            None if np.isnan(pct) else letters[k]
+            for pct, k in zip(np.atleast_1d(percentages), np.atleast_1d(indices))
+        ]
+
+    def final_grade_rows(self):
+        """Per-student ``final_grade`` payloads, in membership order"""
+        group_pct, final, dropped = self.final_grades()
+        letters = self.final_letters(final)
+        rows = []
+        for i in range(len(self.memberships)):
+            rows.append({
+                'percentage': None if np.isnan(final[i]) else round(float(final[i]), 2),
+                'letter_grade': letters[i],
+                'groups': [
+                    {
+                        'group_id': group.id,
+                        'percentage': (
+                            None if np.isnan(group_pct[i, g]) else round(float(group_pct[i, g]), 2)
+                        ),
+                    }
+                    for g, group in enumerate(self.groups)
+                ],
+                'dropped_assignment_ids': [
+                    self.assignments[j].id for j in np.flatnonzero(dropped[i])
+                ],
+            })
+        return rows
+
+    def group_data(self):
+        """Assignment group headers in the gradebook response shape"""
+        return [
+            {
+                'id': group.id,
+                'name': group.name,
+                'weight': float(group.weight),
+                'drop_lowest': group.drop_lowest,
+            }
+            for group in self.groups
+        ]
+
+    def scheme_data(self):
+        """Grading scheme summary in the gradebook response shape"""
+        return {
+            'cutoffs': [[letter, minimum] for letter, minimum in self.cutoffs],
+            'apply_group_weights': self.scheme.apply_group_weights,
+        }
+
+    def assignment_data(self):
+        """Column headers in the gradebook response shape"""
+        return [
+            {
+                'id': a.id,
+                'title': a.title,
+                'type': a.type,
+                'due_date': a.due_date,
+                'points_possible': a.points_possible,
+                'group_id': a.group_id,
+            }
+            for a in self.assignments
+        ]
+
+    def student_data(self, membership, row, final_grade=None):
+        """Single gradebook row in the gradebook response shape"""
+        grades = []
+        for assignment, cell in zip(self.assignments, row):
+            if cell is None:
+                grades.append({
+                    'assignment_id': assignment.id,
+                    'assignment_title': assignment.title,
+                    'grade': None,
+                    'points_possible': assignment.points_possible,
+                    'percentage': None,
+                    'letter_grade': None,
+                    'graded_at': None,
+                })
+                continue
+
+            grade, graded_at = cell
+            percentage = calculate_percentage(grade, assignment.points_possible)
+            grades.append({
+                'assignment_id': assignment.id,
+                'assignment_title': assignment.title,
+                'grade': float(grade),
+                'points_possible': assignment.points_possible,
+                'percentage': percentage,
+                'letter_grade': (
+                    letter_grade_for_percentage(percentage, self.cutoffs)
+                    if assignment.points_possible else 'N/A'
+                ),
+                'graded_at': graded_at,
+            })
+
+        return {
+            'membership_id': membership.id,
+            'user_id': membership.user.id,
+            'user_email': membership.user.email,
+            'user_name': membership.user.get_full_name(),
+            'grades': grades,
+            'final_grade': final_grade,
+        }
+
+    def to_response(self):
+        """Serialize the matrix in the course gradebook endpoint shape"""
+        return {
+            'course': {'id': self.course.id, 'code': self.course.code, 'name': self.course.name},
+            'assignment_groups': self.group_data(),
+            'grading_scheme': self.scheme_data(),
+            'assignments': self.assignment_data(),
+            'students': [
+                self.student_data(membership, row, final_grade)
+                for membership, row, final_grade in zip(
+                    self.memberships, self.cells, self.final_grade_rows()
+                )
+            ],
+        }
+
+    def totals_response(self):
+        """Serialize only the course totals, without per-assignment cells"""
+        return {
+            'course': {'id': self.course.id, 'code': self.course.code, 'name': self.course.name},
+            'assignment_groups': self.group_data(),
+            'grading_scheme': self.scheme_data(),
+            'students': [
+                {
+                    'membership_id': membership.id,
+                    'user_id': membership.user.id,
+                    'user_email': membership.user.email,
+                    'user_name': membership.user.get_full_name(),
+                    'final_grade': final_grade,
+                }
+                for membership, final_grade in zip(self.memberships, self.final_grade_rows())
+            ],
+        }
+
+
+def student_final_grades(courses, user_id):
+    """``{course_id: (membership_id, final_grade)}`` for one student across ``courses``.
+
+    Memberships with their snapshots, assignments, groups and grading
+    schemes of every course are loaded in four queries. The totals are
+    then computed in one vectorized pass over a block matrix with one row
+    per membership, each row graded only in its own course's columns.
+    The ``final_grade`` payloads match ``GradebookMatrix.final_grade_rows``.
+    """
+    courses = {course.id: course for course in courses}
+    memberships = list(CourseMembership.objects.filter(
+        course_id__in=list(courses), user_id=user_id, role='student', status='active'
+    ).select_related('gradebook_snapshot').order_by('course_id'))
+    assignments = list(Assignment.objects.filter(course_id__in=list(courses)).order_by('course_id', 'due_date'))
+    groups = list(AssignmentGroup.objects.filter(course_id__in=list(courses)).order_by('course_id', 'order', 'id'))
+    schemes = {scheme.course_id: scheme for scheme in GradingScheme.objects.filter(course_id__in=list(courses))}
+
+    column_index = {a.id: j for j, a in enumerate(assignments)}
+    group_positions = {group.id: g for g, group in enumerate(groups)}
+    grades = np.full((len(memberships), len(assignments)), np.nan)
+    for i, membership in enumerate(memberships):
+        for _, assignment_id, grade, _ in snapshot_entries(courses[membership.course_id], [membership]):
+            j = column_index.get(assignment_id)
+            if j is not None and assignments[j].course_id == membership.course_id:
+                grades[i, j] = float(grade)
+    points = np.array([a.points_possible for a in assignments], dtype=float)
+    group_index = np.array([group_positions.get(a.group_id, -1) for a in assignments], dtype=int)
+    group_rules = [(group.weight, group.drop_lowest) for group in groups]
+
+    # Schemes differ per course in whether group weights apply, so both finals are computed
+    group_pct, unweighted, dropped = compute_final_grades(grades, points, group_index, group_rules, False)
+    _, weighted, _ = compute_final_grades(grades, points, group_index, group_rules, True)
+
+    results = {}
+    for i, membership in enumerate(memberships):
+        scheme = schemes.get(membership.course_id) or GradingScheme(course_id=membership.course_id)
+        final = weighted[i] if scheme.apply_group_weights else unweighted[i]
+        cutoffs = scheme.get_cutoffs()
+        letter = None
+        if not np.isnan(final):
+            letter = scheme_letters(cutoffs)[int(letter_indices(final, cutoffs))]
+        results[membership.course_id] = (membership.id, {
+            'percentage': None if np.isnan(final) else round(float(final), 2),
+            'letter_grade': letter,
+            'groups': [
+                {
+                    'group_id': group.id,
+                    'percentage': (
+                        None if np.isnan(group_pct[i, g]) else round(float(group_pct[i, g]), 2)
+                    ),
+                }
+                for g, group in enumerate(groups) if group.course_id == membership.course_id
+            ],
+            'dropped_assignment_ids': [assignments[j].id for j in np.flatnonzero(dropped[i])],
+        })
+    return results
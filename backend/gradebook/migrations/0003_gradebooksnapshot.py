@@ -0,0 +1,35 @@
+# Generated by Django 4.2.9 on 2026-10-17 00:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_announcement'),
+        ('gradebook', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradebookSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grades', models.JSONField(blank=True, default=dict)),
+                ('total_points', models.DecimalField(decimal_places=2, default=0, max_digits=9)),
+                ('total_points_possible', models.IntegerField(default=0)),
+                ('percentage', models.FloatField(blank=True, null=True)),
+                ('letter_grade', models.CharField(blank=True, default='', max_length=5)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gradebook_snapshots', to='courses.course')),
+                ('membership', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='gradebook_snapshot', to='courses.coursemembership')),
+            ],
+            options={
+                'verbose_name': 'Gradebook Snapshot',
+                'verbose_name_plural': 'Gradebook Snapshots',
+                'db_table': 'gradebook_snapshots',
+                'indexes': [models.Index(fields=['course'], name='gradebook_s_course__208cbc_idx')],
+            },
+        ),
+    ]
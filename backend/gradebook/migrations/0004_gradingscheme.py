@@ -0,0 +1,30 @@
+# Generated by Django 4.2.9 on 2026-10-17 00:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_announcement'),
+        ('gradebook', '0003_gradebooksnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingScheme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cutoffs', models.JSONField(blank=True, default=list)),
+                ('apply_group_weights', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='grading_scheme', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Grading Scheme',
+                'verbose_name_plural': 'Grading Schemes',
+                'db_table': 'grading_schemes',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-17 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gradebook', '0004_gradingscheme'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gradeentry',
+            index=models.Index(fields=['-graded_at', '-id'], name='grade_entri_graded__90e21b_idx'),
+        ),
+    ]
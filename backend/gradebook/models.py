@@ -1,9 +1,68 @@
 from django.db import models
-from courses.models import CourseMembership
+from courses.models import Course, CourseMembership
 from assignments.models import Assignment
 from users.models import User
 
 
+# Minimum percentage for each letter grade, highest first; anything lower is an F
+LETTER_GRADE_CUTOFFS = [('A', 90), ('B', 80), ('C', 70), ('D', 60)]
+
+
+def calculate_percentage(grade, points_possible):
+    """Get percentage score for a grade out of points_possible"""
+    if not points_possible:
+        return 0
+    return (float(grade) / float(points_possible)) * 100
+
+
+def letter_grade_for_percentage(percentage, cutoffs=LETTER_GRADE_CUTOFFS):
+    """Map a percentage onto letter grade cutoffs (standard cutoffs by default)"""
+    for letter, cutoff in cutoffs:
+        if percentage >= cutoff:
+            return letter
+    return 'F'
+
+
+class GradingScheme(models.Model):
+    """Per-course letter grade cutoffs and category weighting rules"""
+
+    course = models.OneToOneField(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='grading_scheme'
+    )
+    # [[letter, minimum percentage], ...] highest first; below the last is an F
+    cutoffs = models.JSONField(default=list, blank=True)
+    apply_group_weights = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'grading_schemes'
+        verbose_name = 'Grading Scheme'
+        verbose_name_plural = 'Grading Schemes'
+
+    def __str__(self):
+        return f"Grading scheme for {self.course.code}"
+
+    def get_cutoffs(self):
+        """Cutoffs as (letter, minimum) pairs, falling back to the standard scale"""
+        if not self.cutoffs:
+            return LETTER_GRADE_CUTOFFS
+        return [(letter, float(minimum)) for letter, minimum in self.cutoffs]
+
+    @classmethod
+    def for_course(cls, course):
+        """Return the course's scheme, or an unsaved default when none exists"""
+        scheme = cls.objects.filter(course=course).first()
+        return scheme or cls(course=course)
+
+    @classmethod
+    def cutoffs_for_course(cls, course_id):
+        """Cutoffs for a course by ID without loading the course"""
+        scheme = cls.objects.filter(course_id=course_id).first()
+        return scheme.get_cutoffs() if scheme else LETTER_GRADE_CUTOFFS
+
+
 class GradeEntry(models.Model):
     """Grade entry for student assignments"""
     
@@ -39,31 +98,59 @@ class GradeEntry(models.Model):
             models.Index(fields=['membership']),
             models.Index(fields=['assignment']),
             models.Index(fields=['graded_at']),
+            models.Index(fields=['-graded_at', '-id']),
         ]
     
     def __str__(self):
         return f"{self.membership.user.email} - {self.assignment.title}: {self.grade}"
     
-    def calculate_letter_grade(self):
-        """Calculate letter grade based on percentage"""
+    def calculate_letter_grade(self, cutoffs=None):
+        """Calculate letter grade based on percentage and the course grading scheme"""
         if not self.assignment.points_possible:
             return 'N/A'
-        
-        percentage = (float(self.grade) / float(self.assignment.points_possible)) * 100
-        
-        if percentage >= 90:
-            return 'A'
-        elif percentage >= 80:
-            return 'B'
-        elif percentage >= 70:
-            return 'C'
-        elif percentage >= 60:
-            return 'D'
-        else:
-            return 'F'
+        if cutoffs is None:
+            cutoffs = GradingScheme.cutoffs_for_course(self.assignment.course_id)
+        return letter_grade_for_percentage(self.get_percentage(), cutoffs)
     
     def get_percentage(self):
         """Get percentage score"""
-        if not self.assignment.points_possible:
-            return 0
-        return (float(self.grade) / float(self.assignment.points_possible)) * 100
+        return calculate_percentage(self.grade, self.assignment.points_possible)
+
+
+class GradebookSnapshot(models.Model):
+    """Materialized gradebook row for one course membership.
+
+    ``grades`` packs every grade entry of the membership as
+    ``{assignment_id: [grade, points_possible, graded_at]}`` so the course
+    gradebook can be read without touching ``grade_entries``. Rows are kept
+    current by ``gradebook.snapshots`` whenever a grade entry is written.
+    """
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='gradebook_snapshots',
+        db_index=True
+    )
+    membership = models.OneToOneField(
+        CourseMembership,
+        on_delete=models.CASCADE,
+        related_name='gradebook_snapshot'
+    )
+    grades = models.JSONField(default=dict, blank=True)
+    total_points = models.DecimalField(max_digits=9, decimal_places=2, default=0)
+    total_points_possible = models.IntegerField(default=0)
+    percentage = models.FloatField(null=True, blank=True)
+    letter_grade = models.CharField(max_length=5, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'gradebook_snapshots'
+        verbose_name = 'Gradebook Snapshot'
+        verbose_name_plural = 'Gradebook Snapshots'
+        indexes = [
+            models.Index(fields=['course']),
+        ]
+
+    def __str__(self):
+        return f"Snapshot for membership {self.membership_id}: {self.percentage}"
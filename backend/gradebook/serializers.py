@@ -1,12 +1,13 @@
 """Serializers for gradebook app"""
 from rest_framework import serializers
-from .models import GradeEntry
+from config.serializers import DynamicFieldsMixin
+from .models import GradeEntry, GradingScheme
 from courses.models import CourseMembership
 from assignments.models import Assignment
 from users.models import User
 
 
-class GradeEntrySerializer(serializers.ModelSerializer):
+class GradeEntrySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for GradeEntry model"""
     
     membership_info = serializers.SerializerMethodField()
@@ -35,6 +36,22 @@ class GradeEntrySerializer(serializers.ModelSerializer):
             'comments', 'letter_grade', 'percentage'
         ]
         read_only_fields = ['id', 'graded_at', 'membership', 'assignment', 'graded_by']
+        expandable_fields = ['membership_info', 'assignment_info', 'graded_by_info']
+
+    @staticmethod
+    def setup_eager_loading(queryset, fields=None):
+        """Join only the relations the requested grade fields read"""
+        def wants(name):
+            return fields is None or name in fields
+
+        related = []
+        if wants('membership_info'):
+            related += ['membership__user', 'membership__course']
+        if any(wants(name) for name in ('assignment_info', 'letter_grade', 'percentage')):
+            related.append('assignment')
+        if wants('graded_by_info'):
+            related.append('graded_by')
+        return queryset.select_related(*related) if related else queryset
     
     def get_membership_info(self, obj):
         """Get membership information"""
@@ -70,7 +87,12 @@ class GradeEntrySerializer(serializers.ModelSerializer):
     
     def get_letter_grade(self, obj):
         """Calculate letter grade from model method"""
-        return obj.calculate_letter_grade()
+        # Look up each course's grading scheme once per serialization
+        cutoffs = self.context.setdefault('grading_cutoffs', {})
+        course_id = obj.assignment.course_id
+        if course_id not in cutoffs:
+            cutoffs[course_id] = GradingScheme.cutoffs_for_course(course_id)
+        return obj.calculate_letter_grade(cutoffs[course_id])
     
     def get_percentage(self, obj):
         """Calculate percentage from model method"""
@@ -107,6 +129,7 @@ class GradeEntrySerializer(serializers.ModelSerializer):
 class StudentGradesSerializer(serializers.Serializer):
     """Serializer for student grades summary"""
     
+    membership_id = serializers.IntegerField()
     user_id = serializers.IntegerField()
     user_email = serializers.EmailField()
     user_name = serializers.CharField()
@@ -114,5 +137,58 @@ class StudentGradesSerializer(serializers.Serializer):
     course_name = serializers.CharField()
     total_assignments = serializers.IntegerField()
     graded_assignments = serializers.IntegerField()
-    average_grade = serializers.FloatField()
-    average_percentage = serializers.FloatField()
+    average_grade = serializers.FloatField(allow_null=True)
+    average_percentage = serializers.FloatField(allow_null=True)
+    median_percentage = serializers.FloatField(allow_null=True)
+    stddev_percentage = serializers.FloatField(allow_null=True)
+    total_points = serializers.FloatField()
+    total_points_possible = serializers.FloatField()
+    percentage = serializers.FloatField(allow_null=True)
+    letter_grade = serializers.CharField(allow_null=True)
+    final_percentage = serializers.FloatField(allow_null=True)
+    final_letter_grade = serializers.CharField(allow_null=True)
+
+
+class GradingSchemeSerializer(serializers.ModelSerializer):
+    """Serializer for a course's grading scheme"""
+
+    class Meta:
+        model = GradingScheme
+        fields = ['id', 'course', 'cutoffs', 'apply_group_weights', 'updated_at']
+        read_only_fields = ['id', 'course', 'updated_at']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['cutoffs'] = [[letter, minimum] for letter, minimum in instance.get_cutoffs()]
+        return data
+
+    def validate_cutoffs(self, value):
+        """Cutoffs must be unique letters with strictly descending 0-100 minimums"""
+        if not isinstance(value, list):
+            raise serializers.ValidationError('Cutoffs must be a list of [letter, minimum] pairs.')
+
+        cleaned = []
+        for item in value:
+            if not isinstance(item, (list, tuple)) or len(item) != 2:
+                raise serializers.ValidationError('Each cutoff must be a [letter, minimum] pair.')
+            letter, minimum = item
+            if not isinstance(letter, str) or not letter.strip() or len(letter.strip()) > 5:
+                raise serializers.ValidationError('Letters must be 1-5 characters.')
+            try:
+                minimum = float(minimum)
+            except (TypeError, ValueError):
+                raise serializers.ValidationError(f'Minimum for {letter} must be a number.')
+            if not 0 <= minimum <= 100:
+                raise serializers.ValidationError(f'Minimum for {letter} must be between 0 and 100.')
+            cleaned.append([letter.strip(), minimum])
+
+        letters = [letter for letter, _ in cleaned]
+        if len(set(letters)) != len(letters):
+            raise serializers.ValidationError('Letters must be unique.')
+        minimums = [minimum for _, minimum in cleaned]
+        if any(later >= earlier for earlier, later in zip(minimums, minimums[1:])):
+            raise serializers.ValidationError('Cutoffs must be ordered from highest to lowest minimum.')
+        # Scores below the last cutoff are an F, so an explicit F must be the 0% floor
+        if 'F' in letters and cleaned[-1] != ['F', 0]:
+            raise serializers.ValidationError('F may only be used as the last cutoff, at 0.')
+        return cleaned
@@ -0,0 +1,81 @@
+"""Signal handlers that keep derived gradebook data in step with grade writes"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from assignments.models import Assignment, AssignmentGroup, Quiz, Test, Homework
+from courses.models import Course, CourseMembership
+from .models import GradeEntry, GradingScheme
+from .snapshots import discard_grade, rebuild_snapshots, record_grade, refresh_assignment_points
+from .stats import invalidate_course_stats
+
+
+@receiver(post_save, sender=GradeEntry)
+def grade_entry_saved(sender, instance, **kwargs):
+    """Fold a written grade into its snapshot row and invalidate statistics"""
+    record_grade(instance)
+    invalidate_course_stats(instance.assignment.course_id)
+
+
+@receiver(post_delete, sender=GradeEntry)
+def grade_entry_deleted(sender, instance, **kwargs):
+    """Drop a removed grade from its snapshot row and invalidate statistics"""
+    discard_grade(instance.membership_id, instance.assignment_id)
+    try:
+        course_id = instance.assignment.course_id
+    except Assignment.DoesNotExist:
+        return
+    invalidate_course_stats(course_id)
+
+
+@receiver(pre_save, sender=Assignment)
+@receiver(pre_save, sender=Quiz)
+@receiver(pre_save, sender=Test)
+@receiver(pre_save, sender=Homework)
+def assignment_saving(sender, instance, update_fields=None, **kwargs):
+    """Note whether the save changes the stored points_possible"""
+    if instance._state.adding or (update_fields is not None and 'points_possible' not in update_fields):
+        instance._points_changed = False
+        return
+    stored = sender._base_manager.filter(pk=instance.pk).values_list('points_possible', flat=True).first()
+    instance._points_changed = stored is not None and stored != instance.points_possible
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_save, sender=Quiz)
+@receiver(post_save, sender=Test)
+@receiver(post_save, sender=Homework)
+def assignment_saved(sender, instance, created, **kwargs):
+    """Keep packed points_possible in snapshot rows in step with the assignment.
+
+    Only saves that change the points rewrite the snapshots, so ordinary
+    edits (title, dates) do not lock the course's whole gradebook.
+    """
+    if not created and getattr(instance, '_points_changed', True):
+        refresh_assignment_points(instance)
+
+
+@receiver([post_save, post_delete], sender=Assignment)
+@receiver([post_save, post_delete], sender=Quiz)
+@receiver([post_save, post_delete], sender=Test)
+@receiver([post_save, post_delete], sender=Homework)
+@receiver([post_save, post_delete], sender=CourseMembership)
+@receiver([post_save, post_delete], sender=AssignmentGroup)
+def gradebook_shape_changed(sender, instance, **kwargs):
+    """Invalidate cached course statistics when columns or rows change"""
+    invalidate_course_stats(instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=GradingScheme)
+def grading_scheme_changed(sender, instance, **kwargs):
+    """Re-letter snapshot rows and invalidate statistics under the new cutoffs"""
+    course_id = instance.course_id
+    invalidate_course_stats(course_id)
+
+    def rebuild():
+        # Deferred so a scheme deleted along with its course is a no-op
+        course = Course.unscoped.filter(pk=course_id).first()
+        if course is not None:
+            rebuild_snapshots(course)
+
+    transaction.on_commit(rebuild)
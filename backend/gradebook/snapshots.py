@@ -0,0 +1,161 @@
+"""Maintenance of the materialized per-membership gradebook snapshot"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from courses.models import CourseMembership
+from .models import (
+    LETTER_GRADE_CUTOFFS, GradeEntry, GradebookSnapshot, GradingScheme,
+    calculate_percentage, letter_grade_for_percentage,
+)
+
+
+def pack_grade(grade, points_possible, graded_at):
+    """Encode one grade entry for storage in ``GradebookSnapshot.grades``"""
+    return [str(grade), points_possible, graded_at.isoformat() if graded_at else None]
+
+
+def unpack_grade(packed):
+    """Decode a packed grade into ``(grade, points_possible, graded_at)``"""
+    grade, points_possible, graded_at = packed
+    return Decimal(grade), points_possible, parse_datetime(graded_at) if graded_at else None
+
+
+def apply_totals(snapshot, cutoffs=LETTER_GRADE_CUTOFFS):
+    """Recompute the snapshot's totals and letter grade from its packed grades.
+
+    Totals are raw points; category weights and drop rules are applied by
+    ``GradebookMatrix.final_grades``.
+    """
+    total = Decimal('0')
+    scored = Decimal('0')
+    possible = 0
+    for packed in snapshot.grades.values():
+        grade, points_possible = Decimal(packed[0]), packed[1]
+        total += grade
+        if points_possible:
+            scored += grade
+            possible += points_possible
+
+    snapshot.total_points = total
+    snapshot.total_points_possible = possible
+    if possible:
+        snapshot.percentage = calculate_percentage(scored, possible)
+        snapshot.letter_grade = letter_grade_for_percentage(snapshot.percentage, cutoffs)
+    else:
+        snapshot.percentage = None
+        snapshot.letter_grade = ''
+    return snapshot
+
+
+def record_grade(grade_entry):
+    """Write a saved grade entry into its membership's snapshot row"""
+    membership = grade_entry.membership
+    with transaction.atomic():
+        snapshot = GradebookSnapshot.objects.select_for_update().filter(
+            membership_id=membership.id
+        ).first()
+        if snapshot is None:
+            # No row yet: build it from all of the membership's grades
+            rebuild_snapshots(membership.course, [membership.id])
+            return
+        snapshot.grades[str(grade_entry.assignment_id)] = pack_grade(
+            grade_entry.grade,
+            grade_entry.assignment.points_possible,
+            grade_entry.graded_at,
+        )
+        apply_totals(snapshot, GradingScheme.cutoffs_for_course(snapshot.course_id)).save()
+
+
+def discard_grade(membership_id, assignment_id):
+    """Remove a deleted grade entry from its membership's snapshot row"""
+    with transaction.atomic():
+        snapshot = GradebookSnapshot.objects.select_for_update().filter(
+            membership_id=membership_id
+        ).first()
+        if snapshot is None or snapshot.grades.pop(str(assignment_id), None) is None:
+            return
+        apply_totals(snapshot, GradingScheme.cutoffs_for_course(snapshot.course_id)).save()
+
+
+def refresh_assignment_points(assignment):
+    """Update packed points_possible after an assignment's points change"""
+    key = str(assignment.id)
+    cutoffs = GradingScheme.cutoffs_for_course(assignment.course_id)
+    changed = []
+    with transaction.atomic():
+        snapshots = GradebookSnapshot.objects.select_for_update().filter(
+            course_id=assignment.course_id
+        )
+        for snapshot in snapshots:
+            packed = snapshot.grades.get(key)
+            if packed is None or packed[1] == assignment.points_possible:
+                continue
+            packed[1] = assignment.points_possible
+            changed.append(apply_totals(snapshot, cutoffs))
+        GradebookSnapshot.objects.bulk_update(
+            changed,
+            ['grades', 'total_points', 'total_points_possible', 'percentage', 'letter_grade'],
+            batch_size=500,
+        )
+    return len(changed)
+
+
+def snapshot_entries(course, memberships):
+    """Yield ``(membership_id, assignment_id, grade, graded_at)`` from snapshots.
+
+    ``memberships`` must have ``gradebook_snapshot`` loaded; memberships
+    without a snapshot row yet are rebuilt on the spot.
+    """
+    missing = {m.id: m for m in memberships if not hasattr(m, 'gradebook_snapshot')}
+    if missing:
+        rebuild_snapshots(course, list(missing))
+        for snapshot in GradebookSnapshot.objects.filter(membership_id__in=list(missing)):
+            missing[snapshot.membership_id].gradebook_snapshot = snapshot
+
+    for membership in memberships:
+        for assignment_id, packed in membership.gradebook_snapshot.grades.items():
+            grade, _, graded_at = unpack_grade(packed)
+            yield membership.id, int(assignment_id), grade, graded_at
+
+
+def rebuild_snapshots(course, membership_ids=None):
+    """Rebuild snapshot rows for a course from its grade entries.
+
+    Restricting ``membership_ids`` rebuilds only those rows. Returns the
+    number of rows written.
+    """
+    memberships = CourseMembership.objects.filter(course=course)
+    entries = GradeEntry.objects.filter(membership__course=course)
+    if membership_ids is not None:
+        memberships = memberships.filter(id__in=membership_ids)
+        entries = entries.filter(membership_id__in=membership_ids)
+
+    snapshots = {
+        membership_id: GradebookSnapshot(course_id=course.id, membership_id=membership_id, grades={})
+        for membership_id in memberships.values_list('id', flat=True)
+    }
+    entries = entries.order_by().values_list(
+        'membership_id', 'assignment_id', 'grade', 'assignment__points_possible', 'graded_at'
+    ).iterator(chunk_size=2000)
+    for membership_id, assignment_id, grade, points_possible, graded_at in entries:
+        if membership_id in snapshots:
+            snapshots[membership_id].grades[str(assignment_id)] = pack_grade(
+                grade, points_possible, graded_at
+            )
+
+    cutoffs = GradingScheme.cutoffs_for_course(course.id)
+    rows = [apply_totals(snapshot, cutoffs) for snapshot in snapshots.values()]
+    with transaction.atomic():
+        GradebookSnapshot.objects.bulk_create(
+            rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['membership'],
+            update_fields=[
+                'course', 'grades', 'total_points', 'total_points_possible',
+                'percentage', 'letter_grade', 'updated_at',
+            ],
+        )
+    return len(rows)
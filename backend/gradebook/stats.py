@@ -0,0 +1,185 @@
+"""Vectorized gradebook statistics with per-course cache versioning"""
+import time
+import warnings
+
+import numpy as np
+from django.core.cache import cache
+
+from .matrix import GradebookMatrix
+from .totals import letter_indices, scheme_letters
+
+PERCENTILES = [10, 25, 50, 75, 90]
+HISTOGRAM_BINS = 10
+STATS_CACHE_TIMEOUT = 60 * 60
+
+
+def _version_key(course_id):
+    return f'gradebook:version:{course_id}'
+
+
+def gradebook_version(course_id):
+    """Current cache version for a course's derived gradebook data"""
+    key = _version_key(course_id)
+    # Seed with a timestamp so an evicted counter never reuses an old version
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def invalidate_course_stats(course_id):
+    """Bump the course's cache version so cached statistics are rebuilt"""
+    try:
+        cache.incr(_version_key(course_id))
+    except ValueError:
+        cache.set(_version_key(course_id), time.time_ns(), timeout=None)
+
+
+def get_course_stats(course):
+    """Return cached statistics for a course, computing them on a miss"""
+    key = f'gradebook:stats:{course.id}:{gradebook_version(course.id)}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_course_stats(GradebookMatrix.from_snapshots(course))
+        cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def _letter_counts(percentages, axis, cutoffs):
+    """Count scheme letter grades along an axis, ignoring NaN cells"""
+    indices = letter_indices(np.nan_to_num(percentages, nan=-1.0), cutoffs)
+    graded = ~np.isnan(percentages)
+    return np.stack(
+        [((indices == k) & graded).sum(axis=axis) for k in range(len(scheme_letters(cutoffs)))],
+        axis=-1,
+    )
+
+
+def _nan_reduce(func, array, axis, *args):
+    """Apply a NaN-aware reduction, yielding NaN when the axis is empty"""
+    if array.shape[axis] == 0:
+        shape = np.delete(np.array(array.shape), axis).tolist()
+        if args:
+            shape = [len(args[0])] + shape
+        return np.full(shape, np.nan)
+    return func(array, *args, axis=axis)
+
+
+def _clean(array):
+    """Convert a float array to a list with NaN replaced by None"""
+    return [None if np.isnan(v) else round(float(v), 2) for v in np.atleast_1d(array)]
+
+
+def compute_course_stats(matrix):
+    """Compute per-assignment, per-student and course statistics.
+
+    Everything is derived from the dense grade matrix in a single pass of
+    array operations, so cost grows with the number of cells rather than
+    the number of queries. Letter grades follow the course grading scheme,
+    and the course-wide distribution is taken over final (weighted, with
+    drop rules applied) course percentages.
+    """
+    cutoffs = matrix.cutoffs
+    letters = scheme_letters(cutoffs)
+    grades, points = matrix.as_arrays()
+    _, final_pct, _ = matrix.final_grades()
+    students, assignments = grades.shape
+    graded = ~np.isnan(grades)
+
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        # All-NaN rows and columns legitimately produce NaN statistics
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+
+        scorable = points > 0
+        percentages = np.where(scorable, grades / np.where(scorable, points, 1) * 100, np.nan)
+
+        # Per assignment (columns)
+        graded_counts = graded.sum(axis=0)
+        grade_mean = _nan_reduce(np.nanmean, grades, 0)
+        grade_median = _nan_reduce(np.nanmedian, grades, 0)
+        grade_std = _nan_reduce(np.nanstd, grades, 0)
+        grade_min = _nan_reduce(np.nanmin, grades, 0)
+        grade_max = _nan_reduce(np.nanmax, grades, 0)
+        pct_mean = _nan_reduce(np.nanmean, percentages, 0)
+        pct_percentiles = _nan_reduce(np.nanpercentile, percentages, 0, PERCENTILES)
+        assignment_letters = _letter_counts(percentages, axis=0, cutoffs=cutoffs)
+
+        width = 100 / HISTOGRAM_BINS
+        bins = np.clip(np.nan_to_num(percentages) // width, 0, HISTOGRAM_BINS - 1).astype(int)
+        histograms = np.zeros((assignments, HISTOGRAM_BINS), dtype=int)
+        rows, columns = np.nonzero(~np.isnan(percentages))
+        np.add.at(histograms, (columns, bins[rows, columns]), 1)
+
+        # Per student (rows)
+        student_graded = graded.sum(axis=1)
+        student_total = np.nansum(grades, axis=1)
+        student_possible = (graded * points).sum(axis=1)
+        student_mean = _nan_reduce(np.nanmean, grades, 1)
+        student_pct_mean = _nan_reduce(np.nanmean, percentages, 1)
+        student_pct_median = _nan_reduce(np.nanmedian, percentages, 1)
+        student_pct_std = _nan_reduce(np.nanstd, percentages, 1)
+        student_scored = np.nansum(np.where(scorable, grades, np.nan), axis=1)
+        has_points = student_possible > 0
+        student_pct = np.where(has_points, student_scored / np.where(has_points, student_possible, 1) * 100, np.nan)
+        student_letters = letter_indices(np.nan_to_num(student_pct, nan=-1.0), cutoffs)
+        final_letters = matrix.final_letters(final_pct)
+
+        # Course-wide distribution of final student percentages
+        course_pct_percentiles = _nan_reduce(np.nanpercentile, final_pct, 0, PERCENTILES)
+        course_letters = _letter_counts(final_pct, axis=0, cutoffs=cutoffs)
+
+    bin_edges = [round(k * 100 / HISTOGRAM_BINS, 2) for k in range(HISTOGRAM_BINS + 1)]
+
+    assignment_rows = []
+    for j, assignment in enumerate(matrix.assignments):
+        assignment_rows.append({
+            'assignment_id': assignment.id,
+            'assignment_title': assignment.title,
+            'points_possible': assignment.points_possible,
+            'graded_count': int(graded_counts[j]),
+            'mean': _clean(grade_mean[j])[0],
+            'median': _clean(grade_median[j])[0],
+            'stddev': _clean(grade_std[j])[0],
+            'min': _clean(grade_min[j])[0],
+            'max': _clean(grade_max[j])[0],
+            'mean_percentage': _clean(pct_mean[j])[0],
+            'percentiles': dict(zip(
+                [f'p{p}' for p in PERCENTILES], _clean(pct_percentiles[:, j])
+            )),
+            'letter_distribution': dict(zip(letters, assignment_letters[j].tolist())),
+            'histogram': {'bins': bin_edges, 'counts': histograms[j].tolist()},
+        })
+
+    student_rows = []
+    for i, membership in enumerate(matrix.memberships):
+        student_rows.append({
+            'membership_id': membership.id,
+            'user_id': membership.user.id,
+            'user_email': membership.user.email,
+            'user_name': membership.user.get_full_name(),
+            'course_code': matrix.course.code,
+            'course_name': matrix.course.name,
+            'total_assignments': assignments,
+            'graded_assignments': int(student_graded[i]),
+            'average_grade': _clean(student_mean[i])[0],
+            'average_percentage': _clean(student_pct_mean[i])[0],
+            'median_percentage': _clean(student_pct_median[i])[0],
+            'stddev_percentage': _clean(student_pct_std[i])[0],
+            'total_points': round(float(student_total[i]), 2),
+            'total_points_possible': round(float(student_possible[i]), 2),
+            'percentage': _clean(student_pct[i])[0],
+            'letter_grade': letters[student_letters[i]] if not np.isnan(student_pct[i]) else None,
+            'final_percentage': _clean(final_pct[i])[0],
+            'final_letter_grade': final_letters[i],
+        })
+
+    return {
+        'course': {'id': matrix.course.id, 'code': matrix.course.code, 'name': matrix.course.name},
+        'summary': {
+            'student_count': students,
+            'assignment_count': assignments,
+            'graded_count': int(graded.sum()),
+            'percentiles': dict(zip([f'p{p}' for p in PERCENTILES], _clean(course_pct_percentiles))),
+            'letter_distribution': dict(zip(letters, course_letters.tolist())),
+        },
+        'assignments': assignment_rows,
+        'students': student_rows,
+    }
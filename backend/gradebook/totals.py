@@ -0,0 +1,95 @@
+"""Vectorized course total computation: category weights, drop-lowest and letter grades"""
+import warnings
+
+import numpy as np
+
+
+def scheme_letters(cutoffs):
+    """Letters a scheme can produce, with 'F' for scores below the last cutoff"""
+    letters = [letter for letter, _ in cutoffs]
+    if not cutoffs or float(cutoffs[-1][1]) > 0:
+        letters.append('F')
+    return letters
+
+
+def letter_indices(percentages, cutoffs):
+    """Index into ``scheme_letters(cutoffs)`` for every cell of a percentage array"""
+    minimums = np.array([float(minimum) for _, minimum in cutoffs], dtype=float)
+    # Number of cutoffs the score falls below, e.g. 95 -> 0 ('A'), 10 -> 4 ('F')
+    return (np.asarray(percentages)[..., np.newaxis] < minimums).sum(axis=-1)
+
+
+def drop_lowest_mask(grades, points, drop):
+    """Boolean mask of the ``drop`` lowest graded cells in each row.
+
+    Cells are ranked by percentage. At least one graded cell is always kept,
+    and ungraded or zero-point cells are never dropped.
+    """
+    if drop <= 0 or grades.shape[1] == 0:
+        return np.zeros(grades.shape, dtype=bool)
+
+    graded = ~np.isnan(grades)
+    droppable = graded & (points > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratios = np.where(droppable, grades / np.where(points > 0, points, 1), np.inf)
+
+    order = np.argsort(ratios, axis=1, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(grades.shape[1])[np.newaxis, :].repeat(grades.shape[0], axis=0), axis=1)
+
+    allowed = np.minimum(drop, np.maximum(graded.sum(axis=1) - 1, 0))
+    return droppable & (ranks < np.minimum(allowed, droppable.sum(axis=1))[:, np.newaxis])
+
+
+def compute_final_grades(grades, points, group_index, groups, weighted):
+    """Compute per-group and final course percentages for every student at once.
+
+    ``grades`` is the students x assignments matrix (NaN = not graded),
+    ``points`` the points possible per assignment and ``group_index`` the
+    position of each assignment's group in ``groups`` (-1 for ungrouped).
+    ``groups`` is a sequence of ``(weight, drop_lowest)`` pairs.
+
+    With ``weighted`` set, the final percentage is the weight-averaged
+    group percentage over groups that have graded work; ungrouped
+    assignments do not count. Otherwise it is total points earned over
+    total points possible, after drop rules are applied.
+
+    Returns ``(group_percentages, final_percentages, dropped)``.
+    """
+    students, assignments = grades.shape
+    graded = ~np.isnan(grades)
+    dropped = np.zeros(grades.shape, dtype=bool)
+
+    for g, (_, drop) in enumerate(groups):
+        columns = np.flatnonzero(group_index == g)
+        if columns.size and drop:
+            dropped[:, columns] = drop_lowest_mask(grades[:, columns], points[columns], drop)
+
+    kept = graded & ~dropped
+    earned = np.where(kept, grades, 0.0)
+    possible = np.where(kept, points[np.newaxis, :], 0.0)
+
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+
+        # Sum earned/possible per group with one matrix product each
+        membership = np.zeros((assignments, len(groups)))
+        grouped = np.flatnonzero(group_index >= 0)
+        membership[grouped, group_index[grouped]] = 1.0
+        group_earned = earned @ membership
+        group_possible = possible @ membership
+        group_percentages = np.where(group_possible > 0, group_earned / group_possible * 100, np.nan)
+
+        if weighted:
+            weights = np.array([float(weight) for weight, _ in groups], dtype=float)
+            available = ~np.isnan(group_percentages) & (weights > 0)
+            weight_total = (available * weights).sum(axis=1)
+            weighted_sum = np.where(available, group_percentages * weights, 0.0).sum(axis=1)
+            final = np.where(weight_total > 0, weighted_sum / weight_total, np.nan)
+        else:
+            scored = points > 0
+            total_possible = possible[:, scored].sum(axis=1)
+            total_earned = earned[:, scored].sum(axis=1)
+            final = np.where(total_possible > 0, total_earned / total_possible * 100, np.nan)
+
+    return group_percentages, final, dropped
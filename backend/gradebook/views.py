@@ -4,10 +4,18 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from django.db.models import Avg, Count, Q
-from .models import GradeEntry
-from .serializers import GradeEntrySerializer, StudentGradesSerializer
+from .models import GradeEntry, GradingScheme
+from .serializers import GradeEntrySerializer, GradingSchemeSerializer, StudentGradesSerializer
+from .exports import gradebook_export
+from .imports import GradeImport, GradeImportError
+from .matrix import GradebookMatrix, student_final_grades
+from .stats import get_course_stats
+from config.exports import streaming_export
+from config.pagination import KeysetPagination
+from config.serializers import rendered_fields
 from courses.models import Course, CourseMembership
 from assignments.models import Assignment
+from users.access import get_access
 from users.permissions import IsInstructor, IsInstructorOrAdmin
 
 
@@ -15,12 +23,18 @@ class GradeEntryViewSet(viewsets.ModelViewSet):
     """ViewSet for GradeEntry CRUD operations"""
     
     serializer_class = GradeEntrySerializer
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-graded_at', '-id')
 
     def get_permissions(self):
         """Set permissions based on action"""
-        if self.action in ['create', 'update', 'partial_update', 'destroy', 'course_gradebook']:
+        if self.action in [
+            'create', 'update', 'partial_update', 'destroy',
+            'course_gradebook', 'course_stats', 'course_totals', 'course_export', 'course_import',
+            'grading_scheme',
+        ]:
             permission_classes = [permissions.IsAuthenticated, IsInstructor]
-        elif self.action in ['student_grades']:
+        elif self.action in ['student_grades', 'student_totals']:
             permission_classes = [permissions.IsAuthenticated]
         else:
             permission_classes = [permissions.IsAuthenticated]
@@ -30,30 +44,25 @@ class GradeEntryViewSet(viewsets.ModelViewSet):
         """Filter grades by account and user role"""
         user = self.request.user
         account = getattr(self.request, 'account', None)
-        queryset = GradeEntry.objects.filter(
-            membership__course__account=account
-        ).select_related(
-            'membership__user', 'membership__course', 'assignment', 'graded_by'
+        fields = rendered_fields(self) if self.action in ('list', 'retrieve') else None
+        queryset = GradeEntrySerializer.setup_eager_loading(
+            GradeEntry.objects.filter(membership__course__account=account), fields
         )
 
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
+        access = get_access(self.request)
+        if access.is_admin:
             return queryset.order_by('-graded_at')
 
-        instructor_courses = user.memberships.filter(
-            role='instructor',
-            status='active'
-        ).values_list('course_id', flat=True)
-
         return queryset.filter(
             Q(membership__user=user) |
-            Q(membership__course_id__in=instructor_courses)
+            Q(membership__course_id__in=access.instructor_course_ids)
         ).order_by('-graded_at')
     
     def perform_create(self, serializer):
         """Set graded_by to current user and validate permissions"""
         membership = serializer.validated_data.get('membership')
         
-        if not self._is_course_instructor(self.request.user, membership.course):
+        if not get_access(self.request).is_course_instructor(membership.course):
             raise PermissionDenied("You can only grade assignments in courses you instruct.")
         
         serializer.save(graded_by=self.request.user)
@@ -62,7 +71,7 @@ class GradeEntryViewSet(viewsets.ModelViewSet):
         """Validate user is instructor of the course before updating grade"""
         grade_entry = self.get_object()
         
-        if not self._is_course_instructor(self.request.user, grade_entry.membership.course):
+        if not get_access(self.request).is_course_instructor(grade_entry.membership.course):
             raise PermissionDenied("You can only update grades in courses you instruct.")
         
         serializer.save()
@@ -75,75 +84,108 @@ class GradeEntryViewSet(viewsets.ModelViewSet):
         except Course.DoesNotExist:
             return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        if not self._is_course_instructor(request.user, course):
+        if not get_access(request).is_course_instructor(course):
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        memberships = CourseMembership.objects.filter(
-            course=course, role='student', status='active'
-        ).select_related('user')
-        
-        assignments = Assignment.objects.filter(course=course).order_by('due_date')
-        
-        gradebook_data = []
-        for membership in memberships:
-            student_data = {
-                'membership_id': membership.id,
-                'user_id': membership.user.id,
-                'user_email': membership.user.email,
-                'user_name': membership.user.get_full_name(),
-                'grades': []
-            }
-            
-            for assignment in assignments:
-                try:
-                    grade_entry = GradeEntry.objects.get(membership=membership, assignment=assignment)
-                    student_data['grades'].append({
-                        'assignment_id': assignment.id,
-                        'assignment_title': assignment.title,
-                        'grade': float(grade_entry.grade),
-                        'points_possible': assignment.points_possible,
-                        'percentage': grade_entry.get_percentage(),
-                        'letter_grade': grade_entry.calculate_letter_grade(),
-                        'graded_at': grade_entry.graded_at
-                    })
-                except GradeEntry.DoesNotExist:
-                    student_data['grades'].append({
-                        'assignment_id': assignment.id,
-                        'assignment_title': assignment.title,
-                        'grade': None,
-                        'points_possible': assignment.points_possible,
-                        'percentage': None,
-                        'letter_grade': None,
-                        'graded_at': None
-                    })
-            
-            gradebook_data.append(student_data)
+        gradebook = GradebookMatrix.from_snapshots(course)
+        return Response(gradebook.to_response())
+    
+    @action(detail=False, methods=['get'], url_path='course/(?P<course_id>[^/.]+)/stats')
+    def course_stats(self, request, course_id=None):
+        """Get per-assignment and per-student grade statistics for a course"""
+        try:
+            course = Course.unscoped.get(pk=course_id, account=request.account)
+        except Course.DoesNotExist:
+            return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if not get_access(request).is_course_instructor(course):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
+        stats = get_course_stats(course)
         return Response({
-            'course': {'id': course.id, 'code': course.code, 'name': course.name},
-            'assignments': [{'id': a.id, 'title': a.title, 'type': a.type, 'due_date': a.due_date, 'points_possible': a.points_possible} for a in assignments],
-            'students': gradebook_data
+            **stats,
+            'students': StudentGradesSerializer(stats['students'], many=True).data,
         })
     
+    @action(detail=False, methods=['get'], url_path='course/(?P<course_id>[^/.]+)/totals')
+    def course_totals(self, request, course_id=None):
+        """Get final course grades for every student with weights and drop rules applied"""
+        try:
+            course = Course.unscoped.get(pk=course_id, account=request.account)
+        except Course.DoesNotExist:
+            return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if not get_access(request).is_course_instructor(course):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        return Response(GradebookMatrix.from_snapshots(course).totals_response())
+    
+    @action(detail=False, methods=['get'], url_path='course/(?P<course_id>[^/.]+)/export')
+    def course_export(self, request, course_id=None):
+        """Stream the course gradebook as CSV / NDJSON, one row per student"""
+        try:
+            course = Course.unscoped.get(pk=course_id, account=request.account)
+        except Course.DoesNotExist:
+            return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if not get_access(request).is_course_instructor(course):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        header, rows = gradebook_export(course)
+        return streaming_export(request, f'course-{course.id}-gradebook', header, rows)
+    
+    @action(detail=False, methods=['post'], url_path='course/(?P<course_id>[^/.]+)/import')
+    def course_import(self, request, course_id=None):
+        """Create or update grades from an uploaded CSV, with a per-row error report.
+
+        Send the file as multipart ``file``; ``?dry_run=true`` validates
+        without writing anything.
+        """
+        try:
+            course = Course.unscoped.get(pk=course_id, account=request.account)
+        except Course.DoesNotExist:
+            return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if not get_access(request).is_course_instructor(course):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        dry_run = request.query_params.get('dry_run', '').lower() in ('true', '1')
+        try:
+            report = GradeImport(course, request.user).run(upload.file, dry_run=dry_run)
+        except GradeImportError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+    
+    @action(detail=False, methods=['get', 'put'], url_path='course/(?P<course_id>[^/.]+)/grading-scheme')
+    def grading_scheme(self, request, course_id=None):
+        """Get or replace the letter grade cutoffs and weighting rule for a course"""
+        try:
+            course = Course.unscoped.get(pk=course_id, account=request.account)
+        except Course.DoesNotExist:
+            return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if not get_access(request).is_course_instructor(course):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        scheme = GradingScheme.for_course(course)
+        if request.method == 'GET':
+            return Response(GradingSchemeSerializer(scheme).data)
+        
+        serializer = GradingSchemeSerializer(scheme, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(course=course)
+        return Response(serializer.data)
+    
     @action(detail=False, methods=['get'], url_path='student/(?P<user_id>[^/.]+)')
     def student_grades(self, request, user_id=None):
         """Get grades for a specific student"""
-        current_user = request.user
-        is_own_grades = str(current_user.id) == str(user_id)
-        is_admin = hasattr(current_user, 'admin_profile') or current_user.is_account_admin()
+        common_courses = self._visible_student_courses(request, user_id)
 
-        if not is_own_grades and not is_admin:
-            student_courses = CourseMembership.objects.filter(
-                user_id=user_id, role='student', status='active',
-                course__account=request.account,
-            ).values_list('course_id', flat=True)
-            
-            instructor_courses = current_user.memberships.filter(
-                role='instructor', status='active'
-            ).values_list('course_id', flat=True)
-            
-            common_courses = set(student_courses) & set(instructor_courses)
-            
+        if common_courses is not None:
             if not common_courses:
                 return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
             
@@ -163,8 +205,49 @@ class GradeEntryViewSet(viewsets.ModelViewSet):
         serializer = GradeEntrySerializer(grades, many=True)
         return Response(serializer.data)
     
-    def _is_course_instructor(self, user, course):
-        """Check if user is an instructor of the course"""
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(user=user, role='instructor', status='active').exists()
+    @action(detail=False, methods=['get'], url_path='student/(?P<user_id>[^/.]+)/totals')
+    def student_totals(self, request, user_id=None):
+        """Get a student's final grade in each of their courses"""
+        common_courses = self._visible_student_courses(request, user_id)
+        if common_courses is not None and not common_courses:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        courses = Course.unscoped.filter(
+            account=request.account,
+            memberships__user_id=user_id,
+            memberships__role='student',
+            memberships__status='active',
+        ).distinct().order_by('code')
+        if common_courses is not None:
+            courses = courses.filter(id__in=common_courses)
+        
+        courses = list(courses)
+        final_grades = student_final_grades(courses, user_id)
+        totals = []
+        for course in courses:
+            if course.id in final_grades:
+                membership_id, final_grade = final_grades[course.id]
+                totals.append({
+                    'course': {'id': course.id, 'code': course.code, 'name': course.name},
+                    'membership_id': membership_id,
+                    'final_grade': final_grade,
+                })
+        return Response(totals)
+    
+    def _visible_student_courses(self, request, user_id):
+        """Course IDs where the requester may see the student's grades.
+        
+        Returns None when every course is visible (own grades or admin).
+        """
+        access = get_access(request)
+        is_own_grades = str(request.user.id) == str(user_id)
+        if is_own_grades or access.is_admin:
+            return None
+
+        student_courses = CourseMembership.objects.filter(
+            user_id=user_id, role='student', status='active',
+            course__account=request.account,
+        ).values_list('course_id', flat=True)
+        
+        return set(student_courses) & set(access.instructor_course_ids)
+    
\ No newline at end of file
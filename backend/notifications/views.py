@@ -1,6 +1,7 @@
 from rest_framework import viewsets, mixins, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from config.pagination import KeysetPagination
 from .models import Notification
 from .serializers import NotificationSerializer
 
@@ -8,6 +9,8 @@ from .serializers import NotificationSerializer
 class NotificationViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         return Notification.objects.filter(
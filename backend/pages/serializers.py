@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from config.serializers import DynamicFieldsMixin
 from .models import Page
 from courses.models import Course, CourseModule
 
 
-class PageSerializer(serializers.ModelSerializer):
+class PageSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     course_id = serializers.PrimaryKeyRelatedField(
         source='course',
         queryset=Course.objects.all(),
@@ -25,6 +26,7 @@ class PageSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'course', 'created_at', 'updated_at']
+        expandable_fields = ['body']
 
 
 class PageSummarySerializer(serializers.Serializer):
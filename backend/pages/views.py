@@ -2,7 +2,9 @@ from rest_framework import viewsets, permissions
 from rest_framework.exceptions import PermissionDenied
 from .models import Page
 from .serializers import PageSerializer
+from config.serializers import rendered_fields
 from courses.models import CourseMembership
+from users.access import get_access
 
 
 class PageViewSet(viewsets.ModelViewSet):
@@ -14,22 +16,25 @@ class PageViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
-        user = self.request.user
         account = getattr(self.request, 'account', None)
-        queryset = Page.objects.filter(
-            course__account=account
-        ).select_related('course', 'module')
+        queryset = Page.objects.filter(course__account=account)
+        if self.action in ('list', 'retrieve'):
+            # Only primary keys of the course and module are rendered
+            if 'body' not in rendered_fields(self):
+                queryset = queryset.defer('body')
+        else:
+            queryset = queryset.select_related('course', 'module')
 
         course_id = self.request.query_params.get('course')
         if course_id:
             queryset = queryset.filter(course_id=course_id)
 
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
+        access = get_access(self.request)
+        if access.is_admin:
             return queryset
 
-        user_courses = user.memberships.filter(status='active')
-        instructor_courses = user_courses.filter(role='instructor').values_list('course_id', flat=True)
-        student_courses = user_courses.filter(role='student').values_list('course_id', flat=True)
+        instructor_courses = access.instructor_course_ids
+        student_courses = access.student_course_ids
 
         from django.db.models import Q
         queryset = queryset.filter(
@@ -45,26 +50,17 @@ class PageViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         course = serializer.validated_data.get('course')
-        if not self._is_course_instructor(self.request.user, course):
+        if not get_access(self.request).is_course_instructor(course):
             raise PermissionDenied("You can only create pages for courses you instruct.")
         serializer.save()
 
     def perform_update(self, serializer):
         page = self.get_object()
-        if not self._is_course_instructor(self.request.user, page.course):
+        if not get_access(self.request).is_course_instructor(page.course):
             raise PermissionDenied("You can only update pages in courses you instruct.")
         serializer.save()
 
     def perform_destroy(self, instance):
-        if not self._is_course_instructor(self.request.user, instance.course):
+        if not get_access(self.request).is_course_instructor(instance.course):
             raise PermissionDenied("You can only delete pages from courses you instruct.")
         instance.delete()
-
-    def _is_course_instructor(self, user, course):
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user,
-            role='instructor',
-            status='active'
-        ).exists()
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import AccountDailyRollup
+
+
+@admin.register(AccountDailyRollup)
+class AccountDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['account', 'date', 'users', 'active_users', 'courses', 'submissions', 'grading_backlog']
+    list_filter = ['date']
+    search_fields = ['account__name', 'account__slug']
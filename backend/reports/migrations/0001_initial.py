@@ -0,0 +1,40 @@
+# Generated by Django 4.2.9 on 2026-10-17 01:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0003_account_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('submissions', models.PositiveIntegerField(default=0)),
+                ('active_users', models.PositiveIntegerField(default=0)),
+                ('users', models.PositiveIntegerField(blank=True, null=True)),
+                ('courses', models.PositiveIntegerField(blank=True, null=True)),
+                ('enrollments', models.PositiveIntegerField(blank=True, null=True)),
+                ('grading_backlog', models.PositiveIntegerField(blank=True, null=True)),
+                ('grade_total', models.FloatField(blank=True, null=True)),
+                ('graded_students', models.PositiveIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='accounts.account')),
+            ],
+            options={
+                'verbose_name': 'Account Daily Rollup',
+                'verbose_name_plural': 'Account Daily Rollups',
+                'db_table': 'account_daily_rollups',
+                'indexes': [models.Index(fields=['date'], name='account_dai_date_4004db_idx')],
+                'unique_together': {('account', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+"""Precomputed reporting aggregates"""
+from django.db import models
+
+from accounts.models import Account
+
+
+class AccountDailyRollup(models.Model):
+    """Totals of one account (its sub-accounts excluded) for one day.
+
+    Written by ``reports.rollups.refresh_rollups``. Activity during the day
+    (``submissions``, ``active_users``) can be recomputed for any past day.
+    Levels (users, courses, enrollments, grading backlog and grades) are
+    recorded while the day is current, and stay null on days that were
+    only backfilled. Users and their activity count towards the user's
+    account; courses, enrollments, submissions and grades towards the
+    course's account.
+    """
+
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups'
+    )
+    date = models.DateField()
+    # Activity during the day
+    submissions = models.PositiveIntegerField(default=0)
+    active_users = models.PositiveIntegerField(default=0)
+    # Levels as of the day's last refresh
+    users = models.PositiveIntegerField(null=True, blank=True)
+    courses = models.PositiveIntegerField(null=True, blank=True)
+    enrollments = models.PositiveIntegerField(null=True, blank=True)
+    grading_backlog = models.PositiveIntegerField(null=True, blank=True)
+    # Sum and count of the active students' gradebook percentages, so means add up across accounts
+    grade_total = models.FloatField(null=True, blank=True)
+    graded_students = models.PositiveIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'account_daily_rollups'
+        verbose_name = 'Account Daily Rollup'
+        verbose_name_plural = 'Account Daily Rollups'
+        unique_together = [['account', 'date']]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} on {self.date}"
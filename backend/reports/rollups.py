@@ -0,0 +1,207 @@
+"""Maintenance and subtree aggregation of the account daily rollups"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from accounts.models import Account
+from assignments.models import AssignmentSubmission
+from courses.models import Course, CourseMembership
+from gradebook.models import GradebookSnapshot
+from users.models import User
+from .models import AccountDailyRollup
+
+ACTIVITY_FIELDS = ['submissions', 'active_users']
+LEVEL_FIELDS = ['users', 'courses', 'enrollments', 'grading_backlog', 'grade_total', 'graded_students']
+# Submissions still waiting for some or all of their responses to be graded
+BACKLOG_STATUSES = ['pending', 'partial', 'queued']
+
+
+def _by_account(queryset, account_field, **aggregates):
+    """``{account_id: {aggregate: value}}`` grouped on ``account_field``"""
+    rows = queryset.order_by().values(tenant=F(account_field)).annotate(**aggregates)
+    return {row.pop('tenant'): row for row in rows}
+
+
+def _by_account_and_day(queryset, account_field, **aggregates):
+    """``{(account_id, date): {aggregate: value}}`` grouped on ``account_field`` and submission day"""
+    rows = queryset.order_by().values(
+        tenant=F(account_field), day=TruncDate('submitted_at')
+    ).annotate(**aggregates)
+    return {(row.pop('tenant'), row.pop('day')): row for row in rows}
+
+
+def _activity(start, end):
+    """Submissions per course account and submitting users per user account, per day"""
+    tz = timezone.get_current_timezone()
+    submitted = AssignmentSubmission.objects.filter(
+        submitted_at__gte=datetime.combine(start, time.min, tzinfo=tz),
+        submitted_at__lt=datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz),
+    )
+    submissions = _by_account_and_day(submitted, 'assignment__course__account', submissions=Count('id'))
+    active_users = _by_account_and_day(submitted, 'student__account', active_users=Count('student', distinct=True))
+    return submissions, active_users
+
+
+def _levels():
+    """Current users, courses, enrollments, grading backlog and grade sums per account"""
+    users = _by_account(User.objects.filter(is_active=True), 'account', users=Count('id'))
+    courses = _by_account(Course.unscoped.filter(is_active=True), 'account', courses=Count('id'))
+    enrollments = _by_account(
+        CourseMembership.objects.filter(role='student', status='active', course__is_active=True),
+        'course__account', enrollments=Count('id'),
+    )
+    backlog = _by_account(
+        AssignmentSubmission.objects.filter(grading_status__in=BACKLOG_STATUSES),
+        'assignment__course__account', grading_backlog=Count('id'),
+    )
+    grades = _by_account(
+        GradebookSnapshot.objects.filter(
+            percentage__isnull=False, membership__role='student', membership__status='active'
+        ),
+        'course__account', grade_total=Sum('percentage'), graded_students=Count('id'),
+    )
+    return users, courses, enrollments, backlog, grades
+
+
+def refresh_rollups(start=None, end=None):
+    """Recompute the rollup rows of every account for the days ``start`` to ``end``.
+
+    Each source table is read with one grouped query for the whole range,
+    so the cost does not grow with the number of accounts. Activity is
+    recomputed for every day in the range. Levels can only be read as they
+    are now, so they are written for today alone; earlier days keep the
+    levels recorded when they were current.
+    ``start`` defaults to the latest day already rolled up, so a periodic
+    run re-finalizes that day and then carries on from there. ``end``
+    defaults to today. Returns the number of rows written.
+    """
+    today = timezone.localdate()
+    end = end or today
+    if start is None:
+        start = AccountDailyRollup.objects.aggregate(latest=Max('date'))['latest'] or end
+        start = min(start, end)
+
+    submissions, active_users = _activity(start, end)
+    levels = _levels() if start <= today <= end else None
+    account_ids = list(Account.objects.values_list('id', flat=True))
+
+    past, current = [], []
+    day = start
+    while day <= end:
+        for account_id in account_ids:
+            row = AccountDailyRollup(
+                account_id=account_id, date=day,
+                submissions=submissions.get((account_id, day), {}).get('submissions', 0),
+                active_users=active_users.get((account_id, day), {}).get('active_users', 0),
+            )
+            if day == today:
+                for level in levels:
+                    for field, value in level.get(account_id, {}).items():
+                        setattr(row, field, value)
+                for field in LEVEL_FIELDS:
+                    if getattr(row, field) is None:
+                        setattr(row, field, 0.0 if field == 'grade_total' else 0)
+                current.append(row)
+            else:
+                past.append(row)
+        day += timedelta(days=1)
+
+    for rows, fields in [(past, ACTIVITY_FIELDS), (current, ACTIVITY_FIELDS + LEVEL_FIELDS)]:
+        AccountDailyRollup.objects.bulk_create(
+            rows, batch_size=500, update_conflicts=True,
+            unique_fields=['account', 'date'], update_fields=fields + ['updated_at'],
+        )
+    return len(past) + len(current)
+
+
+def _mean_grade(row):
+    if not row.get('graded_students'):
+        return None
+    return round(row['grade_total'] / row['graded_students'], 2)
+
+
+def _summary(row):
+    """Public form of summed rollup columns"""
+    return {
+        'submissions': row.get('submissions') or 0,
+        'active_users': row.get('active_users') or 0,
+        'users': row.get('users'),
+        'courses': row.get('courses'),
+        'enrollments': row.get('enrollments'),
+        'grading_backlog': row.get('grading_backlog'),
+        'mean_grade': _mean_grade(row),
+    }
+
+
+def _range_summary(row):
+    """``_summary`` of a whole range, where the daily active users add up to user-days"""
+    summary = _summary(row)
+    return {
+        'submissions': summary.pop('submissions'),
+        'active_user_days': summary.pop('active_users'),
+        **summary,
+    }
+
+
+def _sums(fields):
+    return {field: Sum(field) for field in fields}
+
+
+def subtree_rollup(account, start, end):
+    """Daily totals of ``account`` and its active sub-accounts, from the rollup rows alone.
+
+    Returns the per-day series, the totals over the range (activity summed,
+    levels as of the last day in the range) and the same totals for each
+    direct sub-account's subtree. A student active on several days counts
+    once per day, so the range totals report ``active_user_days`` rather
+    than ``active_users``. Four queries, none touching the source tables.
+    """
+    subtree = {
+        account_id: (path, name)
+        for account_id, path, name in account.get_descendants().values_list('id', 'path', 'name')
+    }
+    rows = AccountDailyRollup.objects.filter(account_id__in=list(subtree), date__range=(start, end))
+
+    days = [
+        {'date': row.pop('date'), **_summary(row)}
+        for row in rows.order_by('date').values('date').annotate(**_sums(ACTIVITY_FIELDS + LEVEL_FIELDS))
+    ]
+    latest = days[-1]['date'] if days else None
+
+    # The direct sub-account each deeper account sits under
+    branch_of = {}
+    for account_id, (path, _) in subtree.items():
+        ancestor_ids = [int(part) for part in path.split('/') if part]
+        if len(ancestor_ids) > account.depth + 1:
+            branch_of[account_id] = ancestor_ids[account.depth + 1]
+
+    totals = {}
+    branches = {branch_id: {} for branch_id in set(branch_of.values())}
+    per_account = list(rows.order_by().values('account_id').annotate(**_sums(ACTIVITY_FIELDS)))
+    if latest is not None:
+        per_account += list(rows.filter(date=latest).values('account_id', *LEVEL_FIELDS))
+    for row in per_account:
+        account_id = row.pop('account_id')
+        targets = [totals]
+        if account_id in branch_of:
+            targets.append(branches[branch_of[account_id]])
+        for target in targets:
+            for field, value in row.items():
+                if value is not None:
+                    target[field] = target.get(field, 0) + value
+
+    return {
+        'account': {'id': account.id, 'name': account.name},
+        'start': start,
+        'end': end,
+        'latest': latest,
+        'totals': _range_summary(totals),
+        'days': days,
+        'sub_accounts': sorted(
+            ({'id': branch_id, 'name': subtree[branch_id][1], **_range_summary(branch)}
+             for branch_id, branch in branches.items()),
+            key=lambda branch: branch['name'],
+        ),
+    }
@@ -0,0 +1,7 @@
+"""URL routing for reports app"""
+from django.urls import path
+from .views import AccountRollupView
+
+urlpatterns = [
+    path('accounts/rollup/', AccountRollupView.as_view(), name='account-rollup'),
+]
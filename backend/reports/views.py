@@ -0,0 +1,62 @@
+"""Views for reports app"""
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.models import Account
+from users.permissions import IsAdmin
+from .rollups import subtree_rollup
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+
+class AccountRollupView(APIView):
+    """Daily enrollment, activity and grade totals across an account's sub-accounts.
+
+    Reports the request's account, or with ``?account=<id>`` one of its
+    sub-accounts, over ``?start=`` to ``?end=`` (YYYY-MM-DD, default the
+    last 30 days). Served from the precomputed daily rollups.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        account = request.account
+        account_id = request.query_params.get('account')
+        if account_id:
+            if not account_id.isdigit():
+                return Response({'error': 'account must be an account ID'}, status=status.HTTP_400_BAD_REQUEST)
+            account = Account.objects.filter(pk=account_id).first()
+            if account is None or request.account.id not in account.ancestor_ids:
+                return Response({'error': 'Account not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        end = timezone.localdate()
+        start = end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+        for name in ['start', 'end']:
+            value = request.query_params.get(name)
+            if value:
+                try:
+                    parsed = parse_date(value)
+                except ValueError:
+                    # Well-formed but not a real date, e.g. 2026-02-30
+                    parsed = None
+                if parsed is None:
+                    return Response(
+                        {'error': f'{name} must be a date (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST
+                    )
+                if name == 'start':
+                    start = parsed
+                else:
+                    end = parsed
+        if start > end:
+            return Response({'error': 'start must not be after end'}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days >= MAX_RANGE_DAYS:
+            return Response(
+                {'error': f'The date range is limited to {MAX_RANGE_DAYS} days'}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(subtree_rollup(account, start, end))
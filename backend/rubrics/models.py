@@ -37,6 +37,8 @@ class Rubric(models.Model):
         return f"{self.title} ({self.course.code})"
 
     def total_points_possible(self):
+        if 'criteria' in getattr(self, '_prefetched_objects_cache', {}):
+            return sum(criterion.points_possible for criterion in self.criteria.all())
         return self.criteria.aggregate(
             total=models.Sum('points_possible')
         )['total'] or 0
@@ -1,5 +1,7 @@
 """Serializers for rubrics app"""
+from django.db.models import Count
 from rest_framework import serializers
+from config.serializers import DynamicFieldsMixin
 from .models import Rubric, RubricCriterion, RubricRating, RubricAssessment, RubricCriterionScore
 from courses.utils import sanitize_html
 
@@ -23,7 +25,7 @@ class RubricCriterionSerializer(serializers.ModelSerializer):
         return sanitize_html(value)
 
 
-class RubricSerializer(serializers.ModelSerializer):
+class RubricSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     criteria = RubricCriterionSerializer(many=True, required=False)
     total_points_possible = serializers.SerializerMethodField()
     assignment_count = serializers.SerializerMethodField()
@@ -37,6 +39,23 @@ class RubricSerializer(serializers.ModelSerializer):
             'criteria', 'total_points_possible', 'assignment_count'
         ]
         read_only_fields = ['id', 'course', 'created_by', 'created_at', 'updated_at']
+        expandable_fields = ['criteria']
+
+    @staticmethod
+    def setup_eager_loading(queryset, fields=None):
+        """Load what the requested rubric fields read (also covers ``RubricListSerializer``)"""
+        def wants(name):
+            return fields is None or name in fields
+
+        if wants('created_by_name'):
+            queryset = queryset.select_related('created_by')
+        if wants('criteria'):
+            queryset = queryset.prefetch_related('criteria__ratings')
+        elif wants('total_points_possible') or wants('criteria_count'):
+            queryset = queryset.prefetch_related('criteria')
+        if wants('assignment_count'):
+            queryset = queryset.annotate(num_assignments=Count('assignments'))
+        return queryset
 
     def validate_description(self, value):
         return sanitize_html(value)
@@ -45,6 +64,8 @@ class RubricSerializer(serializers.ModelSerializer):
         return obj.total_points_possible()
 
     def get_assignment_count(self, obj):
+        if hasattr(obj, 'num_assignments'):
+            return obj.num_assignments
         return obj.assignments.count()
 
     def get_created_by_name(self, obj):
@@ -83,7 +104,7 @@ class RubricSerializer(serializers.ModelSerializer):
         return instance
 
 
-class RubricListSerializer(serializers.ModelSerializer):
+class RubricListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     total_points_possible = serializers.SerializerMethodField()
     criteria_count = serializers.SerializerMethodField()
     assignment_count = serializers.SerializerMethodField()
@@ -102,6 +123,8 @@ class RubricListSerializer(serializers.ModelSerializer):
         return obj.criteria.count()
 
     def get_assignment_count(self, obj):
+        if hasattr(obj, 'num_assignments'):
+            return obj.num_assignments
         return obj.assignments.count()
 
 
@@ -10,9 +10,11 @@ from .serializers import (
     RubricSerializer, RubricListSerializer,
     RubricAssessmentSerializer, RubricAssessmentCreateSerializer,
 )
+from config.serializers import rendered_fields
 from courses.models import Course, CourseMembership
 from assignments.models import AssignmentSubmission
 from gradebook.models import GradeEntry
+from users.access import get_access
 from users.permissions import IsInstructor
 
 
@@ -31,18 +33,10 @@ class RubricViewSet(viewsets.ModelViewSet):
         account = getattr(self.request, 'account', None)
         return get_object_or_404(Course, id=course_id, account=account)
 
-    def _is_course_instructor(self, user, course):
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user, role='instructor', status='active'
-        ).exists()
-
     def get_queryset(self):
         course = self._get_course()
-        return Rubric.objects.filter(course=course).prefetch_related(
-            'criteria__ratings', 'assignments'
-        )
+        fields = rendered_fields(self) if self.action in ('list', 'retrieve') else None
+        return RubricSerializer.setup_eager_loading(Rubric.objects.filter(course=course), fields)
 
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy', 'duplicate']:
@@ -51,18 +45,18 @@ class RubricViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         course = self._get_course()
-        if not self._is_course_instructor(self.request.user, course):
+        if not get_access(self.request).is_course_instructor(course):
             raise PermissionDenied("You can only create rubrics for courses you instruct.")
         serializer.save(course=course, created_by=self.request.user)
 
     def perform_update(self, serializer):
         rubric = self.get_object()
-        if not self._is_course_instructor(self.request.user, rubric.course):
+        if not get_access(self.request).is_course_instructor(rubric.course):
             raise PermissionDenied("You can only update rubrics in courses you instruct.")
         serializer.save()
 
     def perform_destroy(self, instance):
-        if not self._is_course_instructor(self.request.user, instance.course):
+        if not get_access(self.request).is_course_instructor(instance.course):
             raise PermissionDenied("You can only delete rubrics from courses you instruct.")
         if instance.assessments.exists():
             raise PermissionDenied(
@@ -75,7 +69,7 @@ class RubricViewSet(viewsets.ModelViewSet):
     def duplicate(self, request, course_id=None, pk=None):
         """Duplicate a rubric within the same course."""
         original = self.get_object()
-        if not self._is_course_instructor(request.user, original.course):
+        if not get_access(request).is_course_instructor(original.course):
             raise PermissionDenied("You can only duplicate rubrics in courses you instruct.")
 
         new_rubric = Rubric.objects.create(
@@ -120,13 +114,6 @@ class RubricAssessmentViewSet(viewsets.ViewSet):
             assignment__course__account=account,
         )
 
-    def _is_course_instructor(self, user, course):
-        if hasattr(user, 'admin_profile') or user.is_account_admin():
-            return True
-        return course.memberships.filter(
-            user=user, role='instructor', status='active'
-        ).exists()
-
     def _create_or_update_grade_entry(self, submission, assessment, grader):
         """Sync rubric total score to GradeEntry."""
         try:
@@ -140,7 +127,7 @@ class RubricAssessmentViewSet(viewsets.ViewSet):
             return
 
         # Combine per-question scores (MC/numerical) with rubric total
-        question_score = submission.calculate_score()
+        question_score = submission.total_score
         total = question_score + int(assessment.total_score)
 
         GradeEntry.objects.update_or_create(
@@ -159,7 +146,7 @@ class RubricAssessmentViewSet(viewsets.ViewSet):
         course = submission.assignment.course
 
         # Students can only see their own, and only after due date
-        is_instructor = self._is_course_instructor(request.user, course)
+        is_instructor = get_access(request).is_course_instructor(course)
         if not is_instructor:
             if submission.student != request.user:
                 return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -184,7 +171,7 @@ class RubricAssessmentViewSet(viewsets.ViewSet):
         submission = self._get_submission()
         course = submission.assignment.course
 
-        if not self._is_course_instructor(request.user, course):
+        if not get_access(request).is_course_instructor(course):
             raise PermissionDenied("You can only grade submissions for courses you instruct.")
 
         rubric = submission.assignment.rubric
@@ -0,0 +1,102 @@
+"""Request-scoped authorization context"""
+from django.db.models import Exists, OuterRef
+from django.utils.functional import cached_property
+
+from accounts.models import AccountMembership
+from courses.models import CourseMembership
+from .models import AdminProfile, User
+
+
+class RequestAccess:
+    """What the requesting user may do, resolved once per request.
+
+    Admin status (an admin profile, or an active account admin role in the
+    request's account) is one query and the user's active course roles are
+    another; both are loaded on first use and reused by every permission
+    class, view and serializer check for the rest of the request. Course
+    arguments may be a ``Course`` or its ID; the ``*_course_ids`` filters
+    stay subqueries until the roles have been loaded.
+    """
+
+    def __init__(self, user, account=None):
+        self.user = user
+        self.account_id = account.id if account is not None else getattr(user, 'account_id', None)
+
+    @cached_property
+    def is_admin(self):
+        if not self.user.is_authenticated:
+            return False
+        if hasattr(self.user, 'cached_account_admin') and self.account_id == self.user.account_id:
+            # Snapshot from users.authentication: admin profile and flag are preloaded
+            return self.user.is_admin() or self.user.is_account_admin()
+        flags = User.objects.filter(pk=self.user.pk).values(
+            has_admin_profile=Exists(AdminProfile.objects.filter(user=OuterRef('pk'))),
+            is_account_admin=Exists(AccountMembership.objects.filter(
+                user=OuterRef('pk'), account_id=self.account_id, role='account_admin', is_active=True,
+            )),
+        ).first()
+        return bool(flags) and (flags['has_admin_profile'] or flags['is_account_admin'])
+
+    @cached_property
+    def course_roles(self):
+        """Active course memberships as ``{course_id: role}``"""
+        if not self.user.is_authenticated:
+            return {}
+        return dict(CourseMembership.objects.filter(
+            user_id=self.user.pk, status='active'
+        ).values_list('course_id', 'role'))
+
+    def course_role(self, course):
+        """The user's active role in ``course``, or ``None``"""
+        return self.course_roles.get(getattr(course, 'pk', course))
+
+    def is_course_instructor(self, course):
+        return self.is_admin or self.course_role(course) == 'instructor'
+
+    def is_course_student(self, course):
+        return self.course_role(course) == 'student'
+
+    def is_course_member(self, course):
+        return self.is_admin or self.course_role(course) is not None
+
+    @property
+    def is_instructor(self):
+        """Whether the user instructs any course"""
+        return 'instructor' in self.course_roles.values()
+
+    def _course_ids(self, role=None):
+        """Active course IDs, as a list once roles are loaded or else as a subquery"""
+        if 'course_roles' in self.__dict__:
+            return [course_id for course_id, course_role in self.course_roles.items()
+                    if role is None or course_role == role]
+        memberships = CourseMembership.objects.filter(user_id=self.user.pk, status='active')
+        if role is not None:
+            memberships = memberships.filter(role=role)
+        return memberships.values_list('course_id', flat=True)
+
+    @property
+    def member_course_ids(self):
+        return self._course_ids()
+
+    @property
+    def instructor_course_ids(self):
+        return self._course_ids('instructor')
+
+    @property
+    def student_course_ids(self):
+        return self._course_ids('student')
+
+
+def get_access(request):
+    """The ``RequestAccess`` of ``request``, built on first use.
+
+    Stored on the underlying Django request, so the DRF request, permission
+    classes and serializers receiving the request in their context share it.
+    """
+    http_request = getattr(request, '_request', request)
+    user = request.user
+    access = getattr(http_request, '_access', None)
+    if access is None or access.user is not user:
+        access = RequestAccess(user, getattr(request, 'account', None))
+        http_request._access = access
+    return access
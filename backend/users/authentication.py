@@ -0,0 +1,90 @@
+"""JWT authentication backed by a short-lived cached user snapshot"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from accounts.models import AccountMembership
+from accounts.resolution import VERSION_KEY as ACCOUNTS_VERSION_KEY
+from .models import User
+
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
+
+
+def _version_key(user_id):
+    return f'auth_user:version:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """Discard the cached snapshot of a user (profile, password, activation, admin roles changed)"""
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), time.time_ns(), timeout=None)
+
+
+def load_user_snapshot(user_id):
+    """The user with its account, admin profile and account-admin flag, in one query"""
+    return User.objects.select_related('account', 'admin_profile').annotate(
+        cached_account_admin=Exists(AccountMembership.objects.filter(
+            user=OuterRef('pk'), account=OuterRef('account'), role='account_admin', is_active=True,
+        )),
+    ).filter(pk=user_id).first()
+
+
+def get_cached_user(user_id):
+    """The user's snapshot from the cache, loaded on a miss (``None`` if there is no such user).
+
+    Snapshots are keyed by the user's version counter and the accounts
+    version, so user, membership, admin profile and account changes all
+    produce a fresh one. Every call returns its own unpickled copy.
+    """
+    # Seed with a timestamp so an evicted counter never reuses an old version
+    cache.add(_version_key(user_id), time.time_ns(), timeout=None)
+    cache.add(ACCOUNTS_VERSION_KEY, time.time_ns(), timeout=None)
+    versions = cache.get_many([_version_key(user_id), ACCOUNTS_VERSION_KEY])
+    key = 'auth_user:{}:{}:{}'.format(
+        user_id, versions.get(_version_key(user_id)), versions.get(ACCOUNTS_VERSION_KEY)
+    )
+    user = cache.get(key)
+    if user is None:
+        user = load_user_snapshot(user_id)
+        if user is not None:
+            cache.set(key, user, AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that hydrates the user from ``get_cached_user``.
+
+    The user's account and admin profile come preloaded and
+    ``User.is_account_admin()`` reads the cached flag, so authentication,
+    permission checks and the current-user endpoint cost no queries while
+    the snapshot is warm.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
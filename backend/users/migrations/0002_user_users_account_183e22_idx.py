@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-17 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['account', '-created_at', '-id'], name='users_account_183e22_idx'),
+        ),
+    ]
@@ -68,6 +68,9 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         unique_together = [['email', 'account']]
+        indexes = [
+            models.Index(fields=['account', '-created_at', '-id']),
+        ]
 
     def __str__(self):
         return self.email
@@ -83,6 +86,9 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def is_account_admin(self):
         """Check if user is an account admin"""
+        if hasattr(self, 'cached_account_admin'):
+            # Preloaded by users.authentication.load_user_snapshot
+            return self.cached_account_admin
         return self.account_memberships.filter(
             account=self.account,
             role='account_admin',
@@ -1,17 +1,7 @@
 """Custom permissions for user roles with account-scoped enforcement"""
 from rest_framework import permissions
 
-
-def _is_admin_user(user, request):
-    """Check if user is an admin (admin profile or account admin)"""
-    if hasattr(user, 'admin_profile'):
-        return True
-    account = getattr(request, 'account', None)
-    if account is not None:
-        return user.account_memberships.filter(
-            account=account, role='account_admin', is_active=True
-        ).exists()
-    return False
+from .access import get_access
 
 
 def _get_course(obj):
@@ -41,7 +31,7 @@ class IsAccountAdmin(AccountPermission):
     def has_permission(self, request, view):
         if not super().has_permission(request, view):
             return False
-        return _is_admin_user(request.user, request)
+        return get_access(request).is_admin
 
 
 class IsAdmin(AccountPermission):
@@ -50,7 +40,7 @@ class IsAdmin(AccountPermission):
     def has_permission(self, request, view):
         if not super().has_permission(request, view):
             return False
-        return _is_admin_user(request.user, request)
+        return get_access(request).is_admin
 
 
 class IsCourseMember(AccountPermission):
@@ -60,17 +50,14 @@ class IsCourseMember(AccountPermission):
         if not super().has_permission(request, view):
             return False
 
-        if _is_admin_user(request.user, request):
+        if get_access(request).is_admin:
             return True
 
         course = _get_course(obj)
         if not course:
             return False
 
-        return course.memberships.filter(
-            user=request.user,
-            status='active'
-        ).exists()
+        return get_access(request).is_course_member(course)
 
 
 class IsInstructor(AccountPermission):
@@ -80,13 +67,10 @@ class IsInstructor(AccountPermission):
         if not super().has_permission(request, view):
             return False
 
-        if _is_admin_user(request.user, request):
+        if get_access(request).is_admin:
             return True
 
-        return request.user.memberships.filter(
-            role='instructor',
-            status='active'
-        ).exists()
+        return get_access(request).is_instructor
 
 
 class IsCourseInstructor(AccountPermission):
@@ -96,18 +80,14 @@ class IsCourseInstructor(AccountPermission):
         if not super().has_permission(request, view):
             return False
 
-        if _is_admin_user(request.user, request):
+        if get_access(request).is_admin:
             return True
 
         course = _get_course(obj)
         if not course:
             return False
 
-        return course.memberships.filter(
-            user=request.user,
-            role='instructor',
-            status='active'
-        ).exists()
+        return get_access(request).is_course_instructor(course)
 
 
 class IsCourseStudent(AccountPermission):
@@ -121,11 +101,7 @@ class IsCourseStudent(AccountPermission):
         if not course:
             return False
 
-        return course.memberships.filter(
-            user=request.user,
-            role='student',
-            status='active'
-        ).exists()
+        return get_access(request).is_course_student(course)
 
 
 class IsInstructorOrAdmin(AccountPermission):
@@ -135,13 +111,10 @@ class IsInstructorOrAdmin(AccountPermission):
         if not super().has_permission(request, view):
             return False
 
-        if _is_admin_user(request.user, request):
+        if get_access(request).is_admin:
             return True
 
-        return request.user.memberships.filter(
-            role='instructor',
-            status='active'
-        ).exists()
+        return get_access(request).is_instructor
 
 
 class IsCourseInstructorOrAdmin(AccountPermission):
@@ -151,15 +124,11 @@ class IsCourseInstructorOrAdmin(AccountPermission):
         if not super().has_permission(request, view):
             return False
 
-        if _is_admin_user(request.user, request):
+        if get_access(request).is_admin:
             return True
 
         course = _get_course(obj)
         if not course:
             return False
 
-        return course.memberships.filter(
-            user=request.user,
-            role='instructor',
-            status='active'
-        ).exists()
+        return get_access(request).is_course_instructor(course)
@@ -0,0 +1,27 @@
+"""Signal handlers that keep cached authentication snapshots in step with user edits"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import AccountMembership
+from .authentication import invalidate_cached_user
+from .models import AdminProfile, User
+
+
+def _invalidate(user_id):
+    invalidate_cached_user(user_id)
+    # Again once committed, so a snapshot cached from pre-commit rows is discarded
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Profile edits, password changes and deactivation"""
+    _invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=AdminProfile)
+@receiver([post_save, post_delete], sender=AccountMembership)
+def user_role_changed(sender, instance, **kwargs):
+    """Admin profile and account role changes"""
+    _invalidate(instance.user_id)
@@ -2,6 +2,7 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from config.pagination import KeysetPagination
 from .models import User
 from .serializers import UserRegistrationSerializer, UserSerializer
 from .permissions import IsAdmin
@@ -63,6 +64,8 @@ class UserListView(generics.ListAPIView):
     """API endpoint to list all users in current account (Admin only)"""
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         account = getattr(self.request, 'account', None)